@@ -1,8 +1,36 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from analytics import (
+    METRIC_LABELS,
+    DATA_PATH,
+    DEPARTMENT_COLUMNS,
+    DEPARTMENTS,
+    charts,
+    conversion_rates,
+    department_growth,
+    department_growth_overall,
+    department_shares,
+    executive_summary,
+    funnel_table,
+    header_kpis,
+    historical_table,
+    term_differences,
+    workers,
+)
+from analytics.correlation import LABELS, ROLLING_WINDOW, CorrelationEngine, strength
+from analytics.growth import GrowthTable
+from analytics.funnel import (
+    DEPARTMENT_NAMES,
+    EVENTS_PATH,
+    TERMS,
+    FunnelEngine,
+    stage_table,
+)
+from analytics.scenarios import MAX_DELTA, MAX_SCENARIOS, ScenarioEngine
+from analytics.store import last_valid_store, open_store, session_footprint
+from analytics.validation import DataValidationError
+from analytics.versioning import DataWatcher
 
 # Configuración de la página
 st.set_page_config(
@@ -12,13 +40,94 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Cargar datos
-@st.cache_data
-def load_data():
-    df = pd.read_csv('university_student_data.csv')
-    return df
+# Dataset mapeado en memoria, su resumen y la pirámide de agregados
+# (período → año → lustro): una sola instancia de solo lectura por versión
+# de los datos para todas las sesiones, que no reciben copias. Se conservan
+# la versión actual y la anterior mientras terminan las sesiones en curso.
+@st.cache_resource(max_entries=2)
+def load_store(version):
+    # Instancia registrada en el proceso: si la API se monta aquí usa la
+    # misma (dataset y agregados), no las figuras memorizadas
+    return open_store(DATA_PATH, version)
+
+def prewarm(version):
+    """Abre el almacén de una versión nueva y calcula lo más pedido."""
+    new_store = load_store(version)
+    new_growth = new_store.memo('growth', GrowthTable.from_pyramid, new_store.pyramid)
+    new_store.memo('kpis', header_kpis, new_store.df, new_growth)
+    new_store.memo(('yearly', None), new_store.pyramid.rollup, 'year', None)
+    new_store.csv_bytes()
+
+# Cuando llega una versión nueva del archivo se precalienta antes de que
+# la pida la próxima sesión; las sesiones usan la versión que publica el
+# vigilante después de precalentarla, sin calcular la huella en cada rerun
+@st.cache_resource
+def start_watcher():
+    return DataWatcher(DATA_PATH, prewarm).start()
+
+def rejection_notice(exc):
+    return "\n".join(f"- {problem}" for problem in exc.problems)
+
+watcher = start_watcher()
+try:
+    store = load_store(watcher.version)
+except DataValidationError as exc:
+    # Versión inicial inválida: se usa la última válida abierta, si la hay
+    store = last_valid_store(DATA_PATH)
+    if store is None:
+        st.error(f"❌ El archivo de datos no es válido:\n\n{rejection_notice(exc)}")
+        st.stop()
+    st.warning(f"⚠️ Los datos nuevos fueron rechazados; se muestra la versión anterior.\n\n{rejection_notice(exc)}")
+else:
+    if watcher.error is not None:
+        # Una versión inválida no reemplaza a la última válida
+        st.warning(f"⚠️ Los datos nuevos fueron rechazados; se muestra la versión anterior.\n\n{rejection_notice(watcher.error)}")
+df, data_summary, pyramid = store.df, store.summary, store.pyramid
+# Crecimiento YoY, acumulado y por rango de cada métrica, una vez por versión
+growth_table = store.memo('growth', GrowthTable.from_pyramid, pyramid)
+# Años y registros por (Year, Term) salen de la pirámide, sin recorrer el dataset
+years_available = pyramid.levels['year'].index.tolist()
+term_years = pyramid.levels['term'].index.get_level_values('Year')
+
+# Eventos por aplicante (opcionales) para el embudo por cohorte
+@st.cache_resource(max_entries=2)
+def load_funnel(version):
+    return FunnelEngine.from_csv(EVENTS_PATH)
+
+def prewarm_funnel(version):
+    # Sin archivo de eventos no hay nada que precalentar
+    if version is not None:
+        load_funnel(version)
+
+@st.cache_resource
+def start_events_watcher():
+    return DataWatcher(EVENTS_PATH, prewarm_funnel, optional=True).start()
+
+events_version = start_events_watcher().version
+funnel_engine = load_funnel(events_version) if events_version is not None else None
+
+# Pool compartido entre sesiones para las secciones costosas
+@st.cache_resource
+def get_pool():
+    return workers.create_pool()
+
+# Filtros de las pestañas
+FILTER_KEYS = ['year_trend_filter', 'comparison_years', 'comparison_metric', 'dept_year_filter']
+
+# Los cálculos de una ejecución anterior interrumpida ya no se dibujarán
+pool = get_pool()
+if 'scheduler' not in st.session_state:
+    st.session_state['scheduler'] = workers.SectionScheduler(pool)
+scheduler = st.session_state['scheduler']
+scheduler.cancel_all()
 
-df = load_data()
+# Las secciones pesadas se lanzan al inicio y se dibujan al terminar
+pending = {}
+csv_future = scheduler.submit('csv_export', store.csv_bytes)
+projection_future = None
+if st.session_state.get('analysis_type') == "🔍 Análisis Predictivo":
+    projection_future = scheduler.submit('projection', store.memo, 'projection',
+                                         lambda: workers.projection_section(df, growth=growth_table))
 
 # Header con información del equipo
 col1, col2 = st.columns([3, 1])
@@ -37,50 +146,43 @@ st.markdown("---")
 st.markdown("## 📊 Indicadores Generales del Sistema")
 st.markdown("*Vista completa de todos los datos históricos (2015-2024)*")
 
+kpis = store.memo('kpis', header_kpis, df, growth_table)
+
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
-    avg_retention = df['Retention Rate (%)'].mean()
-    max_retention = df['Retention Rate (%)'].max()
     st.metric(
         label="📈 Retención Promedio",
-        value=f"{avg_retention:.1f}%",
-        delta=f"Máximo: {max_retention:.0f}%"
+        value=f"{kpis['avg_retention']:.1f}%",
+        delta=f"Máximo: {kpis['max_retention']:.0f}%"
     )
 
 with col2:
-    avg_satisfaction = df['Student Satisfaction (%)'].mean()
-    growth_satisfaction = df.groupby('Year')['Student Satisfaction (%)'].mean()
-    satisfaction_growth = growth_satisfaction.iloc[-1] - growth_satisfaction.iloc[0]
     st.metric(
         label="😊 Satisfacción Media",
-        value=f"{avg_satisfaction:.1f}%",
-        delta=f"+{satisfaction_growth:.0f}% desde 2015"
+        value=f"{kpis['avg_satisfaction']:.1f}%",
+        delta=f"+{kpis['satisfaction_growth']:.0f}% desde {kpis['first_year']}"
     )
 
 with col3:
-    total_enrolled = df['Enrolled'].sum()
     st.metric(
         label="👥 Total Histórico",
-        value=f"{total_enrolled:,}",
+        value=f"{kpis['total_enrolled']:,}",
         delta="Estudiantes matriculados"
     )
 
 with col4:
-    avg_admission_rate = (df['Admitted'].sum() / df['Applications'].sum() * 100)
     st.metric(
         label="✅ Tasa de Admisión",
-        value=f"{avg_admission_rate:.1f}%",
+        value=f"{kpis['admission_rate']:.1f}%",
         delta="Media histórica"
     )
 
 with col5:
-    total_apps = df['Applications'].sum()
-    growth_apps = ((df[df['Year']==2024]['Applications'].sum() / df[df['Year']==2015]['Applications'].sum() - 1) * 100)
     st.metric(
         label="📝 Aplicaciones Totales",
-        value=f"{total_apps:,}",
-        delta=f"+{growth_apps:.0f}% crecimiento"
+        value=f"{kpis['total_apps']:,}",
+        delta=f"+{kpis['apps_growth']:.0f}% crecimiento"
     )
 
 with st.expander("📖 ¿Qué significan estos indicadores?"):
@@ -95,242 +197,122 @@ st.markdown("---")
 
 # Tabs principales
 tab1, tab2, tab3, tab4 = st.tabs([
-    "📈 Evolución Temporal", 
-    "🆚 Análisis Comparativo", 
-    "🏢 Departamentos", 
+    "📈 Evolución Temporal",
+    "🆚 Análisis Comparativo",
+    "🏢 Departamentos",
     "🎯 Análisis Profundo"
 ])
 
 # ==================== TAB 1: EVOLUCIÓN TEMPORAL ====================
 with tab1:
     st.header("📈 Evolución Temporal de Indicadores Clave")
-    
+
     # Filtro específico para tendencias temporales
     col1, col2 = st.columns([3, 1])
     with col1:
         st.markdown("#### Selecciona el período de análisis")
     with col2:
-        years_available = sorted(df['Year'].unique())
         year_filter = st.selectbox(
             "Filtrar desde el año:",
             options=['Todos'] + years_available,
             key="year_trend_filter"
         )
-    
-    # Aplicar filtro
-    if year_filter != 'Todos':
-        df_trend = df[df['Year'] >= year_filter].copy()
-        st.info(f"📊 Mostrando datos desde {year_filter} hasta 2024 ({len(df_trend)} registros)")
-    else:
-        df_trend = df.copy()
-    
-    # Agrupar por año
-    df_yearly = df_trend.groupby('Year').agg({
-        'Retention Rate (%)': 'mean',
-        'Student Satisfaction (%)': 'mean',
-        'Enrolled': 'sum',
-        'Applications': 'sum',
-        'Admitted': 'sum'
-    }).reset_index()
-    
+
+    # Aplicar filtro y agrupar por año
+    start_year = None if year_filter == 'Todos' else year_filter
+    df_yearly = store.memo(('yearly', start_year), pyramid.rollup, 'year', start_year)
+    if start_year is not None:
+        # Una fila por (Year, Term): los registros son los períodos del rango
+        n_records = int((term_years >= start_year).sum())
+        st.info(f"📊 Mostrando datos desde {year_filter} hasta {kpis['last_year']} ({n_records} registros)")
+
     # Gráfico principal: Retención y Satisfacción
     st.subheader("🎯 Retención y Satisfacción Estudiantil")
-    
-    fig1 = make_subplots(specs=[[{"secondary_y": True}]])
-    
-    fig1.add_trace(
-        go.Scatter(
-            x=df_yearly['Year'], 
-            y=df_yearly['Retention Rate (%)'], 
-            name="Tasa de Retención",
-            mode='lines+markers',
-            line=dict(color='#0077B6', width=4),
-            marker=dict(size=10, symbol='circle'),
-            hovertemplate='<b>Año %{x}</b><br>Retención: %{y:.1f}%<extra></extra>'
-        ),
-        secondary_y=False
-    )
-    
-    fig1.add_trace(
-        go.Scatter(
-            x=df_yearly['Year'], 
-            y=df_yearly['Student Satisfaction (%)'], 
-            name="Satisfacción Estudiantil",
-            mode='lines+markers',
-            line=dict(color='#E63946', width=4),
-            marker=dict(size=10, symbol='diamond'),
-            hovertemplate='<b>Año %{x}</b><br>Satisfacción: %{y:.1f}%<extra></extra>'
-        ),
-        secondary_y=False
-    )
-    
-    fig1.update_xaxes(title_text="<b>Año Académico</b>", gridcolor='lightgray')
-    fig1.update_yaxes(title_text="<b>Porcentaje (%)</b>", secondary_y=False, gridcolor='lightgray')
-    fig1.update_layout(
-        height=450, 
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=12)
-        ),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='white'
-    )
-    
+
+    fig1 = store.memo(('retention', start_year), charts.retention_satisfaction_chart, df_yearly)
     st.plotly_chart(fig1, use_container_width=True)
-    
+
     # Interpretación automática
     retention_trend = "ascendente ↗️" if df_yearly['Retention Rate (%)'].is_monotonic_increasing else "variable 📊"
     satisfaction_trend = "ascendente ↗️" if df_yearly['Student Satisfaction (%)'].is_monotonic_increasing else "variable 📊"
-    
+
+    # Crecimiento exacto del rango desde la tabla precalculada
+    retention = growth_table.growth('Retention Rate (%)', start_year)
+    satisfaction = growth_table.growth('Student Satisfaction (%)', start_year)
+    enrollment = growth_table.growth('Enrolled', start_year)
+
     col1, col2 = st.columns(2)
     with col1:
         st.success(f"""
-        **💡 Análisis de Retención:** 
+        **💡 Análisis de Retención:**
         - Tendencia {retention_trend}
-        - Valor inicial: {df_yearly['Retention Rate (%)'].iloc[0]:.1f}%
-        - Valor final: {df_yearly['Retention Rate (%)'].iloc[-1]:.1f}%
-        - Cambio total: {df_yearly['Retention Rate (%)'].iloc[-1] - df_yearly['Retention Rate (%)'].iloc[0]:+.1f} puntos porcentuales
+        - Valor inicial: {retention['initial']:.1f}%
+        - Valor final: {retention['final']:.1f}%
+        - Cambio total: {retention['change']:+.1f} puntos porcentuales
         """)
-    
+
     with col2:
         st.success(f"""
         **💡 Análisis de Satisfacción:**
         - Tendencia {satisfaction_trend}
-        - Valor inicial: {df_yearly['Student Satisfaction (%)'].iloc[0]:.1f}%
-        - Valor final: {df_yearly['Student Satisfaction (%)'].iloc[-1]:.1f}%
-        - Cambio total: {df_yearly['Student Satisfaction (%)'].iloc[-1] - df_yearly['Student Satisfaction (%)'].iloc[0]:+.1f} puntos porcentuales
+        - Valor inicial: {satisfaction['initial']:.1f}%
+        - Valor final: {satisfaction['final']:.1f}%
+        - Cambio total: {satisfaction['change']:+.1f} puntos porcentuales
         """)
-    
+
     st.markdown("---")
-    
+
     # Gráfico de matrícula
     st.subheader("👥 Crecimiento de la Matrícula Estudiantil")
-    
-    fig2 = go.Figure()
-    
-    fig2.add_trace(go.Bar(
-        x=df_yearly['Year'],
-        y=df_yearly['Enrolled'],
-        name='Estudiantes Matriculados',
-        marker_color='#06A77D',
-        text=df_yearly['Enrolled'],
-        textposition='outside',
-        texttemplate='%{text:,}',
-        hovertemplate='<b>%{x}</b><br>Matriculados: %{y:,}<extra></extra>'
-    ))
-    
-    # Agregar línea de tendencia
-    fig2.add_trace(go.Scatter(
-        x=df_yearly['Year'],
-        y=df_yearly['Enrolled'],
-        mode='lines',
-        name='Tendencia',
-        line=dict(color='#023047', width=3, dash='dash'),
-        hovertemplate='<b>Tendencia</b><br>%{y:,}<extra></extra>'
-    ))
-    
-    fig2.update_layout(
-        height=400,
-        xaxis_title="<b>Año</b>",
-        yaxis_title="<b>Número de Estudiantes</b>",
-        plot_bgcolor='rgba(0,0,0,0)',
-        showlegend=True
-    )
-    
+
+    fig2 = store.memo(('enrollment', start_year), charts.enrollment_chart, df_yearly)
     st.plotly_chart(fig2, use_container_width=True)
-    
-    # Cálculo de crecimiento
-    enrollment_growth = ((df_yearly['Enrolled'].iloc[-1] / df_yearly['Enrolled'].iloc[0]) - 1) * 100
-    total_growth = df_yearly['Enrolled'].iloc[-1] - df_yearly['Enrolled'].iloc[0]
-    
+
     st.info(f"""
     **📊 Análisis de Crecimiento:**
-    La matrícula ha crecido un **{enrollment_growth:.1f}%** en el período analizado, 
-    pasando de **{df_yearly['Enrolled'].iloc[0]:,}** a **{df_yearly['Enrolled'].iloc[-1]:,}** estudiantes 
-    (un incremento de **{total_growth:,}** estudiantes).
+    La matrícula ha crecido un **{enrollment['growth_pct']:.1f}%** en el período analizado,
+    pasando de **{enrollment['initial']:,}** a **{enrollment['final']:,}** estudiantes
+    (un incremento de **{enrollment['change']:,}** estudiantes).
     """)
-    
+
     st.markdown("---")
-    
+
     # Embudo de admisión
     st.subheader("🎯 Embudo del Proceso de Admisión")
-    
+
     col1, col2 = st.columns([2, 1])
-    
+
     with col1:
-        fig3 = go.Figure()
-        
-        fig3.add_trace(go.Scatter(
-            x=df_yearly['Year'], 
-            y=df_yearly['Applications'],
-            name='Aplicaciones',
-            mode='lines+markers',
-            line=dict(color='#457B9D', width=3),
-            fill='tonexty',
-            fillcolor='rgba(69, 123, 157, 0.2)'
-        ))
-        
-        fig3.add_trace(go.Scatter(
-            x=df_yearly['Year'], 
-            y=df_yearly['Admitted'],
-            name='Admitidos',
-            mode='lines+markers',
-            line=dict(color='#F4A261', width=3),
-            fill='tonexty',
-            fillcolor='rgba(244, 162, 97, 0.2)'
-        ))
-        
-        fig3.add_trace(go.Scatter(
-            x=df_yearly['Year'], 
-            y=df_yearly['Enrolled'],
-            name='Matriculados',
-            mode='lines+markers',
-            line=dict(color='#2A9D8F', width=3),
-            fill='tonexty',
-            fillcolor='rgba(42, 157, 143, 0.2)'
-        ))
-        
-        fig3.update_layout(
-            height=400,
-            xaxis_title="<b>Año</b>",
-            yaxis_title="<b>Número de Estudiantes</b>",
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        
+        fig3 = store.memo(('admission', start_year), charts.admission_trend_chart, df_yearly)
         st.plotly_chart(fig3, use_container_width=True)
-    
+
     with col2:
         st.markdown("### 📊 Tasas de Conversión")
-        
-        conv_admission = (df_yearly['Admitted'].sum() / df_yearly['Applications'].sum() * 100)
-        conv_enrollment = (df_yearly['Enrolled'].sum() / df_yearly['Admitted'].sum() * 100)
-        conv_total = (df_yearly['Enrolled'].sum() / df_yearly['Applications'].sum() * 100)
-        
+
+        conversion = conversion_rates(df_yearly)
+        conv_admission = conversion['admission']
+        conv_enrollment = conversion['enrollment']
+        conv_total = conversion['total']
+
         st.metric("📝 → ✅ Aplicación a Admisión", f"{conv_admission:.1f}%")
         st.metric("✅ → 🎓 Admisión a Matrícula", f"{conv_enrollment:.1f}%")
         st.metric("📝 → 🎓 Conversión Total", f"{conv_total:.1f}%")
-        
+
         st.markdown(f"""
         **Interpretación:**
-        
+
         De cada **100 aplicantes**:
         - **{int(conv_admission)}** son admitidos
         - **{int(conv_total)}** se matriculan finalmente
-        
-        La tasa de matrícula sobre admitidos del **{conv_enrollment:.0f}%** indica 
+
+        La tasa de matrícula sobre admitidos del **{conv_enrollment:.0f}%** indica
         un alto nivel de aceptación de las ofertas.
         """)
 
 # ==================== TAB 2: ANÁLISIS COMPARATIVO ====================
 with tab2:
     st.header("🆚 Análisis Comparativo Entre Períodos")
-    
+
     # Filtro para comparación
     col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
@@ -338,159 +320,82 @@ with tab2:
     with col2:
         comparison_years = st.multiselect(
             "Años a comparar:",
-            options=sorted(df['Year'].unique()),
+            options=years_available,
             default=[2015, 2024],
             key="comparison_years"
         )
     with col3:
         comparison_metric = st.selectbox(
             "Métrica principal:",
-            options=['Retention Rate (%)', 'Student Satisfaction (%)', 'Enrolled'],
-            format_func=lambda x: {
-                'Retention Rate (%)': 'Retención',
-                'Student Satisfaction (%)': 'Satisfacción',
-                'Enrolled': 'Matrícula'
-            }[x],
+            options=list(METRIC_LABELS),
+            format_func=lambda x: METRIC_LABELS[x],
             key="comparison_metric"
         )
-    
+
     if len(comparison_years) < 2:
         st.warning("⚠️ Selecciona al menos 2 años para realizar la comparación")
     else:
-        df_comparison = df[df['Year'].isin(comparison_years)]
-        
         # Comparación Spring vs Fall
         st.subheader("📚 Comparación: Período Spring vs Fall")
-        
-        df_term = df_comparison.groupby('Term').agg({
-            'Retention Rate (%)': 'mean',
-            'Student Satisfaction (%)': 'mean',
-            'Enrolled': 'sum',
-            'Applications': 'sum',
-            'Admitted': 'sum'
-        }).reset_index()
-        
+
+        years_key = tuple(sorted(comparison_years))
+        df_term = store.memo(('by_term', years_key), pyramid.by_term, comparison_years)
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            fig4 = go.Figure()
-            
-            metrics = ['Retention Rate (%)', 'Student Satisfaction (%)']
-            colors = ['#0077B6', '#E63946']
-            
-            for idx, metric in enumerate(metrics):
-                fig4.add_trace(go.Bar(
-                    name=metric.replace(' (%)', '').replace('Student ', ''),
-                    x=df_term['Term'],
-                    y=df_term[metric],
-                    marker_color=colors[idx],
-                    text=df_term[metric].round(1),
-                    textposition='outside',
-                    texttemplate='%{text}%'
-                ))
-            
-            fig4.update_layout(
-                title="<b>Métricas de Calidad por Período</b>",
-                barmode='group',
-                height=400,
-                xaxis_title="<b>Período Académico</b>",
-                yaxis_title="<b>Porcentaje (%)</b>",
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            
+            fig4 = store.memo(('term_quality', years_key), charts.term_quality_chart, df_term)
             st.plotly_chart(fig4, use_container_width=True)
-        
+
         with col2:
-            fig5 = px.pie(
-                df_term,
-                values='Enrolled',
-                names='Term',
-                title='<b>Distribución de Matrícula</b>',
-                hole=0.5,
-                color_discrete_sequence=['#2A9D8F', '#F4A261']
-            )
-            
-            fig5.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                textfont_size=14
-            )
-            
-            fig5.update_layout(height=400)
-            
+            fig5 = store.memo(('term_share', years_key), charts.term_share_chart, df_term)
             st.plotly_chart(fig5, use_container_width=True)
-        
+
         # Análisis de diferencias
-        if len(df_term) == 2:
-            spring = df_term[df_term['Term'] == 'Spring'].iloc[0]
-            fall = df_term[df_term['Term'] == 'Fall'].iloc[0]
-            
+        diffs = term_differences(df_term)
+        if diffs is not None:
             col1, col2, col3 = st.columns(3)
-            
+
             with col1:
-                diff_retention = fall['Retention Rate (%)'] - spring['Retention Rate (%)']
                 st.metric(
                     "📊 Diferencia en Retención",
-                    f"{abs(diff_retention):.2f}%",
-                    delta="Fall vs Spring" if diff_retention > 0 else "Spring vs Fall"
+                    f"{abs(diffs['retention']):.2f}%",
+                    delta="Fall vs Spring" if diffs['retention'] > 0 else "Spring vs Fall"
                 )
-            
+
             with col2:
-                diff_satisfaction = fall['Student Satisfaction (%)'] - spring['Student Satisfaction (%)']
                 st.metric(
                     "😊 Diferencia en Satisfacción",
-                    f"{abs(diff_satisfaction):.2f}%",
-                    delta="Fall vs Spring" if diff_satisfaction > 0 else "Spring vs Fall"
+                    f"{abs(diffs['satisfaction']):.2f}%",
+                    delta="Fall vs Spring" if diffs['satisfaction'] > 0 else "Spring vs Fall"
                 )
-            
+
             with col3:
-                diff_enrolled = fall['Enrolled'] - spring['Enrolled']
                 st.metric(
                     "👥 Diferencia en Matrícula",
-                    f"{abs(int(diff_enrolled)):,}",
-                    delta="Fall vs Spring" if diff_enrolled > 0 else "Spring vs Fall"
+                    f"{abs(int(diffs['enrolled'])):,}",
+                    delta="Fall vs Spring" if diffs['enrolled'] > 0 else "Spring vs Fall"
                 )
-            
+
             st.info("""
-            **💡 Conclusión:** Los datos muestran patrones muy similares entre ambos períodos académicos, 
+            **💡 Conclusión:** Los datos muestran patrones muy similares entre ambos períodos académicos,
             lo que indica **consistencia y estabilidad** en los procesos institucionales a lo largo del año.
             Esto facilita la planificación y asignación de recursos de manera equilibrada.
             """)
-        
+
         st.markdown("---")
-        
+
         # Comparación año a año
         st.subheader("📅 Evolución de la Métrica Seleccionada")
-        
-        df_year_comparison = df_comparison.groupby(['Year', 'Term']).agg({
-            comparison_metric: 'mean' if '%' in comparison_metric else 'sum'
-        }).reset_index()
-        
-        fig6 = px.line(
-            df_year_comparison,
-            x='Year',
-            y=comparison_metric,
-            color='Term',
-            markers=True,
-            title=f"<b>Evolución de {comparison_metric.replace(' (%)', '').replace('Student ', '')}</b>",
-            color_discrete_map={'Spring': '#2A9D8F', 'Fall': '#F4A261'}
-        )
-        
-        fig6.update_traces(line=dict(width=3), marker=dict(size=10))
-        fig6.update_layout(
-            height=450,
-            xaxis_title="<b>Año</b>",
-            yaxis_title=f"<b>{comparison_metric}</b>",
-            plot_bgcolor='rgba(0,0,0,0)',
-            hovermode='x unified'
-        )
-        
+
+        fig6 = store.memo(('metric_evolution', years_key, comparison_metric), lambda: charts.metric_evolution_chart(
+            pyramid.year_term(comparison_years, [comparison_metric]), comparison_metric))
         st.plotly_chart(fig6, use_container_width=True)
 
 # ==================== TAB 3: DEPARTAMENTOS ====================
 with tab3:
     st.header("🏢 Análisis Detallado por Departamento")
-    
+
     # Filtros para departamentos
     col1, col2 = st.columns([2, 1])
     with col1:
@@ -498,37 +403,24 @@ with tab3:
     with col2:
         dept_year_filter = st.select_slider(
             "Período de análisis:",
-            options=sorted(df['Year'].unique()),
+            options=years_available,
             value=(2015, 2024),
             key="dept_year_filter"
         )
-    
-    # Filtrar datos
-    df_dept = df[(df['Year'] >= dept_year_filter[0]) & (df['Year'] <= dept_year_filter[1])]
-    
+
     # Preparar datos departamentales
-    dept_data = pd.DataFrame({
-        'Departamento': ['Ingeniería', 'Negocios', 'Artes', 'Ciencias'],
-        'Total Matriculados': [
-            df_dept['Engineering Enrolled'].sum(),
-            df_dept['Business Enrolled'].sum(),
-            df_dept['Arts Enrolled'].sum(),
-            df_dept['Science Enrolled'].sum()
-        ],
-        'Icono': ['⚙️', '💼', '🎨', '🔬']
-    })
-    
-    dept_data['Porcentaje'] = (dept_data['Total Matriculados'] / dept_data['Total Matriculados'].sum() * 100).round(1)
-    dept_data = dept_data.sort_values('Total Matriculados', ascending=False)
-    
+    dept_range = tuple(int(year) for year in dept_year_filter)
+    dept_data = store.memo(('department_shares', dept_range), lambda: department_shares(
+        pyramid.partial('year', *dept_range)))
+
     # Tarjetas de departamentos
     st.subheader("📊 Resumen por Departamento")
-    
+
     cols = st.columns(4)
     for idx, row in dept_data.iterrows():
         with cols[dept_data.index.get_loc(idx)]:
             st.markdown(f"""
-            <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+            <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                         padding: 20px; border-radius: 10px; color: white; text-align: center;'>
                 <h1>{row['Icono']}</h1>
                 <h3>{row['Departamento']}</h3>
@@ -536,290 +428,276 @@ with tab3:
                 <p style='font-size: 18px;'>{row['Porcentaje']}% del total</p>
             </div>
             """, unsafe_allow_html=True)
-    
+
     st.markdown("---")
-    
+
     # Visualizaciones departamentales
     col1, col2 = st.columns(2)
-    
+
     with col1:
-        fig7 = px.bar(
-            dept_data,
-            x='Departamento',
-            y='Total Matriculados',
-            title='<b>Matrícula por Departamento</b>',
-            color='Total Matriculados',
-            color_continuous_scale='Viridis',
-            text='Total Matriculados'
-        )
-        
-        fig7.update_traces(
-            texttemplate='%{text:,}',
-            textposition='outside',
-            textfont_size=14
-        )
-        
-        fig7.update_layout(
-            height=400,
-            showlegend=False,
-            xaxis_title="<b>Departamento</b>",
-            yaxis_title="<b>Estudiantes Matriculados</b>",
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        
+        fig7 = store.memo(('department_bar', dept_range), charts.department_bar_chart, dept_data)
         st.plotly_chart(fig7, use_container_width=True)
-    
+
     with col2:
-        fig8 = go.Figure(data=[go.Pie(
-            labels=dept_data['Departamento'],
-            values=dept_data['Total Matriculados'],
-            hole=0.5,
-            marker=dict(colors=['#0077B6', '#E63946', '#2A9D8F', '#F4A261']),
-            textinfo='label+percent',
-            textposition='outside',
-            textfont_size=12
-        )])
-        
-        fig8.update_layout(
-            title='<b>Distribución Porcentual</b>',
-            height=400,
-            showlegend=False
-        )
-        
+        fig8 = store.memo(('department_pie', dept_range), charts.department_pie_chart, dept_data)
         st.plotly_chart(fig8, use_container_width=True)
-    
+
     st.markdown("---")
-    
+
     # Evolución temporal por departamento
     st.subheader("📈 Tendencias de Matrícula Departamental")
-    
-    df_dept_trend = df_dept.groupby('Year').agg({
-        'Engineering Enrolled': 'sum',
-        'Business Enrolled': 'sum',
-        'Arts Enrolled': 'sum',
-        'Science Enrolled': 'sum'
-    }).reset_index()
-    
-    fig9 = go.Figure()
-    
-    departments = [
-        ('Engineering Enrolled', 'Ingeniería ⚙️', '#0077B6'),
-        ('Business Enrolled', 'Negocios 💼', '#E63946'),
-        ('Arts Enrolled', 'Artes 🎨', '#2A9D8F'),
-        ('Science Enrolled', 'Ciencias 🔬', '#F4A261')
-    ]
-    
-    for col, name, color in departments:
-        fig9.add_trace(go.Scatter(
-            x=df_dept_trend['Year'],
-            y=df_dept_trend[col],
-            name=name,
-            mode='lines+markers',
-            line=dict(width=3, color=color),
-            marker=dict(size=8)
-        ))
-    
-    fig9.update_layout(
-        height=450,
-        xaxis_title="<b>Año</b>",
-        yaxis_title="<b>Estudiantes Matriculados</b>",
-        hovermode='x unified',
-        plot_bgcolor='rgba(0,0,0,0)',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="center",
-            x=0.5
-        )
-    )
-    
+
+    # Rangos amplios se dibujan por lustro (promedio anual) sin tocar el detalle anual
+    fig9 = store.memo(('department_trend', dept_range), lambda: charts.department_trend_chart(
+        pyramid.trend(DEPARTMENT_COLUMNS, *dept_range)))
     st.plotly_chart(fig9, use_container_width=True)
-    
+
     # Análisis de crecimiento departamental
     st.subheader("📊 Análisis de Crecimiento Departamental")
-    
-    growth_data = []
-    for col, name, _ in departments:
-        initial = df_dept_trend[col].iloc[0]
-        final = df_dept_trend[col].iloc[-1]
-        growth = ((final / initial) - 1) * 100 if initial > 0 else 0
-        growth_data.append({
-            'Departamento': name.split()[0],
-            'Crecimiento (%)': round(growth, 1),
-            'Valor Inicial': initial,
-            'Valor Final': final,
-            'Incremento': final - initial
-        })
-    
-    growth_df = pd.DataFrame(growth_data).sort_values('Crecimiento (%)', ascending=False)
-    
+
+    growth_df = store.memo(('department_growth', dept_range), department_growth, growth_table, *dept_range)
+
     col1, col2 = st.columns([2, 1])
-    
+
     with col1:
-        fig10 = px.bar(
-            growth_df,
-            x='Departamento',
-            y='Crecimiento (%)',
-            title='<b>Porcentaje de Crecimiento por Departamento</b>',
-            color='Crecimiento (%)',
-            color_continuous_scale='RdYlGn',
-            text='Crecimiento (%)'
-        )
-        
-        fig10.update_traces(texttemplate='%{text}%', textposition='outside')
-        fig10.update_layout(height=350, plot_bgcolor='rgba(0,0,0,0)')
-        
+        fig10 = store.memo(('department_growth_chart', dept_range), charts.department_growth_chart, growth_df)
         st.plotly_chart(fig10, use_container_width=True)
-    
+
     with col2:
         st.markdown("### 🏆 Rankings")
         st.markdown("**Mayor Matrícula:**")
         st.markdown(f"🥇 {dept_data.iloc[0]['Departamento']}: {dept_data.iloc[0]['Total Matriculados']:,}")
-        
+
         st.markdown("**Mayor Crecimiento:**")
         st.markdown(f"📈 {growth_df.iloc[0]['Departamento']}: +{growth_df.iloc[0]['Crecimiento (%)']}%")
-        
+
         st.markdown("**Más Estable:**")
         stability = growth_df.loc[growth_df['Crecimiento (%)'].abs().idxmin()]
         st.markdown(f"⚖️ {stability['Departamento']}: {stability['Crecimiento (%)']}%")
 
 # ==================== TAB 4: ANÁLISIS PROFUNDO ====================
+# Los controles del simulador vuelven a ejecutar solo esta sección: los
+# escenarios se evalúan juntos sobre los arreglos anuales de esta versión
+@st.fragment
+def scenario_simulator():
+    engine = store.memo('scenarios', ScenarioEngine.from_pyramid, pyramid)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        admission = st.slider(
+            "📝 Tasa de admisión (p.p.)",
+            min_value=-MAX_DELTA, max_value=MAX_DELTA, value=0.0, step=0.5,
+            key="scenario_admission",
+            help="Puntos porcentuales sumados a admitidos / aplicaciones de cada año"
+        )
+
+    with col2:
+        yield_ = st.slider(
+            "🎓 Rendimiento: matriculados / admitidos (p.p.)",
+            min_value=-MAX_DELTA, max_value=MAX_DELTA, value=0.0, step=0.5,
+            key="scenario_yield",
+            help="Puntos porcentuales sumados a matriculados / admitidos de cada año"
+        )
+
+    st.markdown("**🏢 Mezcla departamental** (p.p. de participación; se renormaliza al 100%)")
+    mix = []
+    for idx, (col, (_, name, icon, _)) in enumerate(zip(st.columns(len(DEPARTMENTS)), DEPARTMENTS)):
+        with col:
+            mix.append(st.slider(f"{icon} {name}", min_value=-MAX_DELTA, max_value=MAX_DELTA,
+                                 value=0.0, step=0.5, key=f"scenario_mix_{idx}"))
+
+    # Los escenarios guardados tienen tope: son estado protegido de la sesión.
+    # Los botones actúan en su callback, antes de dibujarse de nuevo
+    saved = st.session_state.setdefault('scenarios', [])
+    col1, col2, _ = st.columns([1, 1, 3])
+    with col1:
+        st.button("➕ Guardar escenario", disabled=len(saved) >= MAX_SCENARIOS,
+                  help=f"Hasta {MAX_SCENARIOS} escenarios guardados",
+                  on_click=saved.append, args=((admission, yield_, tuple(mix)),))
+    with col2:
+        st.button("🗑️ Limpiar escenarios", disabled=not saved, on_click=saved.clear)
+
+    # Base, escenario actual y guardados en una sola evaluación
+    scenarios = [(0.0, 0.0, (0.0,) * len(DEPARTMENTS)), (admission, yield_, tuple(mix))] + saved
+    names = ['Base', 'Actual'] + [f'Escenario {idx}' for idx in range(1, len(saved) + 1)]
+    admissions, yields, mixes = zip(*scenarios)
+    result = engine.evaluate(admissions, yields, mixes)
+    comparison = engine.comparison(result, names)
+    base, current = comparison.iloc[0], comparison.iloc[1]
+    final_year = f"Matrícula {engine.final_year}"
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Estudiantes Admitidos", f"{current['Admitidos']:,}",
+                  delta=f"{current['Admitidos'] - base['Admitidos']:+,}")
+
+    with col2:
+        st.metric("Estudiantes Matriculados", f"{current['Matriculados']:,}",
+                  delta=f"{current['Matriculados'] - base['Matriculados']:+,}")
+
+    with col3:
+        st.metric("Conversión Total", f"{current['Conversión Total (%)']:.1f}%",
+                  delta=f"{current['Conversión Total (%)'] - base['Conversión Total (%)']:+.1f} p.p.")
+
+    with col4:
+        st.metric(f"Matrícula Proyectada {engine.final_year}", f"{current[final_year]:,}",
+                  delta=f"{current[final_year] - base[final_year]:+,}")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.plotly_chart(charts.funnel_chart(engine.funnel_data(result, 1)), use_container_width=True,
+                        key="scenario_funnel")
+
+    with col2:
+        st.plotly_chart(charts.department_pie_chart(engine.department_data(result, 1)), use_container_width=True,
+                        key="scenario_departments")
+
+    st.plotly_chart(charts.scenario_projection_chart(
+        engine.years, result['yearly_enrolled'], engine.base_projection['Año'].to_numpy(),
+        result['projection'], names), use_container_width=True, key="scenario_projection")
+
+    st.markdown("### 📋 Comparación de Escenarios")
+    st.dataframe(comparison.round(1), use_container_width=True, hide_index=True)
+
 with tab4:
     st.header("🎯 Análisis Profundo e Insights Estratégicos")
-    
+
     # Selector de tipo de análisis
     analysis_type = st.radio(
         "Selecciona el tipo de análisis:",
-        options=["📊 Resumen Ejecutivo", "🔍 Análisis Predictivo", "💡 Recomendaciones"],
-        horizontal=True
+        options=["📊 Resumen Ejecutivo", "🔍 Análisis Predictivo", "🧪 Simulador de Escenarios",
+                 "💡 Recomendaciones"],
+        horizontal=True,
+        key="analysis_type"
     )
-    
+
     if analysis_type == "📊 Resumen Ejecutivo":
         st.subheader("📋 Resumen Ejecutivo Institucional")
-        
+
+        summary = store.memo('executive_summary', executive_summary, df, growth_table)
+        total_apps = summary['total_apps']
+        total_admitted = summary['total_admitted']
+        total_enrolled = summary['total_enrolled']
+
         # Métricas clave
         col1, col2, col3 = st.columns(3)
-        
+
         with col1:
             st.markdown("### 📝 Proceso de Admisión")
-            total_apps = df['Applications'].sum()
-            total_admitted = df['Admitted'].sum()
-            total_enrolled = df['Enrolled'].sum()
-            
             st.metric("Aplicaciones Totales", f"{total_apps:,}")
             st.metric("Estudiantes Admitidos", f"{total_admitted:,}")
             st.metric("Estudiantes Matriculados", f"{total_enrolled:,}")
-        
+
         with col2:
             st.markdown("### 📊 Indicadores de Calidad")
-            avg_retention = df['Retention Rate (%)'].mean()
-            avg_satisfaction = df['Student Satisfaction (%)'].mean()
-            
-            st.metric("Retención Promedio", f"{avg_retention:.1f}%")
-            st.metric("Satisfacción Promedio", f"{avg_satisfaction:.1f}%")
-            
-            # Calcular tendencia
-            df_trend_quality = df.groupby('Year').agg({
-                'Retention Rate (%)': 'mean',
-                'Student Satisfaction (%)': 'mean'
-            })
-            trend = "Positiva ✅" if df_trend_quality['Retention Rate (%)'].is_monotonic_increasing else "Estable 📊"
+            st.metric("Retención Promedio", f"{summary['avg_retention']:.1f}%")
+            st.metric("Satisfacción Promedio", f"{summary['avg_satisfaction']:.1f}%")
+
+            # Tendencia general
+            trend = "Positiva ✅" if summary['retention_increasing'] else "Estable 📊"
             st.metric("Tendencia General", trend)
-        
+
         with col3:
             st.markdown("### 🏢 Distribución Académica")
-            total_eng = df['Engineering Enrolled'].sum()
-            total_bus = df['Business Enrolled'].sum()
-            total_arts = df['Arts Enrolled'].sum()
-            total_sci = df['Science Enrolled'].sum()
-            
-            max_dept = max([(total_eng, "Ingeniería"), (total_bus, "Negocios"), 
-                           (total_arts, "Artes"), (total_sci, "Ciencias")])
-            
-            st.metric("Departamento Líder", max_dept[1])
-            st.metric("Estudiantes", f"{max_dept[0]:,}")
-            st.metric("Total Departamentos", "4")
-        
+            st.metric("Departamento Líder", summary['leader_department'])
+            st.metric("Estudiantes", f"{summary['leader_enrolled']:,}")
+            st.metric("Total Departamentos", str(summary['department_count']))
+
         st.markdown("---")
-        
+
         # Embudo completo
         st.subheader("🎯 Embudo Completo de Conversión")
-        
-        funnel_data = pd.DataFrame({
-            'Etapa': ['Aplicaciones Recibidas', 'Estudiantes Admitidos', 'Estudiantes Matriculados'],
-            'Cantidad': [total_apps, total_admitted, total_enrolled],
-            'Porcentaje': [100, (total_admitted/total_apps*100), (total_enrolled/total_apps*100)]
-        })
-        
+
+        funnel_data = funnel_table(summary)
+
         col1, col2 = st.columns([2, 1])
-        
+
         with col1:
-            fig_funnel = go.Figure()
-            
-            fig_funnel.add_trace(go.Funnel(
-                name='Conversión',
-                y=funnel_data['Etapa'],
-                x=funnel_data['Cantidad'],
-                textposition="inside",
-                textinfo="value+percent initial",
-                marker=dict(
-                    color=['#0077B6', '#2A9D8F', '#F4A261'],
-                    line=dict(width=2, color='white')
-                ),
-                connector=dict(line=dict(color='gray', dash='dot', width=2))
-            ))
-            
-            fig_funnel.update_layout(
-                title="<b>Proceso de Admisión y Matrícula</b>",
-                height=400
-            )
-            
+            fig_funnel = store.memo('funnel_chart', charts.funnel_chart, funnel_data)
             st.plotly_chart(fig_funnel, use_container_width=True)
-        
+
         with col2:
             st.markdown("### 📈 Métricas del Embudo")
             st.metric("Tasa de Admisión", f"{(total_admitted/total_apps*100):.1f}%")
             st.metric("Tasa de Matrícula", f"{(total_enrolled/total_admitted*100):.1f}%")
             st.metric("Conversión Total", f"{(total_enrolled/total_apps*100):.1f}%")
-            
+
             st.markdown(f"""
             **Interpretación:**
-            
+
             Por cada 100 aplicantes:
             - **{int(total_admitted/total_apps*100)}** son admitidos
             - **{int(total_enrolled/total_apps*100)}** se matriculan
-            
-            La tasa de conversión final es **excelente** 
+
+            La tasa de conversión final es **excelente**
             y muestra alta eficiencia del proceso.
             """)
-        
+
+        if funnel_engine is not None:
+            st.markdown("---")
+
+            # Embudo desde los eventos por aplicante, con retención
+            st.subheader("🧭 Embudo por Cohorte")
+            st.caption(f"Calculado sobre {funnel_engine.events:,} eventos de "
+                       f"{funnel_engine.applicants:,} aplicantes ({EVENTS_PATH})")
+
+            department_labels = {
+                name: f"{icon} {label}"
+                for name, (_, label, icon, _) in zip(DEPARTMENT_NAMES, DEPARTMENTS)
+            }
+            cohort_years_available = sorted(funnel_engine.cube().index.get_level_values('Year').unique())
+            col1, col2, col3 = st.columns([2, 1, 2])
+            with col1:
+                cohort_years = st.select_slider(
+                    "Cohortes:",
+                    options=cohort_years_available,
+                    value=(cohort_years_available[0], cohort_years_available[-1]),
+                    key="cohort_years"
+                )
+            with col2:
+                cohort_terms = st.multiselect("Períodos:", options=TERMS, default=TERMS, key="cohort_terms")
+            with col3:
+                cohort_departments = st.multiselect(
+                    "Departamentos:",
+                    options=DEPARTMENT_NAMES,
+                    default=DEPARTMENT_NAMES,
+                    format_func=department_labels.get,
+                    key="cohort_departments"
+                )
+
+            cohort_counts = funnel_engine.query((), *cohort_years, cohort_terms, cohort_departments)
+            if cohort_counts['Applications'] == 0:
+                st.warning("⚠️ No hay aplicantes en las cohortes seleccionadas")
+            else:
+                cohort_data = stage_table(cohort_counts)
+                col1, col2 = st.columns([2, 1])
+
+                with col1:
+                    st.plotly_chart(charts.funnel_chart(cohort_data), use_container_width=True)
+
+                with col2:
+                    st.markdown("### 📈 Transiciones")
+                    stages = cohort_data.to_dict(orient='records')
+                    for previous, current in zip(stages, stages[1:]):
+                        rate = current['Cantidad'] / previous['Cantidad'] * 100 if previous['Cantidad'] else 0.0
+                        st.metric(f"{previous['Etapa']} → {current['Etapa']}", f"{rate:.1f}%")
+
         st.markdown("---")
-        
+
         # Tabla de evolución histórica
         st.subheader("📅 Evolución Histórica Año por Año")
-        
-        historical_data = df.groupby('Year').agg({
-            'Applications': 'sum',
-            'Admitted': 'sum',
-            'Enrolled': 'sum',
-            'Retention Rate (%)': 'mean',
-            'Student Satisfaction (%)': 'mean'
-        }).reset_index()
-        
-        historical_data.columns = ['Año', 'Aplicaciones', 'Admitidos', 'Matriculados', 
-                                   'Retención (%)', 'Satisfacción (%)']
-        
-        # Formatear números
-        historical_data['Retención (%)'] = historical_data['Retención (%)'].round(1)
-        historical_data['Satisfacción (%)'] = historical_data['Satisfacción (%)'].round(1)
-        
+
+        historical_data = store.memo('historical_table', historical_table, df)
+
         st.dataframe(
             historical_data.style.background_gradient(subset=['Retención (%)', 'Satisfacción (%)'], cmap='RdYlGn'),
             use_container_width=True,
             height=400
         )
-        
+
         # Descarga de datos
         csv = historical_data.to_csv(index=False).encode('utf-8')
         st.download_button(
@@ -828,200 +706,145 @@ with tab4:
             file_name='resumen_historico_universidad.csv',
             mime='text/csv',
         )
-    
+
     elif analysis_type == "🔍 Análisis Predictivo":
         st.subheader("🔮 Proyecciones y Análisis de Tendencias")
-        
+
         st.info("📊 Este análisis muestra las tendencias actuales y proyecciones basadas en datos históricos")
-        
-        # Análisis de tendencias
-        df_yearly_pred = df.groupby('Year').agg({
-            'Retention Rate (%)': 'mean',
-            'Student Satisfaction (%)': 'mean',
-            'Enrolled': 'sum'
-        }).reset_index()
-        
-        # Calcular tasas de crecimiento
-        retention_growth_rate = (df_yearly_pred['Retention Rate (%)'].iloc[-1] - 
-                                df_yearly_pred['Retention Rate (%)'].iloc[0]) / len(df_yearly_pred)
-        satisfaction_growth_rate = (df_yearly_pred['Student Satisfaction (%)'].iloc[-1] - 
-                                   df_yearly_pred['Student Satisfaction (%)'].iloc[0]) / len(df_yearly_pred)
-        enrollment_growth_rate = (df_yearly_pred['Enrolled'].iloc[-1] - 
-                                 df_yearly_pred['Enrolled'].iloc[0]) / df_yearly_pred['Enrolled'].iloc[0] / len(df_yearly_pred)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric(
-                "📈 Crecimiento Anual - Retención",
-                f"+{retention_growth_rate:.2f}%",
-                delta="por año"
-            )
-        
-        with col2:
-            st.metric(
-                "😊 Crecimiento Anual - Satisfacción",
-                f"+{satisfaction_growth_rate:.2f}%",
-                delta="por año"
-            )
-        
-        with col3:
-            st.metric(
-                "👥 Crecimiento Anual - Matrícula",
-                f"+{enrollment_growth_rate*100:.1f}%",
-                delta="por año"
-            )
-        
-        st.markdown("---")
-        
-        # Proyección simple para próximos 3 años
-        st.subheader("🎯 Proyección para los Próximos 3 Años")
-        
-        last_year = df_yearly_pred['Year'].iloc[-1]
-        future_years = [last_year + 1, last_year + 2, last_year + 3]
-        
-        projected_retention = [
-            df_yearly_pred['Retention Rate (%)'].iloc[-1] + retention_growth_rate * i 
-            for i in range(1, 4)
-        ]
-        projected_satisfaction = [
-            df_yearly_pred['Student Satisfaction (%)'].iloc[-1] + satisfaction_growth_rate * i 
-            for i in range(1, 4)
-        ]
-        projected_enrollment = [
-            int(df_yearly_pred['Enrolled'].iloc[-1] * (1 + enrollment_growth_rate) ** i)
-            for i in range(1, 4)
-        ]
-        
-        projection_df = pd.DataFrame({
-            'Año': future_years,
-            'Retención Proyectada (%)': [round(x, 1) for x in projected_retention],
-            'Satisfacción Proyectada (%)': [round(x, 1) for x in projected_satisfaction],
-            'Matrícula Proyectada': projected_enrollment
-        })
-        
-        # Gráfico de proyección
-        fig_proj = go.Figure()
-        
-        # Datos históricos
-        fig_proj.add_trace(go.Scatter(
-            x=df_yearly_pred['Year'],
-            y=df_yearly_pred['Retention Rate (%)'],
-            name='Retención (Histórico)',
-            mode='lines+markers',
-            line=dict(color='#0077B6', width=3)
-        ))
-        
-        # Proyección
-        fig_proj.add_trace(go.Scatter(
-            x=[last_year] + future_years,
-            y=[df_yearly_pred['Retention Rate (%)'].iloc[-1]] + projected_retention,
-            name='Retención (Proyección)',
-            mode='lines+markers',
-            line=dict(color='#0077B6', width=3, dash='dash')
-        ))
-        
-        fig_proj.add_trace(go.Scatter(
-            x=df_yearly_pred['Year'],
-            y=df_yearly_pred['Student Satisfaction (%)'],
-            name='Satisfacción (Histórico)',
-            mode='lines+markers',
-            line=dict(color='#E63946', width=3)
-        ))
-        
-        fig_proj.add_trace(go.Scatter(
-            x=[last_year] + future_years,
-            y=[df_yearly_pred['Student Satisfaction (%)'].iloc[-1]] + projected_satisfaction,
-            name='Satisfacción (Proyección)',
-            mode='lines+markers',
-            line=dict(color='#E63946', width=3, dash='dash')
-        ))
-        
-        fig_proj.update_layout(
-            title="<b>Proyección de Indicadores de Calidad</b>",
-            height=450,
-            xaxis_title="<b>Año</b>",
-            yaxis_title="<b>Porcentaje (%)</b>",
-            hovermode='x unified',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        
-        st.plotly_chart(fig_proj, use_container_width=True)
-        
-        st.dataframe(projection_df, use_container_width=True)
-        
+
+        # Proyecciones calculadas en segundo plano
+        if projection_future is None:
+            projection_future = scheduler.submit('projection', store.memo, 'projection',
+                                                 lambda: workers.projection_section(df, growth=growth_table))
+        projection_slot = st.empty()
+        projection_slot.caption("⏳ Calculando proyecciones...")
+
+        def render_projection(result):
+            growth_rates, projection, fig_proj = result
+            with projection_slot.container():
+                col1, col2, col3 = st.columns(3)
+
+                with col1:
+                    st.metric(
+                        "📈 Crecimiento Anual - Retención",
+                        f"+{growth_rates['retention']:.2f}%",
+                        delta="por año"
+                    )
+
+                with col2:
+                    st.metric(
+                        "😊 Crecimiento Anual - Satisfacción",
+                        f"+{growth_rates['satisfaction']:.2f}%",
+                        delta="por año"
+                    )
+
+                with col3:
+                    st.metric(
+                        "👥 Crecimiento Anual - Matrícula",
+                        f"+{growth_rates['enrollment']*100:.1f}%",
+                        delta="por año"
+                    )
+
+                st.markdown("---")
+
+                # Proyección simple para próximos 3 años
+                st.subheader("🎯 Proyección para los Próximos 3 Años")
+
+                st.plotly_chart(fig_proj, use_container_width=True)
+
+                st.dataframe(projection.round(1), use_container_width=True)
+
+        pending[projection_future] = render_projection
+
         st.warning("""
-        ⚠️ **Nota importante:** Estas proyecciones son estimaciones basadas en tendencias históricas lineales 
+        ⚠️ **Nota importante:** Estas proyecciones son estimaciones basadas en tendencias históricas lineales
         y asumen que las condiciones actuales se mantendrán. Factores externos pueden alterar estas predicciones.
         """)
-    
+
+    elif analysis_type == "🧪 Simulador de Escenarios":
+        st.subheader("🧪 Simulador de Escenarios")
+
+        st.info("📊 Ajusta las tasas del proceso de admisión y la mezcla departamental para ver su efecto "
+                "sobre el embudo, la distribución y la proyección de matrícula de todo el histórico")
+
+        scenario_simulator()
+
     else:  # Recomendaciones
         st.subheader("💡 Recomendaciones Estratégicas Basadas en Datos")
-        
-        # Análisis para recomendaciones
-        df_analysis = df.groupby('Year').agg({
-            'Retention Rate (%)': 'mean',
-            'Student Satisfaction (%)': 'mean',
-            'Enrolled': 'sum',
-            'Engineering Enrolled': 'sum',
-            'Business Enrolled': 'sum',
-            'Arts Enrolled': 'sum',
-            'Science Enrolled': 'sum'
-        })
-        
+
+        # Correlaciones de todas las métricas, una vez por versión de los datos
+        correlation = store.memo('correlation', CorrelationEngine.from_pyramid, pyramid)
+        satisfaction_retention = correlation.corr.loc['Student Satisfaction (%)', 'Retention Rate (%)']
+
         # Identificar áreas de oportunidad
         st.markdown("### 🎯 Áreas de Fortaleza")
-        
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
             st.success("""
             **✅ Retención Estudiantil**
             - Tendencia positiva sostenida
             - Actualmente en niveles excelentes (>88%)
             - Mejora continua año tras año
-            
-            **Recomendación:** Mantener y documentar las prácticas actuales que generan 
+
+            **Recomendación:** Mantener y documentar las prácticas actuales que generan
             estos resultados para replicarlas en áreas de mejora.
             """)
-        
+
         with col2:
-            st.success("""
+            st.success(f"""
             **✅ Satisfacción Estudiantil**
             - Crecimiento constante
             - Niveles superiores al 85%
-            - Alta correlación con retención
-            
-            **Recomendación:** Realizar estudios cualitativos para identificar los factores 
+            - Correlación {strength(satisfaction_retention)} con retención (r = {satisfaction_retention:.2f})
+
+            **Recomendación:** Realizar estudios cualitativos para identificar los factores
             específicos que más contribuyen a la satisfacción.
             """)
-        
+
+        st.markdown("---")
+        st.markdown("### 🔗 Correlaciones entre Indicadores")
+
+        fig_corr = store.memo('correlation_heatmap', charts.correlation_heatmap, correlation.corr, LABELS)
+        st.plotly_chart(fig_corr, use_container_width=True)
+
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            st.markdown("**Factores asociados a la retención** (el rezago indica cuántos períodos se adelantan)")
+            drivers = correlation.drivers('Retention Rate (%)').round(2)
+            drivers['Métrica'] = drivers['Métrica'].map(LABELS)
+            st.dataframe(drivers, use_container_width=True, hide_index=True)
+
+        with col2:
+            rolling = correlation.rolling_pair('Student Satisfaction (%)', 'Retention Rate (%)')
+            st.metric(
+                f"Satisfacción ~ Retención (últimos {ROLLING_WINDOW} períodos)",
+                f"r = {rolling.iloc[-1]:.2f}",
+                delta=f"{rolling.iloc[-1] - satisfaction_retention:+.2f} vs. histórico",
+                delta_color="off"
+            )
+            st.caption("Calculado sobre cada período (año y semestre) de los datos; "
+                       "una correlación no implica causalidad.")
+
         st.markdown("---")
         st.markdown("### 🔍 Oportunidades de Mejora")
-        
+
         # Identificar departamento con menor crecimiento
-        dept_growth = {
-            'Ingeniería': ((df_analysis['Engineering Enrolled'].iloc[-1] / 
-                          df_analysis['Engineering Enrolled'].iloc[0]) - 1) * 100,
-            'Negocios': ((df_analysis['Business Enrolled'].iloc[-1] / 
-                        df_analysis['Business Enrolled'].iloc[0]) - 1) * 100,
-            'Artes': ((df_analysis['Arts Enrolled'].iloc[-1] / 
-                      df_analysis['Arts Enrolled'].iloc[0]) - 1) * 100,
-            'Ciencias': ((df_analysis['Science Enrolled'].iloc[-1] / 
-                        df_analysis['Science Enrolled'].iloc[0]) - 1) * 100
-        }
-        
+        dept_growth = store.memo('department_growth_overall', department_growth_overall, df, growth_table)
+
         min_growth_dept = min(dept_growth.items(), key=lambda x: x[1])
         max_growth_dept = max(dept_growth.items(), key=lambda x: x[1])
-        
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
             st.warning(f"""
             **⚠️ Departamento de {min_growth_dept[0]}**
             - Crecimiento del {min_growth_dept[1]:.1f}%
             - Menor crecimiento relativo
-            
+
             **Recomendaciones:**
             1. Revisar oferta de programas académicos
             2. Actualizar curriculum según demanda del mercado
@@ -1029,25 +852,25 @@ with tab4:
             4. Establecer alianzas con sector productivo
             5. Evaluar infraestructura y recursos disponibles
             """)
-        
+
         with col2:
             st.info(f"""
             **📚 Benchmarking Interno**
-            
-            El departamento de **{max_growth_dept[0]}** ha crecido **{max_growth_dept[1]:.1f}%**, 
+
+            El departamento de **{max_growth_dept[0]}** ha crecido **{max_growth_dept[1]:.1f}%**,
             siendo el más exitoso.
-            
-            **Recomendación:** Analizar y replicar las mejores prácticas de este departamento 
+
+            **Recomendación:** Analizar y replicar las mejores prácticas de este departamento
             en las áreas con menor desempeño. Considerar:
             - Estrategias de reclutamiento
             - Calidad de profesores
             - Recursos tecnológicos
             - Vinculación con la industria
             """)
-        
+
         st.markdown("---")
         st.markdown("### 🚀 Plan de Acción Sugerido")
-        
+
         action_plan = pd.DataFrame({
             'Prioridad': ['🔴 Alta', '🟡 Media', '🟢 Baja'],
             'Área': ['Crecimiento Departamental', 'Proceso de Admisión', 'Infraestructura'],
@@ -1059,14 +882,14 @@ with tab4:
             'Impacto Esperado': ['Alto - +15% matrícula', 'Medio - +5% conversión', 'Alto - Sostenibilidad'],
             'Plazo': ['12-18 meses', '6-12 meses', '18-24 meses']
         })
-        
+
         st.dataframe(action_plan, use_container_width=True, hide_index=True)
-        
+
         st.markdown("---")
         st.markdown("### 📊 Indicadores de Seguimiento Recomendados")
-        
+
         col1, col2, col3 = st.columns(3)
-        
+
         with col1:
             st.markdown("""
             **KPIs Trimestrales:**
@@ -1075,7 +898,7 @@ with tab4:
             - Tasa de graduación
             - Empleabilidad egresados
             """)
-        
+
         with col2:
             st.markdown("""
             **KPIs Semestrales:**
@@ -1084,7 +907,7 @@ with tab4:
             - Inversión en infraestructura
             - Publicaciones académicas
             """)
-        
+
         with col3:
             st.markdown("""
             **KPIs Anuales:**
@@ -1100,14 +923,21 @@ st.header("🗂️ Explorador de Datos Completo")
 
 with st.expander("📋 Ver todos los datos del dataset", expanded=False):
     st.dataframe(df, use_container_width=True, height=400)
-    
+
     # Estadísticas descriptivas
     st.subheader("📊 Estadísticas Descriptivas")
-    st.dataframe(df.describe(), use_container_width=True)
-    
+    st.dataframe(data_summary.describe(), use_container_width=True)
+    # Cada sesión guarda solo sus filtros; lo pesado es del proceso
+    session_bytes = sum(session_footprint(st.session_state, shared=(pool, store)).values())
+    shared_memory = store.memory_usage()
+    st.caption(f"💾 Memoria de esta sesión: {session_bytes / 1024:.1f} KB · "
+               f"resultados compartidos: {shared_memory['memo'] / 2 ** 20:.1f} MB "
+               f"de {shared_memory['memo_budget'] / 2 ** 20:.0f} MB · "
+               f"dataset mapeado: {shared_memory['mapped'] / 2 ** 20:.2f} MB")
+
     # Descarga completa
-    csv_full = df.to_csv(index=False).encode('utf-8')
-    st.download_button(
+    download_slot = st.empty()
+    pending[csv_future] = lambda csv_full: download_slot.download_button(
         label="📥 Descargar Dataset Completo (CSV)",
         data=csv_full,
         file_name='university_student_data_complete.csv',
@@ -1136,4 +966,7 @@ st.markdown("""
     <p><b>Desarrollado por:</b> Alejandro Escorcia & Ashley Urueta</p>
     <p>Dashboard Interactivo de Análisis Universitario | Visualización de Datos y Despliegue</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Completar las secciones costosas a medida que terminan
+workers.drain(pending, status=st.empty())
@@ -0,0 +1,35 @@
+"""Núcleo analítico del Dashboard Universitario.
+
+Expone las funciones puras de cálculo (``core``) y la construcción de
+figuras (``charts``) para que la capa de Streamlit sea solo de
+presentación.
+"""
+from .aggregation import aggregate, merge_partials, weighted_rate
+from .core import (
+    COUNT_COLUMNS,
+    DATA_PATH,
+    DEPARTMENT_COLUMNS,
+    DEPARTMENTS,
+    METRIC_LABELS,
+    RATE_COLUMNS,
+    TERMS,
+    conversion_rates,
+    department_growth,
+    department_growth_overall,
+    department_shares,
+    department_trend,
+    executive_summary,
+    filter_years,
+    forecast,
+    funnel_table,
+    header_kpis,
+    historical_table,
+    load_dataset,
+    metric_by_year_term,
+    term_comparison,
+    term_differences,
+    yearly_rollup,
+)
+from .growth import GrowthTable
+from .sketches import DatasetSummary, ingest, summarize
+from .validation import DataValidationError, validate
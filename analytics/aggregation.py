@@ -0,0 +1,66 @@
+"""Agregación exacta de tasas mediante pares numerador/denominador.
+
+Una tasa por período (por ejemplo ``Retention Rate (%)``) no puede
+promediarse sin ponderar: los períodos tienen distinto número de
+matriculados. Aquí cada tasa se guarda como su numerador (estudiantes
+retenidos o satisfechos) junto a su denominador (``Enrolled``); ambos se
+suman, así que los parciales de bloques, particiones o workers se combinan
+con una simple suma y el resultado coincide con el de recorrer todos los
+datos.
+"""
+import pandas as pd
+
+KEY_COLUMNS = ['Year', 'Term']
+
+# tasa -> (numerador, denominador)
+RATE_PAIRS = {
+    'Retention Rate (%)': ('Retained', 'Enrolled'),
+    'Student Satisfaction (%)': ('Satisfied', 'Enrolled'),
+}
+NUMERATOR_COLUMNS = [numerator for numerator, _ in RATE_PAIRS.values()]
+
+
+def with_numerators(df):
+    """Agrega al DataFrame las columnas numerador de cada tasa presente."""
+    numerators = {
+        numerator: df[rate] * df[denominator] / 100
+        for rate, (numerator, denominator) in RATE_PAIRS.items()
+        if rate in df and denominator in df
+    }
+    return df.assign(**numerators)
+
+
+def partial_aggregate(df, by):
+    """Sumas parciales (conteos, departamentos y numeradores) por grupo."""
+    df = with_numerators(df)
+    columns = [
+        col for col in df.select_dtypes(include='number').columns
+        if col not in KEY_COLUMNS and col not in RATE_PAIRS
+    ]
+    return df.groupby(by)[columns].sum()
+
+
+def merge_partials(partials):
+    """Combina parciales con la misma clave sumándolos."""
+    combined = pd.concat(partials)
+    return combined.groupby(level=list(range(combined.index.nlevels))).sum()
+
+
+def finalize(partial):
+    """Reconstruye las tasas (en %) y deja la clave como columnas."""
+    result = partial.copy()
+    for rate, (numerator, denominator) in RATE_PAIRS.items():
+        if numerator in result:
+            result[rate] = result[numerator] / result[denominator] * 100
+    return result.drop(columns=[col for col in NUMERATOR_COLUMNS if col in result]).reset_index()
+
+
+def aggregate(df, by):
+    """Agregado exacto por grupo: conteos sumados y tasas ponderadas."""
+    return finalize(partial_aggregate(df, by))
+
+
+def weighted_rate(df, rate):
+    """Tasa global ponderada por su denominador."""
+    numerator, denominator = RATE_PAIRS[rate]
+    return (df[rate] * df[denominator]).sum() / df[denominator].sum()
@@ -0,0 +1,298 @@
+"""API REST/JSON local con los agregados del dashboard.
+
+Expone por HTTP las mismas cifras que muestra el dashboard, calculadas
+sobre el mismo ``SharedStore`` (``analytics.store.open_store``): en un
+proceso aparte comparte con el dashboard los archivos mapeados de la
+versión actual de los datos; montada en el mismo proceso usa además la
+misma instancia, con el dataset, la pirámide y la tabla de crecimiento ya
+calculados (las figuras del dashboard y las respuestas de la API son
+entradas distintas del memo). Cada respuesta se serializa una sola vez por
+versión de los datos y filtro, y lleva un ``ETag`` con la versión; si
+alguna etiqueta de ``If-None-Match`` coincide (o es ``*``) se responde
+``304`` sin cuerpo. La versión
+vigente la mantiene un ``DataWatcher``, así que atender una petición
+repetida es buscar bytes ya listos en el memo; una versión que no pasa la
+validación no se publica y se sigue sirviendo la anterior. Lo mismo vale
+para el archivo de eventos del embudo, con su propio vigilante. Las
+respuestas se calculan en el pool de hilos de Starlette: una petición que
+abre una versión nueva no detiene al resto.
+
+Rutas (todas GET, parámetros opcionales)::
+
+    /api/version
+    /api/kpis
+    /api/yearly?start=2018&end=2024
+    /api/terms?years=2015,2024
+    /api/departments?start=2018&end=2024
+    /api/growth?start=2018&end=2024
+    /api/funnel?start=2018&end=2024&terms=Fall&departments=Arts,Science
+
+Uso::
+
+    python -m analytics.api --port 8502
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from contextlib import asynccontextmanager
+
+import pandas as pd
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Route
+
+from .core import DATA_PATH, conversion_rates, department_shares, header_kpis, term_differences
+from .funnel import DEPARTMENT_NAMES, EVENTS_PATH, TERMS, FunnelEngine
+from .growth import GrowthTable
+from .store import Memo, open_store
+from .validation import DataValidationError
+from .versioning import DataWatcher, data_fingerprint
+
+PORT = 8502
+# Etiquetas de una lista ``If-None-Match``: ``"x"`` o ``W/"x"``, separadas por comas
+ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+class BadRequest(ValueError):
+    """Parámetro de consulta inválido (respuesta 400)."""
+
+
+def _to_json(value):
+    # Escalares de numpy/pandas a tipos nativos
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def _clean(value):
+    # NaN (p. ej. porcentajes de un rango vacío) no es JSON válido
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clean(item) for item in value]
+    return value
+
+
+def _int(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"'{name}' debe ser un año entero") from None
+
+
+def _list(params, name, choices=None, cast=str):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        items = [cast(item) for item in value.split(',') if item]
+    except ValueError:
+        raise BadRequest(f"'{name}' tiene valores inválidos") from None
+    if choices is not None and not set(items) <= set(choices):
+        raise BadRequest(f"'{name}' admite: {', '.join(choices)}")
+    # El orden no cambia el resultado: una sola entrada de cache por conjunto
+    return sorted(set(items))
+
+
+def not_modified(if_none_match, etag):
+    """``If-None-Match`` incluye ``etag``: comparación débil, ``W/`` se ignora."""
+    if if_none_match.strip() == '*':
+        return True
+    return etag in ENTITY_TAG.findall(if_none_match)
+
+
+def _records(df):
+    return df.to_dict(orient='records')
+
+
+# Cada endpoint: parámetros normalizados -> función que arma la respuesta
+def _version(api, store, params):
+    return {'data_version': store.version}
+
+
+def _kpis(api, store, params):
+    return header_kpis(store.df, api.growth(store))
+
+
+def _yearly(api, store, params):
+    return _records(store.pyramid.rollup('year', params['start'], params['end']))
+
+
+def _terms(api, store, params):
+    years = params['years'] or sorted(store.pyramid.levels['year'].index)
+    df_term = store.pyramid.by_term(years)
+    return {'terms': _records(df_term), 'differences': term_differences(df_term)}
+
+
+def _departments(api, store, params):
+    shares = department_shares(store.pyramid.partial('year', params['start'], params['end']))
+    return _records(shares.drop(columns='Icono'))
+
+
+def _growth(api, store, params):
+    try:
+        table = api.growth(store).range(params['start'], params['end'])
+    except ValueError:
+        # Rango sin años con datos
+        return []
+    return table.reset_index().to_dict(orient='records')
+
+
+def _funnel(api, store, params):
+    engine = api.funnel()
+    if engine is not None:
+        counts = engine.query((), params['start'], params['end'], params['terms'], params['departments'])
+        source = 'events'
+    elif params['departments'] is not None:
+        raise BadRequest("El filtro por departamento requiere eventos por aplicante")
+    else:
+        by_term = store.pyramid.rollup('term', params['start'], params['end'])
+        if params['terms'] is not None:
+            by_term = by_term[by_term['Term'].isin(params['terms'])]
+        counts = by_term[['Applications', 'Admitted', 'Enrolled']].sum()
+        source = 'aggregates'
+    counts = {key: int(value) for key, value in counts.items()}
+    rates = None
+    if counts['Applications'] and counts['Admitted']:
+        rates = conversion_rates(pd.DataFrame([counts]))
+    return {'source': source, 'counts': counts, 'rates': rates}
+
+
+ENDPOINTS = {
+    'version': (_version, {}),
+    'kpis': (_kpis, {}),
+    'yearly': (_yearly, {'start': _int, 'end': _int}),
+    'terms': (_terms, {'years': lambda p, n: _list(p, n, cast=int)}),
+    'departments': (_departments, {'start': _int, 'end': _int}),
+    'growth': (_growth, {'start': _int, 'end': _int}),
+    'funnel': (_funnel, {
+        'start': _int,
+        'end': _int,
+        'terms': lambda p, n: _list(p, n, TERMS),
+        'departments': lambda p, n: _list(p, n, DEPARTMENT_NAMES),
+    }),
+}
+
+
+class AggregatesAPI:
+    """Versión vigente de los datos y respuestas serializadas por filtro."""
+
+    def __init__(self, data_path=DATA_PATH, events_path=EVENTS_PATH, watch=True):
+        self.data_path = data_path
+        self.events_path = events_path
+        self.version = data_fingerprint(data_path)
+        self.events_version = data_fingerprint(events_path) if os.path.exists(events_path) else None
+        self._funnels = Memo(max_entries=2)
+        self._watchers = [
+            DataWatcher(data_path, self._on_change),
+            DataWatcher(events_path, self._on_events_change, optional=True),
+        ] if watch else []
+
+    def _on_change(self, version):
+        # Se abre (y precalienta) la versión nueva antes de servirla
+        store = open_store(self.data_path, version)
+        self.growth(store)
+        self.version = version
+
+    def _on_events_change(self, version):
+        if version is not None:
+            self._funnels.get(version, FunnelEngine.from_csv, self.events_path)
+        self.events_version = version
+
+    def start(self):
+        for watcher in self._watchers:
+            watcher.start()
+
+    def stop(self):
+        for watcher in self._watchers:
+            watcher.stop()
+
+    def store(self):
+        return open_store(self.data_path, self.version)
+
+    def growth(self, store):
+        return store.memo('growth', GrowthTable.from_pyramid, store.pyramid)
+
+    def funnel(self):
+        """Motor de la versión vigente de los eventos por aplicante, si existe el archivo."""
+        if self.events_version is None:
+            return None
+        return self._funnels.get(self.events_version, FunnelEngine.from_csv, self.events_path)
+
+    def response(self, name, query):
+        """(cuerpo JSON, ETag) de un endpoint; calculado una vez por versión y filtro."""
+        build, parsers = ENDPOINTS[name]
+        params = {key: parse(query, key) for key, parse in parsers.items()}
+        if None not in (params.get('start'), params.get('end')) and params['start'] > params['end']:
+            raise BadRequest("'start' no puede ser posterior a 'end'")
+        store = self.store()
+        key = ('api', name) + tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in sorted(params.items()))
+        if name == 'funnel':
+            key += (self.events_version,)
+        return store.memo(key, self._serialize, build, store, params)
+
+    def _serialize(self, build, store, params):
+        body = json.dumps(_clean(build(self, store, params)), ensure_ascii=False, allow_nan=False,
+                          default=_to_json).encode('utf-8')
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        return body, f'"{store.version}-{digest}"'
+
+
+def _endpoint(api, name):
+    async def handle(request):
+        try:
+            # Fuera del event loop: un cálculo nuevo no bloquea otras peticiones
+            body, etag = await run_in_threadpool(api.response, name, request.query_params)
+        except BadRequest as exc:
+            body = json.dumps({'error': str(exc)}, ensure_ascii=False).encode('utf-8')
+            return Response(body, status_code=400, media_type='application/json')
+        except DataValidationError as exc:
+            # Sin una versión válida de los datos que servir
+            body = json.dumps({'error': "Datos inválidos", 'problems': exc.problems}, ensure_ascii=False)
+            return Response(body.encode('utf-8'), status_code=503, media_type='application/json')
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if not_modified(request.headers.get('if-none-match', ''), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='application/json', headers=headers)
+    return handle
+
+
+def routes(api):
+    """Rutas de la API, para servirlas solas o montarlas junto al dashboard."""
+    return [Route(f'/api/{name}', _endpoint(api, name), methods=['GET']) for name in ENDPOINTS]
+
+
+def create_app(data_path=DATA_PATH, events_path=EVENTS_PATH, watch=True):
+    api = AggregatesAPI(data_path, events_path, watch=watch)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        api.start()
+        yield
+        api.stop()
+
+    return Starlette(routes=routes(api), lifespan=lifespan)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API REST/JSON local con los agregados del dashboard.")
+    parser.add_argument('--data', default=DATA_PATH, help="CSV o carpeta particionada")
+    parser.add_argument('--events', default=EVENTS_PATH, help="CSV de eventos por aplicante (opcional)")
+    parser.add_argument('--host', default='localhost', help="Dirección local")
+    parser.add_argument('--port', type=int, default=PORT, help="Puerto")
+    args = parser.parse_args(argv)
+
+    uvicorn.run(create_app(args.data, args.events), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,471 @@
+"""Valores de referencia y presupuestos de tiempo y tamaño por sección.
+
+Construye cada figura del dashboard (``fig1``–``fig10``, ``fig_funnel``,
+``fig_proj``) y los KPIs del encabezado como lo hace la app (pirámide de
+agregados, ``GrowthTable``) sobre fixtures de tamaño creciente: el
+dataset base repetido con años desplazados, ``SCALES`` veces. En cada
+fixture y sección se verifica:
+
+- que los números coinciden con la ruta de referencia (las funciones de
+  ``analytics.core`` sobre el DataFrame completo, sin caches ni motores);
+- que coinciden con los valores de referencia de la fixture, guardados
+  en ``golden/x<escala>.json`` (los datos de cada traza y los KPIs,
+  legibles, para ver qué cambió);
+- que el paso de datos de la app (el mejor de ``--repeat`` corridas) no
+  supera ``max_ratio`` veces el de la referencia medida en la misma
+  corrida, con ``max_ratio`` a lo sumo 1, y que el tamaño de la figura
+  serializada no supera su presupuesto de ``budgets.json``.
+
+Las mismas verificaciones corren como pruebas en ``tests/test_budgets.py``.
+
+El comando termina con código 1 si algo falla. ``--update`` vuelve a
+medir y reescribe los valores de referencia y los presupuestos (con
+margen) cuando un cambio es intencional.
+
+Uso::
+
+    python -m analytics.budgets
+    python -m analytics.budgets --update
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import charts
+from .core import (
+    DATA_PATH,
+    DEPARTMENT_COLUMNS,
+    DEPARTMENTS,
+    METRIC_LABELS,
+    department_shares,
+    department_trend,
+    executive_summary,
+    forecast,
+    funnel_table,
+    header_kpis,
+    metric_by_year_term,
+    term_comparison,
+    yearly_rollup,
+)
+from .core import department_growth as growth_by_department
+from .growth import GrowthTable
+from .pyramid import LUSTRUM, MAX_POINTS, RollupPyramid
+from .workers import projection_section
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), 'budgets.json')
+# Un JSON de valores de referencia por fixture (x1.json, x10.json, ...)
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'golden')
+# Veces que se repite el dataset base en cada fixture
+SCALES = (1, 10, 100, 1000)
+REPEAT = 7
+# Margen de los presupuestos al regenerarlos con --update: la razón
+# ruta de la app / referencia se multiplica por RATIO_HEADROOM, sin pasar
+# nunca de 1 (la ruta de la app no puede ser más lenta que la referencia)
+RATIO_HEADROOM = 1.5
+# Mediciones por fixture al regenerar los presupuestos
+UPDATE_ROUNDS = 3
+PAYLOAD_HEADROOM = 1.1
+DECIMALS = 6
+
+
+def fixture(df, scale):
+    """``df`` repetido ``scale`` veces, cada copia con los años desplazados."""
+    span = int(df['Year'].max() - df['Year'].min() + 1)
+    copies = [df.assign(Year=df['Year'] + span * idx) for idx in range(scale)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def _canonical(value):
+    # Números redondeados y listas planas para comparar y resumir
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return [_canonical(item) for item in np.asarray(value, dtype=object).tolist()]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), DECIMALS)
+    return value
+
+
+def figure_values(fig):
+    """Datos de cada traza de una figura (sin estilo), en forma canónica."""
+    fields = ('x', 'y', 'z', 'labels', 'values', 'text')
+    traces = [trace.to_plotly_json() for trace in fig.data]
+    return [_canonical({field: trace[field] for field in fields if trace.get(field) is not None})
+            for trace in traces]
+
+
+def differences(expected, actual, path=''):
+    """Rutas (``[traza].campo[i]``) donde dos valores canónicos difieren."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        found = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            found += differences(expected.get(key), actual.get(key), f"{path}.{key}")
+        return found
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        found = []
+        for idx, (item, other) in enumerate(zip(expected, actual)):
+            found += differences(item, other, f"{path}[{idx}]")
+        return found
+    return [] if expected == actual else [f"{path or 'valor'}: {expected!r} → {actual!r}"]
+
+
+def _source_hash(df):
+    return hashlib.blake2b(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes(),
+                           digest_size=8).hexdigest()
+
+
+def sections(df):
+    """Secciones a medir: nombre -> (datos como en la app, datos de referencia, salida).
+
+    Los datos de la app se calculan desde el contexto compartido (pirámide
+    y tabla de crecimiento, como el ``SharedStore`` de una versión); los de
+    referencia, con ``analytics.core`` directamente sobre ``df``. La salida
+    (la figura, o los mismos datos si la sección no dibuja) se construye
+    igual en las dos rutas, así que solo se mide el paso de datos.
+    """
+    years = sorted(df['Year'].unique())
+    first, last = int(years[0]), int(years[-1])
+    comparison_years = [first, last]
+    metric = next(iter(METRIC_LABELS))
+
+    def trend(ctx):
+        return ctx['pyramid'].trend(DEPARTMENT_COLUMNS, first, last)
+
+    def trend_reference():
+        by_year = department_trend(df)
+        if last - first + 1 <= MAX_POINTS:
+            return by_year
+        # Rangos largos: promedio anual por bloques de LUSTRUM años, como el nivel lustrum
+        blocks = by_year.groupby(by_year['Year'] // LUSTRUM * LUSTRUM)
+        trend = blocks[DEPARTMENT_COLUMNS].mean().reset_index(drop=True)
+        trend.insert(0, 'Year', [f"{years.min()}–{years.max()}" if len(years) > 1 else str(years.min())
+                                 for _, years in blocks['Year']])
+        trend['Años'] = blocks.size().to_numpy()
+        return trend
+
+    def growth_reference():
+        by_year = department_trend(df)
+        initial, final = by_year.iloc[0], by_year.iloc[-1]
+        return pd.DataFrame({
+            'Departamento': [name for _, name, _, _ in DEPARTMENTS],
+            'Crecimiento (%)': [round((final[col] / initial[col] - 1) * 100, 1) for col in DEPARTMENT_COLUMNS],
+            'Valor Inicial': [initial[col] for col in DEPARTMENT_COLUMNS],
+            'Valor Final': [final[col] for col in DEPARTMENT_COLUMNS],
+            'Incremento': [final[col] - initial[col] for col in DEPARTMENT_COLUMNS],
+        }).sort_values('Crecimiento (%)', ascending=False)
+
+    def unchanged(data):
+        return data
+
+    return {
+        'kpis': (
+            lambda ctx: header_kpis(ctx['df'], ctx['growth']),
+            lambda: header_kpis(df),
+            unchanged,
+        ),
+        'fig1': (
+            lambda ctx: ctx['pyramid'].rollup('year'),
+            lambda: yearly_rollup(df),
+            charts.retention_satisfaction_chart,
+        ),
+        'fig2': (
+            lambda ctx: ctx['pyramid'].rollup('year'),
+            lambda: yearly_rollup(df),
+            charts.enrollment_chart,
+        ),
+        'fig3': (
+            lambda ctx: ctx['pyramid'].rollup('year'),
+            lambda: yearly_rollup(df),
+            charts.admission_trend_chart,
+        ),
+        'fig4': (
+            lambda ctx: ctx['pyramid'].by_term(comparison_years),
+            lambda: term_comparison(df, comparison_years),
+            charts.term_quality_chart,
+        ),
+        'fig5': (
+            lambda ctx: ctx['pyramid'].by_term(comparison_years),
+            lambda: term_comparison(df, comparison_years),
+            charts.term_share_chart,
+        ),
+        'fig6': (
+            lambda ctx: ctx['pyramid'].year_term(comparison_years, [metric]),
+            lambda: metric_by_year_term(df, comparison_years, metric),
+            lambda data: charts.metric_evolution_chart(data, metric),
+        ),
+        'fig7': (
+            lambda ctx: department_shares(ctx['pyramid'].partial('year', first, last)),
+            lambda: department_shares(df, (first, last)),
+            charts.department_bar_chart,
+        ),
+        'fig8': (
+            lambda ctx: department_shares(ctx['pyramid'].partial('year', first, last)),
+            lambda: department_shares(df, (first, last)),
+            charts.department_pie_chart,
+        ),
+        'fig9': (trend, trend_reference, charts.department_trend_chart),
+        'fig10': (
+            lambda ctx: growth_by_department(ctx['growth'], first, last),
+            growth_reference,
+            charts.department_growth_chart,
+        ),
+        'fig_funnel': (
+            lambda ctx: funnel_table(executive_summary(ctx['df'], ctx['growth'])),
+            lambda: funnel_table(executive_summary(df)),
+            charts.funnel_chart,
+        ),
+        'fig_proj': (
+            lambda ctx: forecast(ctx['df'], growth=ctx['growth']),
+            lambda: forecast(df),
+            lambda data: charts.projection_chart(data[0], data[2]),
+        ),
+    }
+
+
+def context(df):
+    """Agregados compartidos de una versión: pirámide y tabla de crecimiento."""
+    pyramid = RollupPyramid.from_frame(df)
+    return {'df': df, 'pyramid': pyramid, 'growth': GrowthTable.from_pyramid(pyramid)}
+
+
+def _values(output):
+    # (valores canónicos, bytes serializados) de una figura o un diccionario
+    if isinstance(output, dict):
+        values = _canonical(output)
+        return values, len(json.dumps(values, ensure_ascii=False).encode('utf-8'))
+    return figure_values(output), len(output.to_json().encode('utf-8'))
+
+
+def _best(fn, repeat):
+    # Mejor tiempo (ms) de ``repeat`` corridas y el último resultado
+    elapsed, _, result, _ = _compare(fn, None, repeat)
+    return elapsed, result
+
+
+def _compare(fn, reference, repeat):
+    # Mejor tiempo (ms) de cada ruta y sus últimos resultados. Las corridas
+    # se alternan para que una variación de la máquina afecte a las dos, y,
+    # como en timeit, sin recolector de basura durante la medición
+    best = [float('inf'), float('inf')]
+    results = [None, None]
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for idx, path in enumerate((fn, reference)):
+                if path is None:
+                    continue
+                start = time.perf_counter()
+                results[idx] = path()
+                best[idx] = min(best[idx], (time.perf_counter() - start) * 1000)
+    finally:
+        if enabled:
+            gc.enable()
+    return best[0], best[1], results[0], results[1]
+
+
+def measure(df, repeat=REPEAT):
+    """Tiempo del paso de datos, tamaño y valores de cada sección y de su referencia.
+
+    La sección ``aggregates`` es la construcción del contexto compartido;
+    su referencia es la suma de las referencias de todas las secciones,
+    que es lo que la app pagaría sin agregados precalculados.
+    """
+    context_ms, ctx = _best(lambda: context(df), repeat)
+    results = {'aggregates': {'time_ms': context_ms}}
+    for name, (data, reference, output) in sections(df).items():
+        elapsed, reference_ms, result, expected = _compare(lambda: data(ctx), reference, repeat)
+        values, size = _values(output(result))
+        results[name] = {
+            'time_ms': elapsed,
+            'reference_ms': reference_ms,
+            'bytes': size,
+            'values': values,
+            'matches_reference': values == _values(output(expected))[0],
+        }
+    results['aggregates']['reference_ms'] = sum(
+        result['reference_ms'] for name, result in results.items() if name != 'aggregates')
+    return results
+
+
+def check(results, budget, golden=None):
+    """Problemas de una fixture frente a sus presupuestos y valores de referencia."""
+    problems = []
+    for name, result in results.items():
+        expected = budget['sections'].get(name)
+        if expected is None:
+            problems.append(f"{name}: sin presupuesto (ejecuta --update)")
+            continue
+        if not result.get('matches_reference', True):
+            problems.append(f"{name}: los números difieren de la ruta de referencia")
+        if golden is not None and 'values' in result:
+            changed = differences(golden.get(name), result['values'])
+            if changed:
+                problems.append(f"{name}: los números cambiaron respecto a los valores de referencia "
+                                f"({len(changed)}): {'; '.join(changed[:3])}")
+        if result['time_ms'] > result['reference_ms'] * expected['max_ratio']:
+            problems.append(f"{name}: {result['time_ms']:.2f} ms supera {expected['max_ratio']}× "
+                            f"la referencia ({result['reference_ms']:.2f} ms)")
+        if 'bytes' in expected and result['bytes'] > expected['bytes']:
+            problems.append(f"{name}: {result['bytes']:,} B supera {expected['bytes']:,} B")
+    return problems
+
+
+def slower_than_reference(results):
+    """Secciones cuya ruta de la app no es más rápida que la de referencia."""
+    return [name for name, result in results.items() if result['time_ms'] > result['reference_ms']]
+
+
+def budget_for(rounds, rows):
+    """Presupuestos (con margen, nunca por encima de la referencia) a partir de varias mediciones.
+
+    Se parte de la peor razón de las ``rounds`` mediciones de la fixture,
+    para que el ruido de una sola corrida no deje un presupuesto demasiado
+    justo.
+    """
+    budget = {'rows': rows, 'sections': {}}
+    for name, result in rounds[0].items():
+        ratio = max(measured[name]['time_ms'] / measured[name]['reference_ms'] for measured in rounds)
+        entry = {'max_ratio': min(round(ratio * RATIO_HEADROOM, 2), 1.0)}
+        if 'bytes' in result:
+            entry['bytes'] = int(np.ceil(result['bytes'] * PAYLOAD_HEADROOM))
+        budget['sections'][name] = entry
+    return budget
+
+
+def golden_for(results):
+    """Valores de referencia (datos de cada traza y KPIs) de una medición."""
+    return {name: result['values'] for name, result in results.items() if 'values' in result}
+
+
+def _json(value, indent=''):
+    # JSON con las listas de números en una sola línea, fácil de comparar en un diff
+    inner = indent + ' '
+    if isinstance(value, dict) and value:
+        items = [f"{inner}{json.dumps(key, ensure_ascii=False)}: {_json(item, inner)}" for key, item in value.items()]
+        return "{\n" + ",\n".join(items) + f"\n{indent}}}"
+    if isinstance(value, list) and any(isinstance(item, (dict, list)) for item in value):
+        return "[\n" + ",\n".join(inner + _json(item, inner) for item in value) + f"\n{indent}]"
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _load(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def load_budgets(path=BUDGETS_PATH):
+    """Presupuestos guardados (``None`` si no existen)."""
+    return _load(path)
+
+
+def golden_path(scale, directory=GOLDEN_DIR):
+    return os.path.join(directory, f"x{scale}.json")
+
+
+def load_golden(scale, directory=GOLDEN_DIR):
+    """Valores de referencia guardados de una fixture (``None`` si no existen)."""
+    return _load(golden_path(scale, directory))
+
+
+def _write(path, value):
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(_json(value) + '\n')
+
+
+def _report(name, rows, results, budget):
+    print(f"\n{name} ({rows:,} filas)")
+    for section, result in results.items():
+        expected = (budget or {}).get('sections', {}).get(section, {})
+        ratio = result['time_ms'] / result['reference_ms']
+        line = f"  {section:<12}{result['time_ms']:>9.2f} ms  (referencia {result['reference_ms']:.2f} ms, ×{ratio:.2f}"
+        if 'max_ratio' in expected:
+            line += f" / ×{expected['max_ratio']}"
+        line += ")"
+        if 'bytes' in result:
+            line += f"  {result['bytes']:>9,} B"
+            if 'bytes' in expected:
+                line += f" / {expected['bytes']:,}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Valores de referencia y presupuestos de tiempo y tamaño de cada figura.")
+    parser.add_argument('--data', default=DATA_PATH, help="Dataset base de las fixtures")
+    parser.add_argument('--budgets', default=BUDGETS_PATH, help="JSON con los presupuestos")
+    parser.add_argument('--golden', default=GOLDEN_DIR, help="Directorio con los valores de referencia por fixture")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="Corridas por sección (se toma la mejor)")
+    parser.add_argument('--update', action='store_true',
+                        help="Reescribir valores de referencia y presupuestos con la medición actual")
+    args = parser.parse_args(argv)
+
+    base = pd.read_csv(args.data)
+    source = _source_hash(base)
+    stored = load_budgets(args.budgets)
+
+    failures = []
+    if not args.update:
+        if stored is None:
+            failures.append(f"No existe {args.budgets} (ejecuta --update)")
+        elif stored['source'] != source:
+            failures.append("El dataset base cambió: revisa los cambios y ejecuta --update")
+    updated = {'source': source, 'fixtures': {}}
+    golden = {}
+    for scale in SCALES:
+        df = fixture(base, scale)
+        name = f"x{scale}"
+        rounds = [measure(df, args.repeat) for _ in range(UPDATE_ROUNDS if args.update else 1)]
+        results = rounds[-1]
+        budget = (stored or {}).get('fixtures', {}).get(name)
+        _report(name, len(df), results, None if args.update else budget)
+        if args.update:
+            mismatched = [section for section, result in results.items()
+                          if not result.get('matches_reference', True)]
+            if mismatched:
+                failures.append(f"{name}: {', '.join(mismatched)} difieren de la referencia; no se actualiza")
+            slower = sorted({section for measured in rounds for section in slower_than_reference(measured)})
+            if slower:
+                failures.append(f"{name}: {', '.join(slower)} son más lentas que la referencia; no se actualiza")
+            updated['fixtures'][name] = budget_for(rounds, len(df))
+            golden[scale] = golden_for(results)
+        elif budget is None:
+            failures.append(f"{name}: sin presupuesto (ejecuta --update)")
+        else:
+            expected = load_golden(scale, args.golden)
+            if expected is None:
+                failures.append(f"{name}: sin valores de referencia (ejecuta --update)")
+            failures.extend(f"{name} · {problem}" for problem in check(results, budget, expected))
+
+    if args.update and not failures:
+        _write(args.budgets, updated)
+        os.makedirs(args.golden, exist_ok=True)
+        for scale, values in golden.items():
+            _write(golden_path(scale, args.golden), values)
+        print(f"\nPresupuestos escritos en {args.budgets} y valores de referencia en {args.golden}")
+
+    if failures:
+        print("\n❌ Fallas:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    if not args.update:
+        print("\n✅ Todas las secciones dentro de presupuesto y con los valores esperados")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,452 @@
+"""Construcción de las figuras Plotly del dashboard.
+
+Cada función recibe los agregados calculados en ``analytics.core`` y
+devuelve una figura lista para ``st.plotly_chart`` o para exportar.
+
+Los datos de las trazas se pasan como arrays de numpy con el tipo entero
+más pequeño que los contiene, para que Plotly los serialice como arrays
+tipados en base64 (``bdata``) en lugar de listas JSON, y las etiquetas se
+generan con ``texttemplate`` sobre ``y`` en lugar de repetir los valores
+en ``text``.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from .core import DEPARTMENTS
+
+# Aplicaciones, admitidos, matriculados y (con eventos por aplicante) retenidos
+FUNNEL_COLORS = ['#0077B6', '#2A9D8F', '#F4A261', '#E63946']
+
+
+def _typed(values):
+    """Array de numpy; los enteros en el tipo más pequeño que los contiene."""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return pd.to_numeric(values, downcast='integer')
+    return values
+
+
+def _typed_frame(df, columns):
+    """Copia de ``df`` con las columnas numéricas dadas compactadas."""
+    return df.assign(**{col: _typed(df[col]) for col in columns})
+
+
+def retention_satisfaction_chart(df_yearly):
+    """fig1: retención y satisfacción por año."""
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(
+        go.Scatter(
+            x=_typed(df_yearly['Year']),
+            y=_typed(df_yearly['Retention Rate (%)']),
+            name="Tasa de Retención",
+            mode='lines+markers',
+            line=dict(color='#0077B6', width=4),
+            marker=dict(size=10, symbol='circle'),
+            hovertemplate='<b>Año %{x}</b><br>Retención: %{y:.1f}%<extra></extra>'
+        ),
+        secondary_y=False
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=_typed(df_yearly['Year']),
+            y=_typed(df_yearly['Student Satisfaction (%)']),
+            name="Satisfacción Estudiantil",
+            mode='lines+markers',
+            line=dict(color='#E63946', width=4),
+            marker=dict(size=10, symbol='diamond'),
+            hovertemplate='<b>Año %{x}</b><br>Satisfacción: %{y:.1f}%<extra></extra>'
+        ),
+        secondary_y=False
+    )
+
+    fig.update_xaxes(title_text="<b>Año Académico</b>", gridcolor='lightgray')
+    fig.update_yaxes(title_text="<b>Porcentaje (%)</b>", secondary_y=False, gridcolor='lightgray')
+    fig.update_layout(
+        height=450,
+        hovermode='x unified',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12)
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='white'
+    )
+    return fig
+
+
+def enrollment_chart(df_yearly):
+    """fig2: matrícula anual con línea de tendencia."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=_typed(df_yearly['Year']),
+        y=_typed(df_yearly['Enrolled']),
+        name='Estudiantes Matriculados',
+        marker_color='#06A77D',
+        textposition='outside',
+        texttemplate='%{y:,}',
+        hovertemplate='<b>%{x}</b><br>Matriculados: %{y:,}<extra></extra>'
+    ))
+
+    # Agregar línea de tendencia
+    fig.add_trace(go.Scatter(
+        x=_typed(df_yearly['Year']),
+        y=_typed(df_yearly['Enrolled']),
+        mode='lines',
+        name='Tendencia',
+        line=dict(color='#023047', width=3, dash='dash'),
+        hovertemplate='<b>Tendencia</b><br>%{y:,}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        height=400,
+        xaxis_title="<b>Año</b>",
+        yaxis_title="<b>Número de Estudiantes</b>",
+        plot_bgcolor='rgba(0,0,0,0)',
+        showlegend=True
+    )
+    return fig
+
+
+def admission_trend_chart(df_yearly):
+    """fig3: aplicaciones, admitidos y matriculados por año."""
+    fig = go.Figure()
+
+    stages = [
+        ('Applications', 'Aplicaciones', '#457B9D', 'rgba(69, 123, 157, 0.2)'),
+        ('Admitted', 'Admitidos', '#F4A261', 'rgba(244, 162, 97, 0.2)'),
+        ('Enrolled', 'Matriculados', '#2A9D8F', 'rgba(42, 157, 143, 0.2)'),
+    ]
+    for col, name, color, fillcolor in stages:
+        fig.add_trace(go.Scatter(
+            x=_typed(df_yearly['Year']),
+            y=_typed(df_yearly[col]),
+            name=name,
+            mode='lines+markers',
+            line=dict(color=color, width=3),
+            fill='tonexty',
+            fillcolor=fillcolor
+        ))
+
+    fig.update_layout(
+        height=400,
+        xaxis_title="<b>Año</b>",
+        yaxis_title="<b>Número de Estudiantes</b>",
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def term_quality_chart(df_term):
+    """fig4: retención y satisfacción por período."""
+    fig = go.Figure()
+
+    metrics = ['Retention Rate (%)', 'Student Satisfaction (%)']
+    colors = ['#0077B6', '#E63946']
+
+    for idx, metric in enumerate(metrics):
+        fig.add_trace(go.Bar(
+            name=metric.replace(' (%)', '').replace('Student ', ''),
+            x=df_term['Term'],
+            y=_typed(df_term[metric]),
+            marker_color=colors[idx],
+            textposition='outside',
+            texttemplate='%{y:.1~f}%'
+        ))
+
+    fig.update_layout(
+        title="<b>Métricas de Calidad por Período</b>",
+        barmode='group',
+        height=400,
+        xaxis_title="<b>Período Académico</b>",
+        yaxis_title="<b>Porcentaje (%)</b>",
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def term_share_chart(df_term):
+    """fig5: distribución de matrícula por período."""
+    fig = px.pie(
+        _typed_frame(df_term, ['Enrolled']),
+        values='Enrolled',
+        names='Term',
+        title='<b>Distribución de Matrícula</b>',
+        hole=0.5,
+        color_discrete_sequence=['#2A9D8F', '#F4A261']
+    )
+
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        textfont_size=14
+    )
+
+    fig.update_layout(height=400)
+    return fig
+
+
+def metric_evolution_chart(df_year_comparison, metric):
+    """fig6: evolución de la métrica seleccionada por (Year, Term)."""
+    fig = px.line(
+        _typed_frame(df_year_comparison, ['Year', metric]),
+        x='Year',
+        y=metric,
+        color='Term',
+        markers=True,
+        title=f"<b>Evolución de {metric.replace(' (%)', '').replace('Student ', '')}</b>",
+        color_discrete_map={'Spring': '#2A9D8F', 'Fall': '#F4A261'}
+    )
+
+    fig.update_traces(line=dict(width=3), marker=dict(size=10))
+    fig.update_layout(
+        height=450,
+        xaxis_title="<b>Año</b>",
+        yaxis_title=f"<b>{metric}</b>",
+        plot_bgcolor='rgba(0,0,0,0)',
+        hovermode='x unified'
+    )
+    return fig
+
+
+def department_bar_chart(dept_data):
+    """fig7: matrícula total por departamento."""
+    fig = px.bar(
+        _typed_frame(dept_data, ['Total Matriculados']),
+        x='Departamento',
+        y='Total Matriculados',
+        title='<b>Matrícula por Departamento</b>',
+        color='Total Matriculados',
+        color_continuous_scale='Viridis'
+    )
+
+    fig.update_traces(
+        texttemplate='%{y:,}',
+        textposition='outside',
+        textfont_size=14
+    )
+
+    fig.update_layout(
+        height=400,
+        showlegend=False,
+        xaxis_title="<b>Departamento</b>",
+        yaxis_title="<b>Estudiantes Matriculados</b>",
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def department_pie_chart(dept_data):
+    """fig8: distribución porcentual por departamento."""
+    fig = go.Figure(data=[go.Pie(
+        labels=dept_data['Departamento'],
+        values=_typed(dept_data['Total Matriculados']),
+        hole=0.5,
+        marker=dict(colors=['#0077B6', '#E63946', '#2A9D8F', '#F4A261']),
+        textinfo='label+percent',
+        textposition='outside',
+        textfont_size=12
+    )])
+
+    fig.update_layout(
+        title='<b>Distribución Porcentual</b>',
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def department_trend_chart(df_dept_trend):
+    """fig9: matriculados por departamento a lo largo de los años.
+
+    Con la serie por lustro de ``RollupPyramid.trend`` (columna ``Años``)
+    el eje muestra los períodos y el promedio anual de cada uno; los
+    períodos de los bordes que cubren menos años van con marcador hueco.
+    """
+    fig = go.Figure()
+    by_period = 'Años' in df_dept_trend
+    if by_period:
+        years = np.asarray(df_dept_trend['Años'])
+        partial = years < years.max()
+
+    for col, name, icon, color in DEPARTMENTS:
+        trace = dict(
+            x=_typed(df_dept_trend['Year']),
+            y=_typed(df_dept_trend[col]),
+            name=f"{name} {icon}",
+            mode='lines+markers',
+            line=dict(width=3, color=color),
+            marker=dict(size=8)
+        )
+        if by_period:
+            trace['customdata'] = _typed(years)
+            trace['hovertemplate'] = "%{y:,.0f} (promedio de %{customdata} años)"
+            trace['marker']['symbol'] = np.where(partial, 'circle-open', 'circle')
+        fig.add_trace(go.Scatter(**trace))
+
+    fig.update_layout(
+        height=450,
+        xaxis_title="<b>Período</b>" if by_period else "<b>Año</b>",
+        yaxis_title="<b>Matriculados por Año (promedio)</b>" if by_period else "<b>Estudiantes Matriculados</b>",
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        )
+    )
+    return fig
+
+
+def department_growth_chart(growth_df):
+    """fig10: porcentaje de crecimiento por departamento."""
+    fig = px.bar(
+        growth_df,
+        x='Departamento',
+        y='Crecimiento (%)',
+        title='<b>Porcentaje de Crecimiento por Departamento</b>',
+        color='Crecimiento (%)',
+        color_continuous_scale='RdYlGn'
+    )
+
+    fig.update_traces(texttemplate='%{y}%', textposition='outside')
+    fig.update_layout(height=350, plot_bgcolor='rgba(0,0,0,0)')
+    return fig
+
+
+def funnel_chart(funnel_data):
+    """fig_funnel: embudo completo de conversión."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Funnel(
+        name='Conversión',
+        y=funnel_data['Etapa'],
+        x=_typed(funnel_data['Cantidad']),
+        textposition="inside",
+        textinfo="value+percent initial",
+        marker=dict(
+            color=FUNNEL_COLORS[:len(funnel_data)],
+            line=dict(width=2, color='white')
+        ),
+        connector=dict(line=dict(color='gray', dash='dot', width=2))
+    ))
+
+    fig.update_layout(
+        title="<b>Proceso de Admisión y Matrícula</b>",
+        height=400
+    )
+    return fig
+
+
+def correlation_heatmap(corr, labels=None):
+    """Mapa de calor de la matriz de correlación (−1 a 1)."""
+    names = [labels.get(col, col) for col in corr.columns] if labels else list(corr.columns)
+    fig = go.Figure(go.Heatmap(
+        z=corr.to_numpy(),
+        x=names,
+        y=names,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        texttemplate='%{z:.2f}',
+        hovertemplate='%{y} ~ %{x}: %{z:.2f}<extra></extra>',
+        colorbar=dict(title='r')
+    ))
+    fig.update_layout(
+        title="<b>Correlación entre Indicadores</b>",
+        height=550,
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+
+def projection_chart(df_yearly_pred, projection):
+    """fig_proj: histórico y proyección de retención y satisfacción."""
+    fig = go.Figure()
+
+    years = _typed(df_yearly_pred['Year'])
+    projected_years = _typed(np.concatenate([years[-1:], projection['Año'].to_numpy()]))
+    series = [
+        ('Retention Rate (%)', 'Retención Proyectada (%)', 'Retención', '#0077B6'),
+        ('Student Satisfaction (%)', 'Satisfacción Proyectada (%)', 'Satisfacción', '#E63946'),
+    ]
+
+    for col, projected_col, label, color in series:
+        # Datos históricos
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=_typed(df_yearly_pred[col]),
+            name=f'{label} (Histórico)',
+            mode='lines+markers',
+            line=dict(color=color, width=3)
+        ))
+
+        # Proyección
+        fig.add_trace(go.Scatter(
+            x=projected_years,
+            y=np.concatenate([df_yearly_pred[col].to_numpy()[-1:], projection[projected_col].to_numpy()]),
+            name=f'{label} (Proyección)',
+            mode='lines+markers',
+            line=dict(color=color, width=3, dash='dash')
+        ))
+
+    fig.update_layout(
+        title="<b>Proyección de Indicadores de Calidad</b>",
+        height=450,
+        xaxis_title="<b>Año</b>",
+        yaxis_title="<b>Porcentaje (%)</b>",
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def scenario_projection_chart(years, yearly_enrolled, projection_years, projections, names):
+    """Matrícula histórica y proyectada de cada escenario (una línea por escenario)."""
+    fig = go.Figure()
+    years = _typed(years)
+    projection_years = _typed(np.concatenate([years[-1:], projection_years]))
+    palette = px.colors.qualitative.Plotly
+
+    for idx, name in enumerate(names):
+        color = palette[idx % len(palette)]
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=_typed(yearly_enrolled[idx].astype(np.int64)),
+            name=name,
+            legendgroup=name,
+            mode='lines',
+            line=dict(color=color, width=3 if idx == 0 else 2)
+        ))
+        fig.add_trace(go.Scatter(
+            x=projection_years,
+            y=_typed(np.concatenate([yearly_enrolled[idx][-1:], projections[idx]]).astype(np.int64)),
+            name=f'{name} (Proyección)',
+            legendgroup=name,
+            showlegend=False,
+            mode='lines+markers',
+            line=dict(color=color, width=3 if idx == 0 else 2, dash='dash')
+        ))
+
+    fig.update_layout(
+        title="<b>Matrícula Histórica y Proyectada por Escenario</b>",
+        height=450,
+        xaxis_title="<b>Año</b>",
+        yaxis_title="<b>Estudiantes Matriculados</b>",
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
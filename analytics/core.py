@@ -0,0 +1,239 @@
+"""Funciones puras de análisis sobre el dataset universitario.
+
+Ninguna función de este módulo usa Streamlit: reciben un DataFrame y
+devuelven DataFrames o diccionarios, por lo que pueden reutilizarse en
+cache, procesos en lote o workers.
+"""
+import pandas as pd
+
+from .aggregation import aggregate, weighted_rate
+from .growth import GrowthTable
+
+DATA_PATH = 'university_student_data.csv'
+
+RATE_COLUMNS = ['Retention Rate (%)', 'Student Satisfaction (%)']
+COUNT_COLUMNS = ['Applications', 'Admitted', 'Enrolled']
+# Períodos en orden cronológico dentro de cada año
+TERMS = ['Spring', 'Fall']
+
+# (columna, nombre, icono, color)
+DEPARTMENTS = [
+    ('Engineering Enrolled', 'Ingeniería', '⚙️', '#0077B6'),
+    ('Business Enrolled', 'Negocios', '💼', '#E63946'),
+    ('Arts Enrolled', 'Artes', '🎨', '#2A9D8F'),
+    ('Science Enrolled', 'Ciencias', '🔬', '#F4A261'),
+]
+DEPARTMENT_COLUMNS = [col for col, _, _, _ in DEPARTMENTS]
+
+METRIC_LABELS = {
+    'Retention Rate (%)': 'Retención',
+    'Student Satisfaction (%)': 'Satisfacción',
+    'Enrolled': 'Matrícula'
+}
+
+
+def load_dataset(path=DATA_PATH, start=None, end=None):
+    """Lee los datos universitarios de un CSV o de una carpeta particionada.
+
+    Con una carpeta particionada solo se leen los años de [start, end].
+    """
+    # Import diferido: ``python -m analytics.partitions`` no debe encontrar
+    # el módulo ya importado por el paquete
+    from .partitions import is_partitioned, load_partitions
+    if is_partitioned(path):
+        return load_partitions(path, start, end)
+    return filter_years(pd.read_csv(path), start, end)
+
+
+def filter_years(df, start=None, end=None):
+    """Filtra el rango de años [start, end]; None deja el extremo abierto."""
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df['Year'] >= start
+    if end is not None:
+        mask &= df['Year'] <= end
+    return df[mask]
+
+
+def header_kpis(df, growth=None):
+    """Indicadores generales del encabezado sobre todo el histórico.
+
+    ``growth`` es la ``GrowthTable`` de ``df`` si ya está calculada.
+    """
+    growth = GrowthTable.from_frame(df) if growth is None else growth
+    satisfaction = growth.growth('Student Satisfaction (%)')
+    applications = growth.growth('Applications')
+    return {
+        'avg_retention': weighted_rate(df, 'Retention Rate (%)'),
+        'max_retention': df['Retention Rate (%)'].max(),
+        'avg_satisfaction': weighted_rate(df, 'Student Satisfaction (%)'),
+        'satisfaction_growth': satisfaction['change'],
+        'total_enrolled': df['Enrolled'].sum(),
+        'admission_rate': df['Admitted'].sum() / df['Applications'].sum() * 100,
+        'total_apps': df['Applications'].sum(),
+        'apps_growth': applications['growth_pct'],
+        'first_year': applications['start'],
+        'last_year': applications['end'],
+    }
+
+
+def yearly_rollup(df, start_year=None, columns=None):
+    """Agregado anual: conteos sumados y tasas ponderadas por matrícula."""
+    if columns is None:
+        columns = RATE_COLUMNS + COUNT_COLUMNS
+    df = filter_years(df, start=start_year)
+    return aggregate(df, 'Year')[['Year'] + columns]
+
+
+def conversion_rates(df):
+    """Tasas de conversión del embudo (en %) a partir de conteos."""
+    applications = df['Applications'].sum()
+    admitted = df['Admitted'].sum()
+    enrolled = df['Enrolled'].sum()
+    return {
+        'admission': admitted / applications * 100,
+        'enrollment': enrolled / admitted * 100,
+        'total': enrolled / applications * 100,
+    }
+
+
+def term_comparison(df, years):
+    """Métricas agregadas por período (Spring/Fall) para los años dados."""
+    df_comparison = df[df['Year'].isin(years)]
+    return aggregate(df_comparison, 'Term')[['Term'] + RATE_COLUMNS + COUNT_COLUMNS]
+
+
+def term_differences(df_term):
+    """Diferencias Fall - Spring; None si falta alguno de los dos períodos."""
+    if len(df_term) != 2:
+        return None
+    spring = df_term[df_term['Term'] == 'Spring'].iloc[0]
+    fall = df_term[df_term['Term'] == 'Fall'].iloc[0]
+    return {
+        'retention': fall['Retention Rate (%)'] - spring['Retention Rate (%)'],
+        'satisfaction': fall['Student Satisfaction (%)'] - spring['Student Satisfaction (%)'],
+        'enrolled': fall['Enrolled'] - spring['Enrolled'],
+    }
+
+
+def metric_by_year_term(df, years, metric):
+    """Serie de una métrica por (Year, Term) para los años dados."""
+    df_comparison = df[df['Year'].isin(years)]
+    return aggregate(df_comparison, ['Year', 'Term'])[['Year', 'Term', metric]]
+
+
+def department_shares(df, year_range=None):
+    """Total de matriculados y porcentaje por departamento, de mayor a menor."""
+    if year_range is not None:
+        df = filter_years(df, *year_range)
+    dept_data = pd.DataFrame({
+        'Departamento': [name for _, name, _, _ in DEPARTMENTS],
+        'Total Matriculados': [df[col].sum() for col in DEPARTMENT_COLUMNS],
+        'Icono': [icon for _, _, icon, _ in DEPARTMENTS]
+    })
+    dept_data['Porcentaje'] = (dept_data['Total Matriculados'] / dept_data['Total Matriculados'].sum() * 100).round(1)
+    return dept_data.sort_values('Total Matriculados', ascending=False)
+
+
+def department_trend(df, year_range=None):
+    """Matriculados por departamento y año."""
+    if year_range is not None:
+        df = filter_years(df, *year_range)
+    return df.groupby('Year')[DEPARTMENT_COLUMNS].sum().reset_index()
+
+
+def department_growth(growth, start=None, end=None):
+    """Crecimiento de cada departamento entre los años [start, end] de una ``GrowthTable``."""
+    growth_data = []
+    for col, name, _, _ in DEPARTMENTS:
+        dept = growth.growth(col, start, end)
+        growth_data.append({
+            'Departamento': name,
+            'Crecimiento (%)': round(dept['growth_pct'], 1),
+            'Valor Inicial': dept['initial'],
+            'Valor Final': dept['final'],
+            'Incremento': dept['change']
+        })
+    return pd.DataFrame(growth_data).sort_values('Crecimiento (%)', ascending=False)
+
+
+def executive_summary(df, growth=None):
+    """Métricas del resumen ejecutivo: admisión, calidad y departamento líder.
+
+    ``growth`` es la ``GrowthTable`` de ``df`` si ya está calculada.
+    """
+    quality = yearly_rollup(df, columns=RATE_COLUMNS) if growth is None else growth.yearly(RATE_COLUMNS)
+    dept_totals = [(df[col].sum(), name) for col, name, _, _ in DEPARTMENTS]
+    leader = max(dept_totals)
+    return {
+        'total_apps': df['Applications'].sum(),
+        'total_admitted': df['Admitted'].sum(),
+        'total_enrolled': df['Enrolled'].sum(),
+        'avg_retention': weighted_rate(df, 'Retention Rate (%)'),
+        'avg_satisfaction': weighted_rate(df, 'Student Satisfaction (%)'),
+        'retention_increasing': quality['Retention Rate (%)'].is_monotonic_increasing,
+        'leader_department': leader[1],
+        'leader_enrolled': leader[0],
+        'department_count': len(DEPARTMENTS),
+    }
+
+
+def funnel_table(totals):
+    """Etapas del embudo con su cantidad y porcentaje sobre aplicaciones."""
+    total_apps = totals['total_apps']
+    return pd.DataFrame({
+        'Etapa': ['Aplicaciones Recibidas', 'Estudiantes Admitidos', 'Estudiantes Matriculados'],
+        'Cantidad': [total_apps, totals['total_admitted'], totals['total_enrolled']],
+        'Porcentaje': [100, (totals['total_admitted'] / total_apps * 100),
+                       (totals['total_enrolled'] / total_apps * 100)]
+    })
+
+
+def historical_table(df):
+    """Tabla histórica año por año con nombres de columna para mostrar."""
+    historical_data = yearly_rollup(df, columns=COUNT_COLUMNS + RATE_COLUMNS)
+    historical_data.columns = ['Año', 'Aplicaciones', 'Admitidos', 'Matriculados',
+                               'Retención (%)', 'Satisfacción (%)']
+    historical_data['Retención (%)'] = historical_data['Retención (%)'].round(1)
+    historical_data['Satisfacción (%)'] = historical_data['Satisfacción (%)'].round(1)
+    return historical_data
+
+
+def forecast(df, horizon=3, growth=None):
+    """Proyección lineal de calidad y compuesta de matrícula.
+
+    Devuelve el agregado anual usado como base, las tasas de crecimiento
+    anuales y la tabla de proyección para los próximos ``horizon`` años.
+    ``growth`` es la ``GrowthTable`` de ``df`` si ya está calculada.
+    """
+    if growth is None:
+        df_yearly = yearly_rollup(df, columns=RATE_COLUMNS + ['Enrolled'])
+        growth = GrowthTable(df_yearly)
+    else:
+        df_yearly = growth.yearly(RATE_COLUMNS + ['Enrolled'])
+    n_years = len(df_yearly)
+    last = df_yearly.iloc[-1]
+    enrolled = growth.growth('Enrolled')
+
+    rates = {
+        'retention': growth.growth('Retention Rate (%)')['change'] / n_years,
+        'satisfaction': growth.growth('Student Satisfaction (%)')['change'] / n_years,
+        'enrollment': enrolled['change'] / enrolled['initial'] / n_years,
+    }
+
+    last_year = int(last['Year'])
+    steps = range(1, horizon + 1)
+    projection = pd.DataFrame({
+        'Año': [last_year + i for i in steps],
+        'Retención Proyectada (%)': [last['Retention Rate (%)'] + rates['retention'] * i for i in steps],
+        'Satisfacción Proyectada (%)': [last['Student Satisfaction (%)'] + rates['satisfaction'] * i for i in steps],
+        'Matrícula Proyectada': [int(last['Enrolled'] * (1 + rates['enrollment']) ** i) for i in steps]
+    })
+    return df_yearly, rates, projection
+
+
+def department_growth_overall(df, growth=None):
+    """Crecimiento (%) de cada departamento entre el primer y el último año."""
+    growth = GrowthTable.from_frame(df) if growth is None else growth
+    overall = growth.range(columns=DEPARTMENT_COLUMNS)['growth_pct']
+    return {name: overall[col] for col, name, _, _ in DEPARTMENTS}
@@ -0,0 +1,159 @@
+"""Correlaciones y factores asociados entre métricas y departamentos.
+
+La matriz de métricas tiene una fila por período (Year × Term, en orden
+cronológico) y una columna por métrica y departamento. Todas las
+correlaciones se calculan por lotes sobre esa matriz, sin recorrer pares:
+
+- la matriz de correlación completa es un producto ``Zᵀ Z`` de las
+  columnas estandarizadas;
+- las correlaciones móviles salen de sumas acumuladas de ``x``, ``x²`` y
+  de los productos ``x·y``; un par (o un bloque de columnas) se calcula
+  solo con sus productos, y el tensor de todos los pares (períodos × k ×
+  k) se arma por lotes de columnas únicamente cuando se pide;
+- las correlaciones cruzadas con rezago ``L`` comparan la matriz con ella
+  misma desplazada ``L`` períodos, un producto de matrices por rezago.
+
+``CorrelationEngine`` se construye una vez por versión de los datos y
+guarda estos resultados.
+"""
+import numpy as np
+import pandas as pd
+
+from .aggregation import finalize
+from .core import COUNT_COLUMNS, DEPARTMENTS, RATE_COLUMNS, TERMS
+
+MAX_LAG = 4
+ROLLING_WINDOW = 6
+# Columnas por lote al armar el tensor móvil de todos los pares
+ROLLING_BATCH = 16
+
+LABELS = {
+    'Applications': 'Aplicaciones',
+    'Admitted': 'Admitidos',
+    'Enrolled': 'Matrícula',
+    'Retention Rate (%)': 'Retención',
+    'Student Satisfaction (%)': 'Satisfacción',
+    **{col: name for col, name, _, _ in DEPARTMENTS},
+}
+
+
+def _standardize(values):
+    # Columnas con media 0 y norma 1: el producto punto es la correlación
+    centered = values - values.mean(axis=0)
+    norm = np.sqrt((centered ** 2).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return centered / norm
+
+
+def _window_sums(values, window):
+    # Sumas de cada ventana de ``window`` filas; ``values`` se reutiliza
+    # para la suma acumulada
+    cumulative = np.cumsum(values, axis=0, out=values)
+    sums = cumulative[window - 1:].copy()
+    sums[1:] -= cumulative[:-window]
+    return sums
+
+
+def _pearson(x, y):
+    """Correlación de cada columna de ``x`` con cada columna de ``y`` (k × k)."""
+    return _standardize(x).T @ _standardize(y)
+
+
+def strength(r):
+    """Descripción de la magnitud de una correlación."""
+    if np.isnan(r):
+        return "sin datos"
+    size = abs(r)
+    kind = "alta" if size >= 0.7 else "moderada" if size >= 0.4 else "baja"
+    return f"{kind} {'positiva' if r >= 0 else 'negativa'}"
+
+
+class CorrelationEngine:
+    """Correlación, correlación móvil y cruzada con rezago de todas las columnas."""
+
+    def __init__(self, matrix, max_lag=MAX_LAG):
+        self.index = matrix.index
+        self.columns = list(matrix.columns)
+        self.values = matrix.to_numpy(dtype=float)
+        self.max_lag = min(max_lag, len(matrix) - 3)
+        self.corr = pd.DataFrame(_pearson(self.values, self.values), index=self.columns, columns=self.columns)
+        # lagged[L][i, j] = corr(x_i(t), x_j(t + L))
+        self.lagged = np.stack([
+            _pearson(self.values[:len(self.values) - lag], self.values[lag:])
+            for lag in range(self.max_lag + 1)
+        ])
+        self._rolling = {}
+
+    @classmethod
+    def from_pyramid(cls, pyramid, columns=None):
+        """Matriz por período (Year × Term) desde la pirámide de agregados."""
+        columns = columns or COUNT_COLUMNS + RATE_COLUMNS + [col for col, _, _, _ in DEPARTMENTS]
+        term = finalize(pyramid.levels['term'])
+        order = term['Term'].astype(str).map({name: idx for idx, name in enumerate(TERMS)})
+        term = term.assign(_order=order).sort_values(['Year', '_order'])
+        index = pd.MultiIndex.from_frame(term[['Year', 'Term']])
+        return cls(term[columns].set_axis(index))
+
+    def _moments(self, window):
+        # Sumas de x y x² por ventana, compartidas por todos los pares
+        if window not in self._rolling:
+            self._rolling[window] = (_window_sums(self.values.copy(), window),
+                                     _window_sums(self.values ** 2, window))
+        return self._rolling[window]
+
+    def rolling_block(self, rows, cols, window=ROLLING_WINDOW):
+        """Correlación móvil de las columnas ``rows`` con ``cols`` (ventanas × filas × columnas)."""
+        s, ss = self._moments(window)
+        x = self.values
+        # Solo los productos del bloque pedido, acumulados en su lugar
+        sp = _window_sums(x[:, rows, None] * x[:, None, cols], window)
+        covariance = sp - s[:, rows, None] * s[:, None, cols] / window
+        variance = ss - s ** 2 / window
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return covariance / np.sqrt(variance[:, rows, None] * variance[:, None, cols])
+
+    def rolling(self, window=ROLLING_WINDOW, batch=ROLLING_BATCH):
+        """Correlación de todos los pares en ventanas móviles (ventanas × k × k).
+
+        Se arma por lotes de ``batch`` columnas: los productos intermedios
+        nunca ocupan más que ventanas × k × ``batch``.
+        """
+        k = len(self.columns)
+        rows = np.arange(k)
+        tensor = np.empty((len(self.values) - window + 1, k, k))
+        for start in range(0, k, batch):
+            cols = rows[start:start + batch]
+            tensor[:, :, cols] = self.rolling_block(rows, cols, window)
+        return tensor
+
+    def rolling_pair(self, a, b, window=ROLLING_WINDOW):
+        """Serie de la correlación móvil entre ``a`` y ``b``, fechada al final de la ventana."""
+        i, j = self.columns.index(a), self.columns.index(b)
+        values = self.rolling_block([i], [j], window)[:, 0, 0]
+        return pd.Series(values, index=self.index[window - 1:], name=f"{a} ~ {b}")
+
+    def cross_correlation(self, a, b):
+        """corr(a(t), b(t + L)) para L en [-max_lag, max_lag]."""
+        i, j = self.columns.index(a), self.columns.index(b)
+        lags = np.arange(-self.max_lag, self.max_lag + 1)
+        values = [self.lagged[-lag, j, i] if lag < 0 else self.lagged[lag, i, j] for lag in lags]
+        return pd.Series(values, index=pd.Index(lags, name='Rezago'))
+
+    def drivers(self, target):
+        """Columnas ordenadas por la correlación más fuerte con ``target``.
+
+        Para cada columna se busca el rezago ``L >= 0`` (la columna adelanta a
+        ``target`` en ``L`` períodos) con mayor correlación absoluta.
+        """
+        j = self.columns.index(target)
+        # lead[L, i] = corr(x_i(t), target(t + L))
+        lead = self.lagged[:, :, j]
+        best = np.argmax(np.where(np.isnan(lead), -1, np.abs(lead)), axis=0)
+        table = pd.DataFrame({
+            'Métrica': self.columns,
+            'Correlación': self.corr[target].to_numpy(),
+            'Rezago (períodos)': best,
+            'Correlación con rezago': lead[best, np.arange(len(self.columns))],
+        })
+        table = table[table['Métrica'] != target]
+        return table.sort_values('Correlación con rezago', key=np.abs, ascending=False).reset_index(drop=True)
@@ -0,0 +1,299 @@
+"""Embudo por cohortes a partir de eventos por aplicante.
+
+Cada evento es una fila ``Applicant ID, Year, Term, Department, Stage``
+con ``Stage`` en ``Applied``, ``Admitted``, ``Enrolled`` o ``Retained``;
+año, período y departamento describen la cohorte de la aplicación. Los
+eventos se leen por bloques en una sola pasada y en cualquier orden: cada
+aplicante distinto recibe una posición densa (un índice ID → posición que
+crece bloque a bloque, así que los IDs pueden ser dispersos) en dos arreglos
+compactos, una máscara de bits con las etapas alcanzadas (``uint8``) y el
+código entero de su cohorte (``int32``). Al consultar, los conteos por
+(Year, Term, Department) salen de un ``bincount`` sobre esos arreglos y se
+guardan hasta el siguiente bloque; cada filtro se resuelve sobre ese cubo
+pequeño y su resultado se memoriza con la clave del filtro.
+
+Uso::
+
+    python -m analytics.funnel --synthesize applicant_events.csv --scale 100
+    python -m analytics.funnel --events applicant_events.csv --by Year Department
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .core import DATA_PATH, DEPARTMENT_COLUMNS, TERMS
+from .store import Memo
+
+EVENTS_PATH = 'applicant_events.csv'
+CHUNK_ROWS = 1_000_000
+
+STAGES = ['Applied', 'Admitted', 'Enrolled', 'Retained']
+# Columnas del resultado: las mismas del dataset agregado más los retenidos
+STAGE_COLUMNS = ['Applications', 'Admitted', 'Enrolled', 'Retained']
+STAGE_LABELS = ['Aplicaciones Recibidas', 'Estudiantes Admitidos',
+                'Estudiantes Matriculados', 'Estudiantes Retenidos']
+DEPARTMENT_NAMES = [col.removesuffix(' Enrolled') for col in DEPARTMENT_COLUMNS]
+COHORT_COLUMNS = ['Year', 'Term', 'Department']
+EVENT_COLUMNS = ['Applicant ID'] + COHORT_COLUMNS + ['Stage']
+
+# Código de cohorte: año, período y departamento empaquetados en un entero
+_TERM_BITS = 1
+_DEPT_BITS = 3
+
+
+def _codes(values, categories, column):
+    known = pd.Index(categories)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Se traducen solo las categorías del bloque, no cada fila
+        lookup = np.append(known.get_indexer(values.cat.categories), -1)
+        codes = lookup[values.cat.codes.to_numpy()]
+    else:
+        codes = known.get_indexer(values)
+    if (codes < 0).any():
+        unknown = sorted({str(value) for value in pd.Series(values)[codes < 0]})
+        raise ValueError(f"Valores desconocidos en '{column}': {', '.join(unknown[:5])}")
+    return codes.astype(np.int32)
+
+
+def _cohort_code(year, term, dept):
+    return (year << (_TERM_BITS + _DEPT_BITS)) | (term << _DEPT_BITS) | dept
+
+
+def filter_key(start=None, end=None, terms=None, departments=None):
+    """Clave normalizada (hashable) de un filtro del embudo."""
+    return (
+        None if start is None else int(start),
+        None if end is None else int(end),
+        None if terms is None else tuple(sorted(terms)),
+        None if departments is None else tuple(sorted(departments)),
+    )
+
+
+class FunnelEngine:
+    """Etapas alcanzadas por aplicante y conteos por cohorte.
+
+    Un aplicante cuenta en una etapa solo si también alcanzó todas las
+    anteriores, de modo que el embudo siempre es decreciente y cada conteo
+    es el número de transiciones desde la etapa previa.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        self._stages = np.zeros(capacity, dtype=np.uint8)
+        self._cohort = np.full(capacity, -1, dtype=np.int32)
+        # IDs vistos (ordenados) y la posición densa de cada uno
+        self._ids = np.empty(0, dtype=np.int64)
+        self._id_slots = np.empty(0, dtype=np.int64)
+        self._count = 0
+        self.events = 0
+        self._cube = None
+        self._results = Memo()
+
+    def _slots(self, ids):
+        """Posición densa de cada ID; los IDs nuevos se agregan al índice."""
+        unique, inverse = np.unique(ids, return_inverse=True)
+        pos = np.searchsorted(self._ids, unique)
+        known = pos < len(self._ids)
+        known[known] = self._ids[pos[known]] == unique[known]
+        slots = np.empty(len(unique), dtype=np.int64)
+        slots[known] = self._id_slots[pos[known]]
+        new = ~known
+        slots[new] = self._count + np.arange(new.sum())
+        if new.any():
+            # Inserción en orden: el índice sigue ordenado para searchsorted
+            self._ids = np.insert(self._ids, pos[new], unique[new])
+            self._id_slots = np.insert(self._id_slots, pos[new], slots[new])
+            self._count += int(new.sum())
+        return slots[inverse]
+
+    def _reserve(self, count):
+        if count <= len(self._stages):
+            return
+        capacity = len(self._stages)
+        while capacity < count:
+            capacity *= 2
+        stages = np.zeros(capacity, dtype=np.uint8)
+        stages[:len(self._stages)] = self._stages
+        cohort = np.full(capacity, -1, dtype=np.int32)
+        cohort[:len(self._cohort)] = self._cohort
+        self._stages, self._cohort = stages, cohort
+
+    def update(self, events):
+        """Incorpora un bloque de eventos (DataFrame con ``EVENT_COLUMNS``)."""
+        if events.empty:
+            return self
+        ids = events['Applicant ID'].to_numpy(dtype=np.int64)
+        if ids.min() < 0:
+            raise ValueError("'Applicant ID' debe ser un entero no negativo")
+        stage = _codes(events['Stage'], STAGES, 'Stage')
+        cohort = _cohort_code(
+            events['Year'].to_numpy(dtype=np.int32),
+            _codes(events['Term'], TERMS, 'Term'),
+            _codes(events['Department'], DEPARTMENT_NAMES, 'Department'),
+        )
+        slots = self._slots(ids)
+        self._reserve(self._count)
+        np.bitwise_or.at(self._stages, slots, (1 << stage).astype(np.uint8))
+        self._cohort[slots] = cohort
+        self.events += len(events)
+        self._cube = None
+        self._results.clear()
+        return self
+
+    @classmethod
+    def from_csv(cls, path, chunksize=CHUNK_ROWS):
+        """Lee un CSV de eventos por bloques de ``chunksize`` filas."""
+        engine = cls()
+        dtypes = {'Applicant ID': np.int64, 'Year': np.int32, 'Term': 'category',
+                  'Department': 'category', 'Stage': 'category'}
+        for chunk in pd.read_csv(path, usecols=EVENT_COLUMNS, dtype=dtypes, chunksize=chunksize):
+            engine.update(chunk)
+        return engine
+
+    @property
+    def applicants(self):
+        return self._count
+
+    def cube(self):
+        """Conteos por etapa de cada cohorte (Year, Term, Department)."""
+        if self._cube is None:
+            self._cube = self._build_cube()
+        return self._cube
+
+    def _build_cube(self):
+        cohort = self._cohort[:self._count]
+        stages = self._stages[:self._count]
+        size = int(cohort.max()) + 1 if len(cohort) else 0
+        counts = {}
+        for idx, column in enumerate(STAGE_COLUMNS):
+            # Etapa alcanzada junto con todas las anteriores
+            required = np.uint8((1 << (idx + 1)) - 1)
+            reached = (stages & required) == required
+            counts[column] = np.bincount(cohort[reached], minlength=size)
+        codes = np.flatnonzero(counts['Applications'])
+        cube = pd.DataFrame({
+            'Year': codes >> (_TERM_BITS + _DEPT_BITS),
+            'Term': pd.Categorical.from_codes((codes >> _DEPT_BITS) & ((1 << _TERM_BITS) - 1), TERMS),
+            'Department': pd.Categorical.from_codes(codes & ((1 << _DEPT_BITS) - 1), DEPARTMENT_NAMES),
+        })
+        for column in STAGE_COLUMNS:
+            cube[column] = counts[column][codes]
+        return cube.set_index(COHORT_COLUMNS)
+
+    def query(self, by=(), start=None, end=None, terms=None, departments=None):
+        """Conteos por etapa agrupados por ``by`` dentro del filtro.
+
+        El resultado se memoriza por filtro y agrupación hasta el siguiente
+        ``update``; no debe modificarse.
+        """
+        key = (tuple(by),) + filter_key(start, end, terms, departments)
+        return self._results.get(key, self._query, list(by), *key[1:])
+
+    def _query(self, by, start, end, terms, departments):
+        cube = self.cube().reset_index()
+        mask = np.ones(len(cube), dtype=bool)
+        if start is not None:
+            mask &= cube['Year'].to_numpy() >= start
+        if end is not None:
+            mask &= cube['Year'].to_numpy() <= end
+        if terms is not None:
+            mask &= cube['Term'].isin(terms).to_numpy()
+        if departments is not None:
+            mask &= cube['Department'].isin(departments).to_numpy()
+        selected = cube[mask]
+        if not by:
+            return selected[STAGE_COLUMNS].sum()
+        return selected.groupby(by, observed=True)[STAGE_COLUMNS].sum()
+
+
+def stage_table(counts):
+    """Etapas del embudo con su cantidad y porcentaje (como ``funnel_table``)."""
+    applications = counts['Applications']
+    return pd.DataFrame({
+        'Etapa': STAGE_LABELS,
+        'Cantidad': [int(counts[column]) for column in STAGE_COLUMNS],
+        'Porcentaje': [counts[column] / applications * 100 if applications else 0.0
+                       for column in STAGE_COLUMNS],
+    })
+
+
+def synthesize_events(df, scale=1, seed=0):
+    """Eventos por aplicante coherentes con los conteos agregados de ``df``.
+
+    Cada fila (Year, Term) se expande en ``Applications × scale``
+    aplicantes; los matriculados se reparten según las columnas de cada
+    departamento y el resto de aplicantes (incluidos los matriculados sin
+    departamento cuando las columnas suman menos que ``Enrolled``) en la
+    misma proporción. Se devuelve un bloque de eventos (en orden
+    aleatorio) por fila.
+    """
+    rng = np.random.default_rng(seed)
+    next_id = 0
+    for row in df.to_dict(orient='records'):
+        applications = int(row['Applications']) * scale
+        admitted = int(row['Admitted']) * scale
+        enrolled = int(row['Enrolled']) * scale
+        retained = round(enrolled * float(row['Retention Rate (%)']) / 100)
+        dept_enrolled = np.array([int(row[col]) * scale for col in DEPARTMENT_COLUMNS])
+        # Resto de aplicantes repartido por cuota mayor (suma exacta)
+        remainder = applications - dept_enrolled.sum()
+        weights = dept_enrolled if dept_enrolled.sum() else np.ones(len(DEPARTMENT_NAMES))
+        quota = weights / weights.sum() * remainder
+        rest = np.floor(quota).astype(int)
+        rest[np.argsort(rest - quota)[:remainder - rest.sum()]] += 1
+        # Los primeros aplicantes de cada fila son los matriculados con
+        # departamento; dentro de cada grupo el departamento se mezcla para
+        # repartir admitidos, matriculados sin departamento y retenidos
+        dept = np.concatenate([
+            rng.permutation(np.repeat(np.arange(len(DEPARTMENT_NAMES)), dept_enrolled)),
+            rng.permutation(np.repeat(np.arange(len(DEPARTMENT_NAMES)), rest)),
+        ])
+        ids = next_id + np.arange(applications)
+        next_id += applications
+        reach = [applications, admitted, enrolled, retained]
+        stage = np.concatenate([np.full(n, idx) for idx, n in enumerate(reach)])
+        applicant = np.concatenate([ids[:n] for n in reach])
+        order = rng.permutation(len(stage))
+        applicant, stage = applicant[order], stage[order]
+        yield pd.DataFrame({
+            'Applicant ID': applicant,
+            'Year': row['Year'],
+            'Term': row['Term'],
+            'Department': np.array(DEPARTMENT_NAMES)[dept[applicant - ids[0]]],
+            'Stage': np.array(STAGES)[stage],
+        })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embudo por cohortes desde eventos por aplicante.")
+    parser.add_argument('--events', default=EVENTS_PATH, help="CSV de eventos por aplicante")
+    parser.add_argument('--by', nargs='*', default=['Year'], choices=COHORT_COLUMNS,
+                        help="Columnas de agrupación")
+    parser.add_argument('--start', type=int, help="Primer año")
+    parser.add_argument('--end', type=int, help="Último año")
+    parser.add_argument('--terms', nargs='+', choices=TERMS, help="Períodos a incluir")
+    parser.add_argument('--departments', nargs='+', choices=DEPARTMENT_NAMES,
+                        help="Departamentos a incluir")
+    parser.add_argument('--synthesize', metavar='OUT',
+                        help="Generar eventos sintéticos desde el dataset agregado en OUT")
+    parser.add_argument('--data', default=DATA_PATH, help="Dataset agregado para --synthesize")
+    parser.add_argument('--scale', type=int, default=1,
+                        help="Aplicantes sintéticos por cada aplicación del dataset")
+    args = parser.parse_args(argv)
+
+    if args.synthesize:
+        rows = 0
+        for idx, chunk in enumerate(synthesize_events(pd.read_csv(args.data), args.scale)):
+            chunk.to_csv(args.synthesize, mode='w' if idx == 0 else 'a', header=idx == 0, index=False)
+            rows += len(chunk)
+        print(f"{rows:,} eventos escritos en {args.synthesize}")
+        return
+
+    engine = FunnelEngine.from_csv(args.events)
+    result = engine.query(args.by, args.start, args.end, args.terms, args.departments)
+    print(f"{engine.events:,} eventos, {engine.applicants:,} aplicantes")
+    print(result.to_string())
+
+
+if __name__ == '__main__':
+    main()
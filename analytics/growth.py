@@ -0,0 +1,103 @@
+"""Tabla materializada de crecimiento por año, métrica y departamento.
+
+``GrowthTable`` parte del agregado anual (conteos, departamentos y tasas
+ponderadas) y calcula una sola vez, de forma vectorizada, los cambios año
+contra año (absolutos y en %), el crecimiento acumulado desde el primer
+año y las sumas prefijas de cada métrica. Con eso cualquier consulta de
+crecimiento entre dos años (inicial, final, cambio, crecimiento %, CAGR y
+promedio) se responde en O(1): dos lecturas por posición y una resta de
+sumas prefijas. Los años de consulta se ajustan a los años con datos
+mediante tablas densas precalculadas, sin búsquedas.
+"""
+import numpy as np
+import pandas as pd
+
+from .aggregation import aggregate
+
+
+class GrowthTable:
+    """Crecimiento YoY, acumulado y por rango de cada columna del agregado anual."""
+
+    def __init__(self, yearly):
+        yearly = yearly.sort_values('Year').reset_index(drop=True)
+        self.years = yearly['Year'].to_numpy(dtype=np.int64)
+        self.columns = [col for col in yearly.columns if col != 'Year']
+        self._column_at = {col: idx for idx, col in enumerate(self.columns)}
+        # Valores con su tipo original (los conteos siguen siendo enteros)
+        self._series = {col: yearly[col].to_numpy() for col in self.columns}
+        self.values = yearly[self.columns].to_numpy(dtype=float)
+        self._prefix = np.vstack([np.zeros(len(self.columns)), np.cumsum(self.values, axis=0)])
+
+        # Primera posición con año >= y, última con año <= y (y - first_year)
+        span = np.arange(self.years[0], self.years[-1] + 1)
+        self._first_at = np.searchsorted(self.years, span, side='left')
+        self._last_at = np.searchsorted(self.years, span, side='right') - 1
+
+        index = pd.Index(self.years, name='Year')
+        self.delta = pd.DataFrame(np.diff(self.values, axis=0, prepend=np.nan),
+                                  index=index, columns=self.columns)
+        previous = np.vstack([np.full(len(self.columns), np.nan), self.values[:-1]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.pct = pd.DataFrame((self.values / previous - 1) * 100, index=index, columns=self.columns)
+            self.cumulative = pd.DataFrame((self.values / self.values[0] - 1) * 100,
+                                           index=index, columns=self.columns)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(aggregate(df, 'Year'))
+
+    @classmethod
+    def from_pyramid(cls, pyramid):
+        return cls(pyramid.rollup('year'))
+
+    def yearly(self, columns=None):
+        """Agregado anual del que parte la tabla (``Year`` y las columnas pedidas)."""
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({'Year': self.years, **{col: self._series[col] for col in columns}})
+
+    def _bounds(self, start=None, end=None):
+        first_year, last_year = self.years[0], self.years[-1]
+        lo = 0 if start is None or start <= first_year else (
+            len(self.years) if start > last_year else self._first_at[start - first_year])
+        hi = len(self.years) - 1 if end is None or end >= last_year else (
+            -1 if end < first_year else self._last_at[end - first_year])
+        if lo > hi:
+            raise ValueError(f"No hay años con datos entre {start} y {end}")
+        return lo, hi
+
+    def growth(self, column, start=None, end=None):
+        """Crecimiento de ``column`` entre los años con datos de [start, end]."""
+        lo, hi = self._bounds(start, end)
+        series = self._series[column]
+        initial, final = series[lo], series[hi]
+        idx = self._column_at[column]
+        span = int(self.years[hi] - self.years[lo])
+        return {
+            'start': int(self.years[lo]),
+            'end': int(self.years[hi]),
+            'initial': initial,
+            'final': final,
+            'change': final - initial,
+            'growth_pct': (final / initial - 1) * 100 if initial else 0.0,
+            'cagr_pct': ((final / initial) ** (1 / span) - 1) * 100 if initial and span else 0.0,
+            'mean': (self._prefix[hi + 1, idx] - self._prefix[lo, idx]) / (hi - lo + 1),
+        }
+
+    def range(self, start=None, end=None, columns=None):
+        """Las mismas cifras de ``growth`` para varias columnas a la vez."""
+        lo, hi = self._bounds(start, end)
+        idx = [self._column_at[col] for col in (columns or self.columns)]
+        initial, final = self.values[lo, idx], self.values[hi, idx]
+        span = self.years[hi] - self.years[lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(initial != 0, final / initial, np.nan)
+            growth_pct = np.where(initial != 0, (ratio - 1) * 100, 0.0)
+            cagr_pct = np.where((initial != 0) & (span > 0), (ratio ** (1 / max(span, 1)) - 1) * 100, 0.0)
+        return pd.DataFrame({
+            'initial': initial,
+            'final': final,
+            'change': final - initial,
+            'growth_pct': growth_pct,
+            'cagr_pct': cagr_pct,
+            'mean': (self._prefix[hi + 1, idx] - self._prefix[lo, idx]) / (hi - lo + 1),
+        }, index=pd.Index([self.columns[i] for i in idx], name='Métrica'))
@@ -0,0 +1,285 @@
+"""Prueba de carga local del dashboard con sesiones simultáneas.
+
+Levanta el dashboard con ``streamlit run`` en un puerto local y abre N
+sesiones por websocket, como haría un navegador: cada sesión pide la
+ejecución inicial y luego cambia al azar los filtros de las pestañas
+(``year_trend_filter``, ``comparison_years``, ``comparison_metric``,
+``dept_year_filter`` y ``analysis_type``) enviando el estado de sus
+widgets y los mensajes que ya tiene en cache. Se mide la latencia de cada
+re-ejecución (desde el envío hasta ``script_finished``), los bytes
+recibidos (antes de la compresión del websocket), el rendimiento total y
+la memoria del servidor a lo largo de la prueba. Todo corre en localhost.
+
+Uso::
+
+    python -m analytics.loadtest --sessions 20 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_PATH = 'DATA VISUALIZATION.py'
+PORT = 8599
+MEMORY_INTERVAL = 1.0
+STARTUP_TIMEOUT = 60
+
+# clave del widget -> tipo de elemento en el protocolo
+WIDGETS = {
+    'year_trend_filter': 'selectbox',
+    'comparison_years': 'multiselect',
+    'comparison_metric': 'selectbox',
+    'dept_year_filter': 'slider',
+    'analysis_type': 'radio',
+}
+
+
+def _random_state(widget_id, kind, options, rng):
+    """Estado de widget con una selección al azar, como lo enviaría el navegador."""
+    state = WidgetState(id=widget_id)
+    if kind == 'multiselect':
+        chosen = sorted(rng.sample(range(len(options)), rng.randint(1, min(4, len(options)))))
+        state.string_array_value.data[:] = [options[i] for i in chosen]
+    elif kind == 'slider':
+        start, end = sorted(rng.sample(range(len(options)), 2))
+        state.string_array_value.data[:] = [options[start], options[end]]
+    else:
+        state.string_value = rng.choice(options)
+    return state
+
+
+def rss_mb(pid):
+    """Memoria residente de un proceso (MB) según /proc; None si no está disponible."""
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as fh:
+            for line in fh:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class Session:
+    """Una pestaña del navegador: widgets vistos, estado enviado y cache de mensajes."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.widgets = {}
+        self.states = {}
+        self.cached = set()
+
+    async def rerun(self, ws):
+        """Pide una ejecución y espera su fin; devuelve (segundos, hubo_error, bytes)."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.page_script_hash = ''
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        # Como el navegador: el servidor envía solo una referencia de lo ya recibido
+        msg.rerun_script.cached_message_hashes.extend(self.cached)
+        start = time.perf_counter()
+        await ws.send(msg.SerializeToString())
+        failed = False
+        received = 0
+        while True:
+            data = await ws.recv()
+            received += len(data)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            if forward.metadata.cacheable:
+                self.cached.add(forward.hash)
+            kind = forward.WhichOneof('type')
+            if kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                failed |= self._read_element(forward.delta.new_element)
+            elif kind == 'script_finished':
+                return time.perf_counter() - start, failed, received
+
+    def _read_element(self, element):
+        kind = element.WhichOneof('type')
+        if kind == 'exception':
+            return True
+        if kind in WIDGETS.values():
+            widget = getattr(element, kind)
+            # Los ids de widgets con clave terminan en "-<clave>"
+            key = widget.id.rsplit('-', 1)[-1]
+            if WIDGETS.get(key) == kind:
+                self.widgets[key] = (widget.id, list(widget.options))
+        return False
+
+    def change_filter(self):
+        """Cambia un filtro al azar y devuelve su clave."""
+        key = self.rng.choice(sorted(self.widgets))
+        widget_id, options = self.widgets[key]
+        self.states[key] = _random_state(widget_id, WIDGETS[key], options, self.rng)
+        return key
+
+
+class LoadTest:
+    """Sesiones concurrentes, latencias por acción y memoria del servidor."""
+
+    def __init__(self, url, sessions=10, duration=30.0, think_time=0.5, seed=0, server_pid=None):
+        self.url = url
+        self.sessions = sessions
+        self.duration = duration
+        self.think_time = think_time
+        self.seed = seed
+        self.server_pid = server_pid
+        self.samples = []
+        self.errors = 0
+        self.memory = []
+
+    async def _session(self, index, deadline):
+        session = Session(random.Random(self.seed + index))
+        async with websockets.connect(self.url, subprotocols=['streamlit'], max_size=None) as ws:
+            self._record('initial', *await session.rerun(ws))
+            while time.perf_counter() < deadline and session.widgets:
+                action = session.change_filter()
+                self._record(action, *await session.rerun(ws))
+                await asyncio.sleep(session.rng.uniform(0, 2 * self.think_time))
+
+    def _record(self, action, elapsed, failed, received):
+        self.samples.append((action, elapsed, received))
+        self.errors += failed
+
+    async def _monitor(self, started, deadline):
+        while time.perf_counter() < deadline:
+            self.memory.append((time.perf_counter() - started, rss_mb(self.server_pid)))
+            await asyncio.sleep(MEMORY_INTERVAL)
+
+    async def _run(self):
+        started = time.perf_counter()
+        deadline = started + self.duration
+        tasks = [self._session(i, deadline) for i in range(self.sessions)]
+        if self.server_pid is not None:
+            tasks.append(self._monitor(started, deadline))
+        await asyncio.gather(*tasks)
+        self.elapsed = time.perf_counter() - started
+        if self.server_pid is not None:
+            self.memory.append((self.elapsed, rss_mb(self.server_pid)))
+
+    def run(self):
+        asyncio.run(self._run())
+        return self.report()
+
+    def report(self):
+        """Percentiles de latencia (s) por acción, rendimiento y memoria."""
+        by_action = {}
+        for action, elapsed, received in self.samples:
+            by_action.setdefault(action, []).append((elapsed, received))
+        by_action['total'] = [(elapsed, received) for _, elapsed, received in self.samples]
+        latency = {}
+        for action, values in by_action.items():
+            elapsed = [value for value, _ in values]
+            latency[action] = {
+                'count': len(values),
+                'p50': float(np.percentile(elapsed, 50)),
+                'p90': float(np.percentile(elapsed, 90)),
+                'p99': float(np.percentile(elapsed, 99)),
+                'max': float(max(elapsed)),
+                'bytes_p50': float(np.percentile([received for _, received in values], 50)),
+            }
+        timeline = [(round(t, 1), round(mb, 1)) for t, mb in self.memory if mb is not None]
+        memory = [mb for _, mb in timeline]
+        return {
+            'sessions': self.sessions,
+            'duration': self.elapsed,
+            'reruns': len(self.samples),
+            'throughput': len(self.samples) / self.elapsed,
+            'errors': self.errors,
+            'latency': latency,
+            'memory_mb': {
+                'start': memory[0],
+                'peak': max(memory),
+                'end': memory[-1],
+                'timeline': timeline,
+            } if memory else None,
+        }
+
+
+def start_server(app_path=APP_PATH, port=PORT):
+    """Lanza ``streamlit run`` en localhost y espera a que responda."""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', os.path.abspath(app_path),
+         '--server.headless', 'true', '--server.address', 'localhost',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("El servidor de Streamlit terminó al iniciar")
+        try:
+            with urllib.request.urlopen(f'http://localhost:{port}/_stcore/health', timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("El servidor de Streamlit no respondió a tiempo")
+
+
+def format_report(report):
+    lines = [
+        f"Sesiones: {report['sessions']} | Duración: {report['duration']:.1f} s | "
+        f"Re-ejecuciones: {report['reruns']} | Rendimiento: {report['throughput']:.2f}/s | "
+        f"Errores: {report['errors']}",
+        '',
+        f"{'Acción':<20}{'n':>6}{'p50 (s)':>10}{'p90 (s)':>10}{'p99 (s)':>10}{'máx (s)':>10}"
+        f"{'KB p50':>10}",
+    ]
+    for action, stats in report['latency'].items():
+        lines.append(f"{action:<20}{stats['count']:>6}{stats['p50']:>10.3f}{stats['p90']:>10.3f}"
+                     f"{stats['p99']:>10.3f}{stats['max']:>10.3f}{stats['bytes_p50'] / 1024:>10.1f}")
+    memory = report['memory_mb']
+    if memory:
+        lines += ['', f"Memoria del servidor (MB): inicio {memory['start']:.1f} | "
+                      f"pico {memory['peak']:.1f} | final {memory['end']:.1f}"]
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga local del dashboard.")
+    parser.add_argument('--app', default=APP_PATH, help="Script de Streamlit a probar")
+    parser.add_argument('--port', type=int, default=PORT, help="Puerto local del servidor")
+    parser.add_argument('--url', help="Websocket de un servidor ya iniciado "
+                                      "(ws://localhost:8501/_stcore/stream); no se mide su memoria")
+    parser.add_argument('--sessions', type=int, default=10, help="Sesiones simultáneas")
+    parser.add_argument('--duration', type=float, default=30.0, help="Duración en segundos")
+    parser.add_argument('--think-time', type=float, default=0.5,
+                        help="Pausa media entre acciones de una sesión (s)")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla de las acciones aleatorias")
+    parser.add_argument('--json', help="Guardar el reporte completo en este archivo")
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if url is None:
+        process = start_server(args.app, args.port)
+        url = f'ws://localhost:{args.port}/_stcore/stream'
+    try:
+        test = LoadTest(url, sessions=args.sessions, duration=args.duration,
+                        think_time=args.think_time, seed=args.seed,
+                        server_pid=process.pid if process else None)
+        report = test.run()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
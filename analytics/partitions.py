@@ -0,0 +1,152 @@
+"""Dataset particionado por año (y opcionalmente por período).
+
+Cada partición es un CSV independiente dentro de una carpeta con un
+``manifest.json`` que describe cada archivo: año, período, número de
+filas, tamaño y mínimo/máximo/suma de cada columna numérica. Las lecturas
+por rango de años consultan primero el manifiesto y abren solo las
+particiones necesarias; agregar un año nuevo es escribir su archivo y
+actualizar el manifiesto.
+
+Uso::
+
+    python -m analytics.partitions --data university_student_data.csv --out data/partitions --by-term
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+MANIFEST = 'manifest.json'
+
+
+def is_partitioned(path):
+    """True si ``path`` es una carpeta con manifiesto de particiones."""
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def _file_name(year, term=None):
+    return f"year={year}.csv" if term is None else f"year={year}-term={term}.csv"
+
+
+def _entry(root, name, year, term, part):
+    numeric = part.select_dtypes(include='number')
+    return {
+        'file': name,
+        'year': int(year),
+        'term': term,
+        'rows': len(part),
+        'bytes': os.path.getsize(os.path.join(root, name)),
+        'stats': {
+            col: {
+                'min': numeric[col].min().item(),
+                'max': numeric[col].max().item(),
+                'sum': numeric[col].sum().item(),
+            }
+            for col in numeric.columns
+        },
+    }
+
+
+def read_manifest(root):
+    """Contenido de ``manifest.json``."""
+    with open(os.path.join(root, MANIFEST), encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def _write_manifest(root, manifest):
+    # Orden estable: dentro de un año se conserva el orden de los datos
+    manifest['partitions'].sort(key=lambda entry: entry['year'])
+    with open(os.path.join(root, MANIFEST), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=2)
+
+
+def append_partitions(root, df, by_term=False):
+    """Escribe (o reemplaza) las particiones de los años de ``df``.
+
+    En una carpeta existente se respeta su granularidad (``by_term`` solo
+    aplica a carpetas nuevas); las particiones de otros años no se tocan.
+    """
+    os.makedirs(root, exist_ok=True)
+    manifest = read_manifest(root) if is_partitioned(root) else {'by_term': by_term, 'partitions': []}
+    keys = ['Year', 'Term'] if manifest['by_term'] else ['Year']
+    written = {}
+    for key, part in df.groupby(keys, sort=False):
+        year, term = (key[0], key[1]) if manifest['by_term'] else (key[0], None)
+        name = _file_name(year, term)
+        part.to_csv(os.path.join(root, name), index=False)
+        written[name] = _entry(root, name, year, term, part)
+    manifest['partitions'] = [
+        entry for entry in manifest['partitions'] if entry['file'] not in written
+    ] + list(written.values())
+    _write_manifest(root, manifest)
+    return manifest
+
+
+def write_partitions(df, root, by_term=False):
+    """Crea la carpeta particionada a partir de un DataFrame completo."""
+    if is_partitioned(root):
+        # Las particiones anteriores pueden tener otra granularidad
+        for entry in read_manifest(root)['partitions']:
+            os.remove(os.path.join(root, entry['file']))
+        os.remove(os.path.join(root, MANIFEST))
+    return append_partitions(root, df, by_term=by_term)
+
+
+def select_partitions(manifest, start=None, end=None, terms=None):
+    """Entradas del manifiesto dentro de [start, end] y de los períodos dados."""
+    selected = []
+    for entry in manifest['partitions']:
+        if start is not None and entry['year'] < start:
+            continue
+        if end is not None and entry['year'] > end:
+            continue
+        if terms is not None and entry['term'] is not None and entry['term'] not in terms:
+            continue
+        selected.append(entry)
+    return selected
+
+
+def iter_partitions(root, start=None, end=None, terms=None):
+    """Lee una a una las particiones seleccionadas."""
+    for entry in select_partitions(read_manifest(root), start, end, terms):
+        part = pd.read_csv(os.path.join(root, entry['file']))
+        if terms is not None and entry['term'] is None:
+            part = part[part['Term'].isin(terms)]
+        yield part
+
+
+def load_partitions(root, start=None, end=None, terms=None):
+    """DataFrame con solo las particiones del rango pedido."""
+    parts = list(iter_partitions(root, start, end, terms))
+    if not parts:
+        columns = pd.read_csv(os.path.join(root, read_manifest(root)['partitions'][0]['file']), nrows=0).columns
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)
+
+
+def partition_years(root):
+    """Años disponibles según el manifiesto, sin leer los datos."""
+    return sorted({entry['year'] for entry in read_manifest(root)['partitions']})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Particiona el dataset por año (y período).")
+    parser.add_argument('--data', default='university_student_data.csv', help="CSV de origen")
+    parser.add_argument('--out', default='data/partitions', help="Carpeta de salida")
+    parser.add_argument('--by-term', action='store_true', help="Una partición por año y período")
+    parser.add_argument('--append', action='store_true',
+                        help="Agregar/reemplazar los años del CSV en una carpeta existente")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data)
+    if args.append:
+        manifest = append_partitions(args.out, df, by_term=args.by_term)
+    else:
+        manifest = write_partitions(df, args.out, by_term=args.by_term)
+    for entry in manifest['partitions']:
+        print(f"{entry['file']}: {entry['rows']} filas, {entry['bytes']} bytes")
+
+
+if __name__ == '__main__':
+    main()
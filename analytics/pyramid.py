@@ -0,0 +1,121 @@
+"""Pirámide de agregados precalculados por granularidad.
+
+Los niveles son ``term`` (Year × Term, que incluye las columnas de cada
+departamento, es decir departamento × período), ``year`` y ``lustrum``
+(bloques de cinco años). Cada nivel guarda sumas de conteos y de los
+numeradores de cada tasa (``analytics.aggregation``), se construye a
+partir del nivel inferior y nunca a partir de los datos crudos; las
+tasas se reconstruyen al consultar. Los gráficos eligen el nivel más
+grueso que todavía muestra el rango pedido con suficiente detalle
+(``trend``); por lustro muestran el promedio anual de cada bloque,
+etiquetado con los años que cubre.
+"""
+import pandas as pd
+
+from .aggregation import finalize, partial_aggregate
+from .core import COUNT_COLUMNS, DEPARTMENT_COLUMNS
+
+LEVELS = ('term', 'year', 'lustrum')
+LUSTRUM = 5
+# Máximo de puntos por serie antes de pasar a un nivel más grueso
+MAX_POINTS = 12
+
+
+def _compact(partial):
+    # Conteos en el entero más pequeño que los contiene
+    for col in COUNT_COLUMNS + DEPARTMENT_COLUMNS:
+        partial[col] = pd.to_numeric(partial[col], downcast='integer')
+    return partial
+
+
+class RollupPyramid:
+    """Sumas parciales (conteos y numeradores) por nivel de granularidad."""
+
+    def __init__(self, term):
+        self.levels = {'term': term}
+        self.levels['year'] = _compact(term.groupby(level='Year').sum())
+        self.levels['lustrum'] = self._lustrum_blocks(self.levels['year'])
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(_compact(partial_aggregate(df, ['Year', 'Term'])))
+
+    @staticmethod
+    def _lustrum_blocks(year):
+        block = (year.index // LUSTRUM) * LUSTRUM
+        return _compact(year.groupby(block.rename('Year')).sum())
+
+    def rollup(self, level, start=None, end=None):
+        """Agregado del nivel pedido dentro de [start, end]."""
+        return finalize(self.partial(level, start, end))
+
+    def partial(self, level, start=None, end=None):
+        """Sumas parciales del nivel pedido dentro de [start, end], sin tasas.
+
+        Basta para lo que solo suma conteos (departamentos, totales) y se
+        ahorra reconstruir las tasas.
+        """
+        if level == 'lustrum':
+            return self._lustrum_range(start, end)
+        # Los niveles están ordenados por año: el rango es un corte por etiqueta
+        return self.levels[level].loc[start:end]
+
+    def _lustrum_range(self, start, end):
+        # Bloques completos desde el nivel lustrum; los bordes parciales
+        # se recalculan solo con los años del rango (suman menos años; la
+        # etiqueta sigue siendo el inicio del bloque)
+        year = self.levels['year']
+        start = year.index.min() if start is None else start
+        end = year.index.max() if end is None else end
+        blocks = self.levels['lustrum']
+        full = blocks[(blocks.index >= start) & (blocks.index + LUSTRUM - 1 <= end)]
+        edge_years = year[(year.index >= start) & (year.index <= end)]
+        edge_years = edge_years[~((edge_years.index // LUSTRUM) * LUSTRUM).isin(full.index)]
+        edges = self._lustrum_blocks(edge_years) if len(edge_years) else edge_years
+        return pd.concat([full, edges]).sort_index()
+
+    def trend(self, columns, start=None, end=None):
+        """Serie de ``columns`` en [start, end] para graficar, al nivel de ``choose_level``.
+
+        En el nivel year hay una fila por año (``Year`` entero). En el nivel
+        lustrum hay una fila por bloque con el promedio anual de los años
+        que cubre dentro del rango, así que los bloques de los bordes, que
+        pueden cubrir menos de cinco, son comparables con los demás;
+        ``Year`` es el rango cubierto (``'2017–2019'``) y ``Años`` cuántos
+        años se promediaron.
+        """
+        level = self.choose_level(start, end)
+        partial = self.partial(level, start, end)[columns]
+        if level != 'lustrum':
+            return partial.reset_index()
+        years = self.levels['year'].loc[start:end].index
+        covered = pd.Series(years, index=years).groupby((years // LUSTRUM) * LUSTRUM).agg(['min', 'max', 'count'])
+        trend = partial.div(covered['count'], axis=0).reset_index(drop=True)
+        trend.insert(0, 'Year', [str(first) if first == last else f"{first}–{last}"
+                                 for first, last in zip(covered['min'], covered['max'])])
+        trend['Años'] = covered['count'].to_numpy()
+        return trend
+
+    def choose_level(self, start=None, end=None, levels=('year', 'lustrum'), max_points=MAX_POINTS):
+        """Nivel más grueso necesario: el más fino con a lo sumo ``max_points``."""
+        years = self.levels['year'].index
+        start = years.min() if start is None else start
+        end = years.max() if end is None else end
+        span = end - start + 1
+        points = {'term': span * 2, 'year': span, 'lustrum': -(-span // LUSTRUM)}
+        for level in levels:
+            if points[level] <= max_points:
+                return level
+        return levels[-1]
+
+    def by_term(self, years):
+        """Equivalente a ``term_comparison`` sobre el nivel term."""
+        term = self.levels['term']
+        selected = term[term.index.get_level_values('Year').isin(years)]
+        return finalize(selected.groupby(level='Term').sum())
+
+    def year_term(self, years, columns):
+        """Serie por (Year, Term) de las columnas dadas para los años elegidos."""
+        term = self.levels['term']
+        selected = term[term.index.get_level_values('Year').isin(years)]
+        return finalize(selected)[['Year', 'Term'] + columns]
@@ -0,0 +1,220 @@
+"""Generador de reportes estáticos del Resumen Ejecutivo.
+
+Produce, por cada dataset (campus, en CSV o carpeta particionada) y
+opcionalmente por cada año, una carpeta con ``index.html`` autocontenido
+(incluye plotly.js) y ``report.json`` con las mismas cifras, listos para
+servirse desde un servidor de archivos estáticos. Los reportes se generan
+en paralelo.
+
+Uso::
+
+    python -m analytics.report --data university_student_data.csv --out reports --per-year
+"""
+import argparse
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from . import charts
+from .core import (
+    department_shares,
+    department_trend,
+    executive_summary,
+    funnel_table,
+    historical_table,
+    load_dataset,
+    yearly_rollup,
+)
+from .partitions import is_partitioned, partition_years
+from .validation import validate
+from .versioning import data_fingerprint
+
+SECTIONS = [
+    ('funnel', '🎯 Embudo Completo de Conversión'),
+    ('retention_satisfaction', '🎯 Retención y Satisfacción Estudiantil'),
+    ('enrollment', '👥 Crecimiento de la Matrícula Estudiantil'),
+    ('admission_trend', '📈 Embudo del Proceso de Admisión'),
+    ('department_bar', '🏢 Matrícula por Departamento'),
+    ('department_pie', '🏢 Distribución Porcentual'),
+    ('department_trend', '📈 Tendencias de Matrícula Departamental'),
+]
+
+
+def build_report(df):
+    """Cifras y figuras del resumen ejecutivo para un DataFrame."""
+    summary = executive_summary(df)
+    funnel_data = funnel_table(summary)
+    df_yearly = yearly_rollup(df)
+    dept_data = department_shares(df)
+    df_dept_trend = department_trend(df)
+
+    data = {
+        'admission': {
+            'applications': summary['total_apps'],
+            'admitted': summary['total_admitted'],
+            'enrolled': summary['total_enrolled'],
+            'admission_rate': summary['total_admitted'] / summary['total_apps'] * 100,
+            'enrollment_rate': summary['total_enrolled'] / summary['total_admitted'] * 100,
+            'total_conversion': summary['total_enrolled'] / summary['total_apps'] * 100,
+        },
+        'quality': {
+            'avg_retention': summary['avg_retention'],
+            'avg_satisfaction': summary['avg_satisfaction'],
+            'retention_increasing': summary['retention_increasing'],
+        },
+        'leader_department': {
+            'name': summary['leader_department'],
+            'enrolled': summary['leader_enrolled'],
+        },
+        'funnel': funnel_data.to_dict(orient='records'),
+        'historical': historical_table(df).to_dict(orient='records'),
+        'departments': dept_data.drop(columns='Icono').to_dict(orient='records'),
+        'years': [int(df['Year'].min()), int(df['Year'].max())],
+    }
+    figures = {
+        'funnel': charts.funnel_chart(funnel_data),
+        'retention_satisfaction': charts.retention_satisfaction_chart(df_yearly),
+        'enrollment': charts.enrollment_chart(df_yearly),
+        'admission_trend': charts.admission_trend_chart(df_yearly),
+        'department_bar': charts.department_bar_chart(dept_data),
+        'department_pie': charts.department_pie_chart(dept_data),
+        'department_trend': charts.department_trend_chart(df_dept_trend),
+    }
+    return data, figures
+
+
+def _to_json(value):
+    # Escalares de numpy/pandas a tipos nativos
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def _metric(label, value):
+    return f"<div class='metric'><span>{html.escape(label)}</span><strong>{html.escape(value)}</strong></div>"
+
+
+def render_html(title, data, figures):
+    """HTML autocontenido: plotly.js se incrusta solo en la primera figura."""
+    admission, quality, leader = data['admission'], data['quality'], data['leader_department']
+    metrics = [
+        ('📝 Proceso de Admisión', [
+            ('Aplicaciones Totales', f"{admission['applications']:,}"),
+            ('Estudiantes Admitidos', f"{admission['admitted']:,}"),
+            ('Estudiantes Matriculados', f"{admission['enrolled']:,}"),
+        ]),
+        ('📊 Indicadores de Calidad', [
+            ('Retención Promedio', f"{quality['avg_retention']:.1f}%"),
+            ('Satisfacción Promedio', f"{quality['avg_satisfaction']:.1f}%"),
+            ('Tendencia General', "Positiva ✅" if quality['retention_increasing'] else "Estable 📊"),
+        ]),
+        ('🏢 Distribución Académica', [
+            ('Departamento Líder', leader['name']),
+            ('Estudiantes', f"{leader['enrolled']:,}"),
+        ]),
+        ('📈 Métricas del Embudo', [
+            ('Tasa de Admisión', f"{admission['admission_rate']:.1f}%"),
+            ('Tasa de Matrícula', f"{admission['enrollment_rate']:.1f}%"),
+            ('Conversión Total', f"{admission['total_conversion']:.1f}%"),
+        ]),
+    ]
+    blocks = []
+    for heading, items in metrics:
+        cards = ''.join(_metric(label, value) for label, value in items)
+        blocks.append(f"<section class='group'><h3>{html.escape(heading)}</h3>{cards}</section>")
+
+    plots = []
+    for idx, (key, heading) in enumerate(SECTIONS):
+        plot = figures[key].to_html(full_html=False, include_plotlyjs=(idx == 0))
+        plots.append(f"<section><h2>{html.escape(heading)}</h2>{plot}</section>")
+
+    historical = ''.join(
+        '<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in row.values()) + '</tr>'
+        for row in data['historical']
+    )
+    header = ''.join(f'<th>{html.escape(col)}</th>' for col in data['historical'][0])
+
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2rem auto; max-width: 1100px; color: #222; }}
+.groups {{ display: flex; gap: 1rem; flex-wrap: wrap; }}
+.group {{ flex: 1 1 220px; background: #f5f7fb; border-radius: 10px; padding: 1rem; }}
+.metric {{ display: flex; justify-content: space-between; margin: .4rem 0; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border-bottom: 1px solid #ddd; padding: .4rem; text-align: right; }}
+footer {{ color: #666; text-align: center; margin-top: 2rem; }}
+</style>
+</head>
+<body>
+<h1>📋 {html.escape(title)}</h1>
+<div class="groups">{''.join(blocks)}</div>
+{''.join(plots)}
+<section><h2>📅 Evolución Histórica Año por Año</h2>
+<table><thead><tr>{header}</tr></thead><tbody>{historical}</tbody></table></section>
+<footer>Universidad de la Costa | Generado el {datetime.now():%Y-%m-%d %H:%M}</footer>
+</body>
+</html>
+"""
+
+
+def write_bundle(path, out_dir, year=None):
+    """Genera el reporte de un dataset (y año, si se indica) en ``out_dir``."""
+    # Con un dataset particionado solo se lee la partición del año
+    df = validate(load_dataset(path, year, year))
+    campus = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+    name = campus if year is None else f"{campus}-{year}"
+
+    data, figures = build_report(df)
+    # Versión de los datos con que se generó: la misma huella de los caches del dashboard
+    data['data_version'] = data_fingerprint(path)
+    title = f"Resumen Ejecutivo Institucional — {campus}"
+    if year is not None:
+        title += f" ({year})"
+
+    bundle_dir = os.path.join(out_dir, name)
+    os.makedirs(bundle_dir, exist_ok=True)
+    with open(os.path.join(bundle_dir, 'report.json'), 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=2, default=_to_json)
+    with open(os.path.join(bundle_dir, 'index.html'), 'w', encoding='utf-8') as fh:
+        fh.write(render_html(title, data, figures))
+    return bundle_dir
+
+
+def generate(paths, out_dir, per_year=False, max_workers=None):
+    """Genera todos los reportes en paralelo y devuelve sus carpetas."""
+    jobs = []
+    for path in paths:
+        jobs.append((path, None))
+        if per_year:
+            if is_partitioned(path):
+                years = partition_years(path)
+            else:
+                years = sorted(load_dataset(path)['Year'].unique())
+            jobs.extend((path, int(year)) for year in years)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(write_bundle, path, out_dir, year) for path, year in jobs]
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera reportes estáticos del Resumen Ejecutivo.")
+    parser.add_argument('--data', nargs='+', default=['university_student_data.csv'],
+                        help="CSV o carpeta particionada de cada campus")
+    parser.add_argument('--out', default='reports', help="Carpeta de salida")
+    parser.add_argument('--per-year', action='store_true', help="Generar también un reporte por año")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos en paralelo")
+    args = parser.parse_args(argv)
+
+    for bundle_dir in generate(args.data, args.out, per_year=args.per_year, max_workers=args.workers):
+        print(bundle_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Simulador de escenarios ("qué pasaría si") sobre el agregado anual.
+
+Un escenario ajusta, en puntos porcentuales sobre el valor de cada año,
+la tasa de admisión (admitidos / aplicaciones), el rendimiento
+(matriculados / admitidos) y la participación de cada departamento en la
+matrícula. ``ScenarioEngine`` guarda una vez por versión de los datos los
+arreglos del agregado anual y evalúa cualquier cantidad de escenarios a
+la vez con broadcasting (escenarios × años × departamentos): embudo,
+distribución departamental y proyección de matrícula salen de operaciones
+sobre esos arreglos, sin volver a agrupar el DataFrame. Con ajustes en
+cero se reproducen ``funnel_table``, ``department_shares`` y ``forecast``.
+"""
+import numpy as np
+import pandas as pd
+
+from .core import DEPARTMENT_COLUMNS, DEPARTMENTS, forecast
+
+HORIZON = 3
+# Límite de cada ajuste (puntos porcentuales)
+MAX_DELTA = 20.0
+# Escenarios guardados por sesión
+MAX_SCENARIOS = 10
+
+
+def _deltas(values, count, shape=()):
+    # Ajustes en p.p. como fracción, uno por escenario
+    values = np.zeros((count,) + shape) if values is None else np.asarray(values, dtype=float)
+    return np.broadcast_to(values, (count,) + shape) / 100
+
+
+class ScenarioEngine:
+    """Arreglos del agregado anual y evaluación vectorizada de escenarios."""
+
+    def __init__(self, yearly, horizon=HORIZON):
+        yearly = yearly.sort_values('Year').reset_index(drop=True)
+        self.years = yearly['Year'].to_numpy(dtype=np.int64)
+        self.horizon = horizon
+        self.final_year = int(self.years[-1]) + horizon
+        self.applications = yearly['Applications'].to_numpy(dtype=float)
+        admitted = yearly['Admitted'].to_numpy(dtype=float)
+        enrolled = yearly['Enrolled'].to_numpy(dtype=float)
+        departments = yearly[DEPARTMENT_COLUMNS].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.admission_rate = np.nan_to_num(admitted / self.applications)
+            self.yield_rate = np.nan_to_num(enrolled / admitted)
+            assigned = departments.sum(axis=1)
+            # Parte de la matrícula con departamento y la mezcla entre ellos
+            self.coverage = np.nan_to_num(assigned / enrolled)
+            self.mix = np.nan_to_num(departments / assigned[:, None])
+        # Retención y satisfacción no dependen de los ajustes
+        _, _, self.base_projection = forecast(yearly, horizon=horizon)
+
+    @classmethod
+    def from_pyramid(cls, pyramid, horizon=HORIZON):
+        return cls(pyramid.rollup('year'), horizon)
+
+    def evaluate(self, admission=None, yield_=None, mix=None):
+        """Resultados de uno o varios escenarios (un valor por escenario).
+
+        ``admission`` y ``yield_`` son ajustes en p.p. con forma (S,) y
+        ``mix`` los ajustes por departamento con forma (S, departamentos),
+        en el orden de ``DEPARTMENTS``; la mezcla se renormaliza para sumar
+        100 %. Los conteos por año se redondean a personas.
+        """
+        count = max(np.size(admission) if admission is not None else 1,
+                    np.size(yield_) if yield_ is not None else 1,
+                    np.shape(mix)[0] if mix is not None and np.ndim(mix) == 2 else 1)
+        admission = _deltas(admission, count)[:, None]
+        yield_ = _deltas(yield_, count)[:, None]
+        mix = _deltas(mix, count, (len(DEPARTMENTS),))[:, None, :]
+
+        # Escenarios × años
+        admitted = np.rint(self.applications * np.clip(self.admission_rate + admission, 0, 1))
+        enrolled = np.rint(admitted * np.clip(self.yield_rate + yield_, 0, 1))
+        # Escenarios × años × departamentos
+        shares = np.clip(self.mix + mix, 0, None)
+        total = shares.sum(axis=2, keepdims=True)
+        shares = np.divide(shares, total, out=np.broadcast_to(self.mix, shares.shape).copy(), where=total > 0)
+        departments = np.rint(enrolled[:, :, None] * self.coverage[:, None] * shares)
+
+        # Proyección compuesta de matrícula como en ``forecast``
+        first, last = enrolled[:, 0], enrolled[:, -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.nan_to_num((last - first) / first / len(self.years))
+        steps = np.arange(1, self.horizon + 1)
+        projected = np.floor(last[:, None] * (1 + rate[:, None]) ** steps)
+
+        return {
+            'applications': np.full(count, self.applications.sum()),
+            'admitted': admitted.sum(axis=1),
+            'enrolled': enrolled.sum(axis=1),
+            'departments': departments.sum(axis=1),
+            'yearly_enrolled': enrolled,
+            'enrollment_rate': rate,
+            'projection': projected,
+        }
+
+    def funnel_data(self, result, idx=0):
+        """Embudo de un escenario con el formato de ``funnel_table``."""
+        applications = result['applications'][idx]
+        counts = [applications, result['admitted'][idx], result['enrolled'][idx]]
+        return pd.DataFrame({
+            'Etapa': ['Aplicaciones Recibidas', 'Estudiantes Admitidos', 'Estudiantes Matriculados'],
+            'Cantidad': np.array(counts, dtype=np.int64),
+            'Porcentaje': [count / applications * 100 for count in counts],
+        })
+
+    def department_data(self, result, idx=0):
+        """Distribución departamental de un escenario (formato de ``department_shares``)."""
+        totals = result['departments'][idx].astype(np.int64)
+        dept_data = pd.DataFrame({
+            'Departamento': [name for _, name, _, _ in DEPARTMENTS],
+            'Total Matriculados': totals,
+            'Icono': [icon for _, _, icon, _ in DEPARTMENTS]
+        })
+        dept_data['Porcentaje'] = (dept_data['Total Matriculados'] / totals.sum() * 100).round(1)
+        return dept_data.sort_values('Total Matriculados', ascending=False)
+
+    def projection(self, result, idx=0):
+        """Proyección de un escenario con el formato de ``forecast``."""
+        projection = self.base_projection.copy()
+        projection['Matrícula Proyectada'] = result['projection'][idx].astype(np.int64)
+        return projection
+
+    def comparison(self, result, names):
+        """Tabla con una fila por escenario para compararlos lado a lado."""
+        applications = result['applications']
+        table = pd.DataFrame({
+            'Escenario': names,
+            'Admitidos': result['admitted'].astype(np.int64),
+            'Matriculados': result['enrolled'].astype(np.int64),
+            'Tasa de Admisión (%)': result['admitted'] / applications * 100,
+            'Conversión Total (%)': result['enrolled'] / applications * 100,
+            f'Matrícula {self.final_year}': result['projection'][:, -1].astype(np.int64),
+        })
+        shares = result['departments'] / result['departments'].sum(axis=1, keepdims=True) * 100
+        for pos, (_, name, _, _) in enumerate(DEPARTMENTS):
+            table[f'{name} (%)'] = shares[:, pos]
+        return table
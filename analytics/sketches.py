@@ -0,0 +1,272 @@
+"""Estadísticas descriptivas incrementales y combinables.
+
+``DatasetSummary`` mantiene, por cada columna numérica, los momentos
+(conteo, media, varianza de Welford/Chan, mínimo y máximo) y un sketch de
+cuantiles KLL. Se actualiza por bloques durante la ingesta, se combina
+entre particiones o workers con ``merge`` y ``describe()`` reproduce el
+formato de ``DataFrame.describe()`` sin volver a recorrer los datos.
+"""
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+from .validation import DataValidationError, Validator, check_columns
+
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+class RunningMoments:
+    """Conteo, media y varianza en una pasada (Welford por bloques)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        moments.count, moments.mean, moments.m2 = state['count'], state['mean'], state['m2']
+        moments.min, moments.max = state['min'], state['max']
+        return moments
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        batch = RunningMoments()
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+class QuantileSketch:
+    """Sketch KLL de cuantiles con memoria acotada por ``k``.
+
+    Mientras no se ha compactado ningún nivel los cuantiles son exactos e
+    interpolados igual que ``pandas.Series.quantile``.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = random.Random(seed)
+
+    def to_dict(self):
+        # El estado del generador se guarda para que las compactaciones
+        # siguientes sean las mismas que sin guardar
+        version, internal, gauss = self._rng.getstate()
+        return {'k': self.k, 'levels': [level.tolist() for level in self.levels],
+                'rng': [version, list(internal), gauss]}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(k=state['k'])
+        sketch.levels = [np.asarray(level, dtype=float) for level in state['levels']]
+        version, internal, gauss = state['rng']
+        sketch._rng.setstate((version, tuple(internal), gauss))
+        return sketch
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def _compress(self):
+        # Al crecer la altura se reducen las capacidades de los niveles
+        # inferiores, por eso se repite hasta que ninguno se desborda
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if items.size <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Un elemento sobrante se queda en el nivel actual
+                keep = items[:items.size % 2]
+                pairs = items[items.size % 2:]
+                promoted = pairs[self._rng.randint(0, 1)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                compacted = True
+
+    def quantile(self, q):
+        if len(self.levels) == 1:
+            items = self.levels[0]
+            if items.size == 0:
+                return math.nan
+            return float(np.quantile(items, q))
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(level_items.size, 2 ** level, dtype=float)
+            for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # Rango medio de cada elemento normalizado a [0, 1]
+        ranks = (np.cumsum(weights) - weights / 2) / weights.sum()
+        return float(np.interp(q, ranks, items))
+
+
+class ColumnSummary:
+    """Momentos y cuantiles de una columna."""
+
+    def __init__(self, k=200):
+        self.moments = RunningMoments()
+        self.quantiles = QuantileSketch(k=k)
+
+    def to_dict(self):
+        return {'moments': self.moments.to_dict(), 'quantiles': self.quantiles.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        summary = cls()
+        summary.moments = RunningMoments.from_dict(state['moments'])
+        summary.quantiles = QuantileSketch.from_dict(state['quantiles'])
+        return summary
+
+    def update(self, values):
+        self.moments.update(values)
+        self.quantiles.update(values)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+
+    def describe(self):
+        m = self.moments
+        return [
+            float(m.count), m.mean if m.count else math.nan, m.std,
+            m.min if m.count else math.nan,
+            self.quantiles.quantile(0.25), self.quantiles.quantile(0.5),
+            self.quantiles.quantile(0.75),
+            m.max if m.count else math.nan,
+        ]
+
+
+class DatasetSummary:
+    """Resumen incremental de todas las columnas numéricas."""
+
+    def __init__(self, k=200):
+        self.k = k
+        self.columns = {}
+
+    def to_dict(self):
+        """Estado completo como tipos de JSON (para guardarlo con el almacén)."""
+        return {'k': self.k, 'columns': {col: summary.to_dict() for col, summary in self.columns.items()}}
+
+    @classmethod
+    def from_dict(cls, state):
+        summary = cls(k=state['k'])
+        summary.columns = {col: ColumnSummary.from_dict(item) for col, item in state['columns'].items()}
+        return summary
+
+    def update(self, df):
+        for col in df.select_dtypes(include='number').columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnSummary(k=self.k)
+            self.columns[col].update(df[col].to_numpy())
+        return self
+
+    def merge(self, other):
+        for col, summary in other.columns.items():
+            if col not in self.columns:
+                self.columns[col] = ColumnSummary(k=self.k)
+            self.columns[col].merge(summary)
+        return self
+
+    def describe(self):
+        """Equivalente a ``DataFrame.describe()`` a partir del resumen."""
+        return pd.DataFrame(
+            {col: summary.describe() for col, summary in self.columns.items()},
+            index=DESCRIBE_INDEX
+        )
+
+
+def summarize(df, k=200):
+    """Resumen de un DataFrame completo."""
+    return DatasetSummary(k=k).update(df)
+
+
+def ingest(path, chunksize=None, k=200, validate=True):
+    """Lee un CSV (opcionalmente por bloques) y construye su resumen.
+
+    Devuelve el DataFrame completo y el ``DatasetSummary`` actualizado
+    bloque a bloque durante la lectura. Una carpeta particionada se lee
+    partición por partición. Con ``validate`` cada bloque pasa antes por
+    ``analytics.validation.Validator`` y el primer bloque inválido detiene
+    la lectura con ``DataValidationError``.
+    """
+    # Import diferido, como en ``core.load_dataset``
+    from .partitions import is_partitioned, iter_partitions
+    summary = DatasetSummary(k=k)
+    validator = Validator() if validate else None
+    if is_partitioned(path):
+        reader = iter_partitions(path)
+    else:
+        if validate:
+            # Columnas faltantes se detectan sin leer el archivo
+            problems = check_columns(pd.read_csv(path, nrows=0).columns)
+            if problems:
+                raise DataValidationError(problems)
+        if chunksize is None:
+            df = pd.read_csv(path)
+            if validate:
+                validator.update(df)
+            return df, summary.update(df)
+        reader = pd.read_csv(path, chunksize=chunksize)
+    chunks = []
+    for chunk in reader:
+        if validate:
+            validator.update(chunk)
+        summary.update(chunk)
+        chunks.append(chunk)
+    return pd.concat(chunks, ignore_index=True), summary
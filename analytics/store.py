@@ -0,0 +1,421 @@
+"""Datos compartidos de solo lectura y memoria acotada del proceso.
+
+El dataset se guarda una vez en disco como un ``.npy`` por columna (las
+columnas de texto como códigos enteros más sus categorías) y se abre con
+``np.load(mmap_mode='r')``: las columnas son vistas de solo lectura sobre
+el archivo, las páginas las comparte el sistema operativo entre procesos y
+ninguna sesión tiene su propia copia. El resumen y el nivel ``term`` de la
+pirámide se guardan junto a las columnas, así que reabrir una versión no
+vuelve a recorrer las filas. ``SharedStore`` reúne ese dataset y
+los agregados derivados (resumen, pirámide, CSV de descarga) y se
+crea una sola vez por proceso y por versión de los datos
+(``analytics.versioning``); ``memo`` guarda además figuras y tablas
+calculadas sobre esa versión, con un presupuesto en bytes que descarta
+las menos usadas. Las sesiones guardan solo los parámetros de sus filtros;
+``session_footprint`` mide lo que ocupa cada una y
+``SharedStore.memory_usage`` lo que comparten todas.
+"""
+import json
+import os
+import shutil
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .pyramid import RollupPyramid
+from .sketches import DatasetSummary, ingest, summarize
+from .validation import DataValidationError
+from .versioning import data_fingerprint
+
+STORE_DIR = os.path.join('.cache', 'store')
+META = 'columns.json'
+# Resumen (JSON) y nivel ``term`` de la pirámide (columnas ``.npy``),
+# guardados junto a las columnas del dataset
+SUMMARY = 'summary.json'
+TERM_LEVEL = 'term'
+# Problemas de una versión rechazada, junto al directorio que tendría
+REJECTED = '.rejected.json'
+# Un archivo por proceso que tiene abierta la versión (su PID); mientras
+# exista y el proceso viva, ``prune_stores`` no borra el directorio
+READERS = '.readers'
+# Resultados memorizados por almacén (figuras, tablas, exportaciones):
+# máximo de entradas y de bytes
+MEMO_ENTRIES = 256
+MEMO_BUDGET = 64 * 1024 * 1024
+
+
+def _store_path(path, store_dir, version):
+    # Un directorio por versión del archivo de origen
+    name = os.path.basename(os.path.normpath(path))
+    return os.path.join(store_dir, f"{name}-{version}")
+
+
+def write_columns(df, root):
+    """Guarda cada columna como ``.npy``; las de texto como códigos + categorías."""
+    os.makedirs(root, exist_ok=True)
+    meta = []
+    for idx, col in enumerate(df.columns):
+        values = df[col]
+        entry = {'name': col, 'file': f'{idx}.npy'}
+        if values.dtype.kind in 'biuf':
+            np.save(os.path.join(root, entry['file']), values.to_numpy())
+        else:
+            codes, categories = pd.factorize(values, sort=True)
+            codes = codes.astype(np.int8 if len(categories) < 128 else np.int32)
+            np.save(os.path.join(root, entry['file']), codes)
+            entry['categories'] = categories.tolist()
+        meta.append(entry)
+    # El manifiesto se escribe al final: su presencia indica un directorio completo
+    with open(os.path.join(root, META), 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh, ensure_ascii=False)
+
+
+def open_columns(root):
+    """DataFrame respaldado por archivos mapeados en memoria (solo lectura)."""
+    with open(os.path.join(root, META), encoding='utf-8') as fh:
+        meta = json.load(fh)
+    columns = {}
+    for entry in meta:
+        values = np.load(os.path.join(root, entry['file']), mmap_mode='r')
+        if 'categories' in entry:
+            values = pd.Categorical.from_codes(values, categories=entry['categories'])
+        columns[entry['name']] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+class Memo:
+    """Resultados por clave compartidos entre hilos (LRU acotado).
+
+    Se descartan los menos usados cuando hay más de ``max_entries`` o
+    cuando su tamaño (``object_size``) supera ``max_bytes``; el último
+    resultado se conserva aunque por sí solo lo supere. Los resultados se
+    comparten entre sesiones: quien los usa no debe modificarlos. El
+    cálculo corre fuera del candado; si dos hilos piden la misma clave a la
+    vez, se conserva el primer resultado.
+    """
+
+    def __init__(self, max_entries=MEMO_ENTRIES, max_bytes=MEMO_BUDGET):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+        self._sizes = {}
+
+    def get(self, key, fn, *args):
+        """``fn(*args)`` calculado una sola vez por ``key``."""
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                return self._values[key]
+        value = fn(*args)
+        size = object_size(value)
+        with self._lock:
+            if key in self._values:
+                value = self._values[key]
+            else:
+                self._values[key] = value
+                self._sizes[key] = size
+                self.bytes += size
+            self._values.move_to_end(key)
+            while len(self._values) > 1 and (len(self._values) > self.max_entries
+                                             or self.bytes > self.max_bytes):
+                old, _ = self._values.popitem(last=False)
+                self.bytes -= self._sizes.pop(old)
+        return value
+
+    def __len__(self):
+        return len(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+
+def _pid_alive(pid):
+    if os.name != 'posix':
+        # Sin una forma barata de comprobarlo se asume que sigue vivo
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lease(root):
+    """Marca ``root`` como abierto por este proceso; falla si el directorio ya no existe."""
+    lease = os.path.join(root, READERS, str(os.getpid()))
+    try:
+        os.mkdir(os.path.join(root, READERS))
+    except FileExistsError:
+        pass
+    with open(lease, 'w', encoding='utf-8'):
+        pass
+    return lease
+
+
+def _release(lease):
+    try:
+        os.remove(lease)
+    except OSError:
+        pass
+
+
+def in_use(root):
+    """Si algún proceso vivo tiene abierta la versión de ``root``.
+
+    Las marcas de procesos que ya terminaron se borran al revisarlas.
+    """
+    readers = os.path.join(root, READERS)
+    try:
+        entries = os.listdir(readers)
+    except OSError:
+        return False
+    alive = False
+    for entry in entries:
+        if entry.isdigit() and _pid_alive(int(entry)):
+            alive = True
+        else:
+            _release(os.path.join(readers, entry))
+    return alive
+
+
+class SharedStore:
+    """Dataset mapeado en memoria y agregados compartidos entre sesiones.
+
+    Cada almacén corresponde a una sola ``version`` de los datos, así que
+    lo guardado en ``memo`` nunca se mezcla entre versiones: datos nuevos
+    abren un almacén nuevo que empieza vacío. Mientras el objeto exista,
+    su directorio queda marcado como abierto por este proceso.
+    """
+
+    def __init__(self, df, summary, pyramid, version=None, lease=None):
+        self.df = df
+        self.summary = summary
+        self.pyramid = pyramid
+        self.version = version
+        self._memo = Memo()
+        if lease is not None:
+            weakref.finalize(self, _release, lease)
+
+    @classmethod
+    def open(cls, path, store_dir=STORE_DIR, version=None):
+        """Abre (creándolo si falta) el almacén de la versión ``version`` de ``path``."""
+        version = data_fingerprint(path) if version is None else version
+        root = _store_path(path, store_dir, version)
+        if os.path.isfile(os.path.join(root, META)):
+            try:
+                lease = _lease(root)
+                df = open_columns(root)
+                summary, pyramid = _read_aggregates(root, df)
+                return cls(df, summary, pyramid, version, lease)
+            except FileNotFoundError:
+                # Otro proceso lo borró entre la revisión y la apertura: se reconstruye
+                pass
+        # Una versión ya rechazada no se vuelve a leer
+        rejected = root + REJECTED
+        if os.path.isfile(rejected):
+            with open(rejected, encoding='utf-8') as fh:
+                raise DataValidationError(json.load(fh), version)
+        try:
+            df, summary = ingest(path)
+        except DataValidationError as exc:
+            exc.version = version
+            os.makedirs(store_dir, exist_ok=True)
+            with open(rejected, 'w', encoding='utf-8') as fh:
+                json.dump(exc.problems, fh, ensure_ascii=False)
+            raise
+        # Se escribe aparte y se renombra: otro proceso nunca ve un directorio a medias
+        staging = f"{root}.{os.getpid()}.tmp"
+        write_columns(df, staging)
+        # La pirámide se arma sobre las columnas guardadas, igual que al reabrir
+        pyramid = RollupPyramid.from_frame(open_columns(staging))
+        _write_aggregates(staging, summary, pyramid)
+        try:
+            os.rename(staging, root)
+        except OSError:
+            # Otro proceso lo creó primero
+            shutil.rmtree(staging, ignore_errors=True)
+        lease = _lease(root)
+        return cls(open_columns(root), summary, pyramid, version, lease)
+
+    def memo(self, key, fn, *args):
+        """``fn(*args)`` calculado una vez por clave y compartido (ver ``Memo``)."""
+        return self._memo.get(key, fn, *args)
+
+    def memory_usage(self):
+        """Bytes compartidos por todas las sesiones del proceso.
+
+        ``mapped`` es el dataset mapeado desde disco (las páginas las
+        comparte además el sistema operativo entre procesos); ``memo`` lo
+        que ocupan los resultados memorizados, hasta ``memo_budget``.
+        """
+        mapped = self.df.memory_usage(index=False).sum()
+        return {'mapped': int(mapped), 'memo': self._memo.bytes, 'memo_budget': self._memo.max_bytes}
+
+    def csv_bytes(self):
+        """Dataset como CSV para descargar, serializado una sola vez."""
+        return self.memo('csv_bytes', _csv_bytes, self.df)
+
+
+_OPEN_STORES = OrderedDict()
+# El candado global solo protege el registro; cada versión se construye
+# con su propio candado para que las demás sigan respondiendo mientras tanto
+_OPEN_LOCK = threading.Lock()
+_BUILDING = {}
+
+
+def open_store(path, version=None, keep=2, store_dir=STORE_DIR):
+    """``SharedStore`` del proceso para la versión de ``path``.
+
+    El dashboard y la API piden el almacén aquí: en un mismo proceso
+    comparten la instancia (y su ``memo``); entre procesos comparten los
+    archivos mapeados de ``store_dir``. Se conservan abiertas las ``keep``
+    versiones más recientes de cada archivo de origen, sin que un archivo
+    desplace a las versiones de otro, y se borran del disco los
+    directorios de las demás que ningún proceso tenga abiertos. Una
+    versión inválida lanza ``DataValidationError`` antes de registrarse,
+    sin desplazar a las versiones válidas.
+    """
+    version = data_fingerprint(path) if version is None else version
+    key = (os.path.abspath(path), version)
+    with _OPEN_LOCK:
+        if key in _OPEN_STORES:
+            _OPEN_STORES.move_to_end(key)
+            return _OPEN_STORES[key]
+        building = _BUILDING.setdefault(key, threading.Lock())
+    with building:
+        with _OPEN_LOCK:
+            store = _OPEN_STORES.get(key)
+        if store is not None:
+            # Otro hilo terminó de construirlo mientras se esperaba
+            return store
+        try:
+            store = SharedStore.open(path, store_dir, version)
+        finally:
+            with _OPEN_LOCK:
+                _BUILDING.pop(key, None)
+        with _OPEN_LOCK:
+            _OPEN_STORES[key] = store
+            versions = [other for other in _OPEN_STORES if other[0] == key[0]]
+            for evicted in versions[:-keep]:
+                del _OPEN_STORES[evicted]
+            kept = {kept_version for _, kept_version in versions[-keep:]}
+        prune_stores(path, kept, store_dir)
+        return store
+
+
+def prune_stores(path, keep_versions, store_dir=STORE_DIR):
+    """Borra los directorios (y rechazos) de ``path`` fuera de ``keep_versions``.
+
+    Los directorios de construcción en curso (``.tmp``) no se tocan, ni los
+    de versiones que algún proceso vivo tenga abiertas (``in_use``): se
+    borran en una poda posterior, cuando ya nadie los usa. El directorio
+    se renombra antes de borrarlo, así que nadie abre uno a medio borrar.
+    """
+    if not os.path.isdir(store_dir):
+        return
+    prefix = os.path.basename(os.path.normpath(path)) + '-'
+    for entry in os.listdir(store_dir):
+        if not entry.startswith(prefix) or entry.endswith('.tmp'):
+            continue
+        version = entry[len(prefix):]
+        if version.endswith(REJECTED):
+            version = version[:-len(REJECTED)]
+        # Las huellas son hexadecimales: otro archivo con el mismo prefijo no coincide
+        if version in keep_versions or not all(ch in '0123456789abcdef' for ch in version):
+            continue
+        target = os.path.join(store_dir, entry)
+        if os.path.isdir(target):
+            if in_use(target):
+                continue
+            trash = f"{target}.{os.getpid()}.tmp"
+            try:
+                os.rename(target, trash)
+            except OSError:
+                continue
+            shutil.rmtree(trash, ignore_errors=True)
+        else:
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+
+
+def last_valid_store(path):
+    """Almacén abierto más reciente de ``path`` (``None`` si no hay)."""
+    path = os.path.abspath(path)
+    with _OPEN_LOCK:
+        for (store_path, _), store in reversed(_OPEN_STORES.items()):
+            if store_path == path:
+                return store
+    return None
+
+
+def _write_aggregates(root, summary, pyramid):
+    # Los demás niveles de la pirámide se derivan de ``term`` al leer
+    write_columns(pyramid.levels['term'].reset_index(), os.path.join(root, TERM_LEVEL))
+    with open(os.path.join(root, SUMMARY), 'w', encoding='utf-8') as fh:
+        json.dump(summary.to_dict(), fh)
+
+
+def _read_aggregates(root, df):
+    """Resumen y pirámide guardados; se recalculan si el directorio es anterior."""
+    term_root = os.path.join(root, TERM_LEVEL)
+    if not (os.path.isfile(os.path.join(root, SUMMARY)) and os.path.isfile(os.path.join(term_root, META))):
+        return summarize(df), RollupPyramid.from_frame(df)
+    with open(os.path.join(root, SUMMARY), encoding='utf-8') as fh:
+        summary = DatasetSummary.from_dict(json.load(fh))
+    # Copia en memoria: el nivel es pequeño y no retiene los archivos abiertos
+    term = open_columns(term_root).copy().set_index(['Year', 'Term'])
+    return summary, RollupPyramid(term)
+
+
+def _csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def object_size(value, _seen=None):
+    """Bytes aproximados de un objeto y de lo que contiene."""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'to_plotly_json'):
+        # Figuras: solo sus datos y layout, no los validadores que comparten
+        return object_size(value.to_plotly_json(), seen)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(object_size(k, seen) + object_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(object_size(item, seen) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += object_size(vars(value), seen)
+    return size
+
+
+def session_footprint(state, shared=()):
+    """Bytes por entrada del estado de una sesión, de mayor a menor.
+
+    Los objetos de ``shared`` (pool, almacén) no se cuentan: son del
+    proceso, no de la sesión.
+    """
+    seen = {id(obj) for obj in shared}
+    sizes = {key: object_size(state[key], seen) for key in list(state.keys())}
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
@@ -0,0 +1,125 @@
+"""Validación del dataset durante la ingesta.
+
+Antes de construir el resumen, la pirámide o el almacén compartido, cada
+bloque leído se revisa con operaciones vectorizadas sobre sus columnas:
+
+- esquema: columnas presentes, valores numéricos en las columnas de
+  conteo y tasas, períodos conocidos en ``Term``, sin valores vacíos;
+- invariantes: conteos no negativos, ``Admitted <= Applications``,
+  ``Enrolled <= Admitted``, la suma de departamentos ``<= Enrolled``,
+  tasas entre 0 y 100 y una sola fila por (Year, Term).
+
+Los problemas se acumulan por regla (con algunas filas de ejemplo) y se
+lanzan juntos en un ``DataValidationError``. ``SharedStore.open`` guarda
+el rechazo junto a la versión de los datos, así que una versión inválida
+se rechaza sin volver a leerla y nunca reemplaza a la última versión
+válida en los caches.
+"""
+import numpy as np
+import pandas as pd
+
+from .core import COUNT_COLUMNS, DEPARTMENT_COLUMNS, RATE_COLUMNS, TERMS
+
+KEY_COLUMNS = ['Year', 'Term']
+NUMERIC_COLUMNS = ['Year'] + COUNT_COLUMNS + RATE_COLUMNS + DEPARTMENT_COLUMNS
+REQUIRED_COLUMNS = KEY_COLUMNS + COUNT_COLUMNS + RATE_COLUMNS + DEPARTMENT_COLUMNS
+# Filas de ejemplo por problema
+EXAMPLES = 3
+
+
+class DataValidationError(ValueError):
+    """El dataset no cumple el esquema o sus invariantes."""
+
+    def __init__(self, problems, version=None):
+        self.problems = list(problems)
+        self.version = version
+        super().__init__("Datos inválidos: " + "; ".join(self.problems))
+
+
+def _rows(mask, index):
+    # Posiciones de ejemplo de las filas marcadas
+    rows = index[np.flatnonzero(mask)]
+    shown = ', '.join(str(row) for row in rows[:EXAMPLES])
+    return f"{len(rows)} fila(s), p. ej. {shown}"
+
+
+def check_columns(columns):
+    """Problemas de esquema visibles solo con los nombres de columna."""
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    return [f"Faltan columnas: {', '.join(missing)}"] if missing else []
+
+
+class Validator:
+    """Valida un dataset bloque a bloque durante la lectura.
+
+    ``update`` revisa cada bloque y lanza ``DataValidationError`` en el
+    primer bloque con problemas; las claves (Year, Term) vistas se
+    recuerdan entre bloques para detectar duplicados.
+    """
+
+    def __init__(self):
+        self._keys = set()
+        self.rows = 0
+
+    def update(self, chunk):
+        problems = self.check(chunk)
+        if problems:
+            raise DataValidationError(problems)
+        self.rows += len(chunk)
+        return self
+
+    def check(self, chunk):
+        """Problemas del bloque (lista vacía si es válido)."""
+        problems = check_columns(chunk.columns)
+        if problems:
+            return problems
+        index = chunk.index
+
+        values = {}
+        for col in NUMERIC_COLUMNS:
+            raw = chunk[col]
+            number = raw if raw.dtype.kind in 'biuf' else pd.to_numeric(raw, errors='coerce')
+            empty = raw.isna().to_numpy()
+            invalid = number.isna().to_numpy() & ~empty
+            if invalid.any():
+                problems.append(f"'{col}' tiene valores no numéricos: {_rows(invalid, index)}")
+            if empty.any():
+                problems.append(f"'{col}' tiene valores vacíos: {_rows(empty, index)}")
+            values[col] = number.to_numpy(dtype=float)
+
+        term = chunk['Term']
+        unknown = ~term.isin(TERMS).to_numpy()
+        if unknown.any():
+            problems.append(f"'Term' admite {', '.join(TERMS)}: {_rows(unknown, index)}")
+
+        counts = np.column_stack([values[col] for col in COUNT_COLUMNS + DEPARTMENT_COLUMNS])
+        # Las comparaciones con NaN son falsas: cada fila se reporta una sola vez
+        negative = (counts < 0).any(axis=1)
+        if negative.any():
+            problems.append(f"Conteos negativos: {_rows(negative, index)}")
+        if (values['Year'] % 1 != 0).any():
+            problems.append(f"'Year' debe ser entero: {_rows(values['Year'] % 1 != 0, index)}")
+        rules = [
+            ("'Admitted' mayor que 'Applications'", values['Admitted'] > values['Applications']),
+            ("'Enrolled' mayor que 'Admitted'", values['Enrolled'] > values['Admitted']),
+            ("La suma de departamentos supera 'Enrolled'",
+             counts[:, len(COUNT_COLUMNS):].sum(axis=1) > values['Enrolled']),
+        ]
+        rules += [(f"'{col}' fuera de 0-100", (values[col] < 0) | (values[col] > 100))
+                  for col in RATE_COLUMNS]
+        for message, mask in rules:
+            if mask.any():
+                problems.append(f"{message}: {_rows(mask, index)}")
+
+        keys = pd.MultiIndex.from_arrays([values['Year'], term.astype(str)])
+        repeated = keys.duplicated() | keys.isin(self._keys)
+        if repeated.any():
+            problems.append(f"Filas repetidas para (Year, Term): {_rows(repeated, index)}")
+        self._keys.update(keys)
+        return problems
+
+
+def validate(df):
+    """Lanza ``DataValidationError`` si ``df`` completo no es válido."""
+    Validator().update(df)
+    return df
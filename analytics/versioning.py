@@ -0,0 +1,105 @@
+"""Huella de versión de los datos y vigilancia de cambios.
+
+``data_fingerprint`` identifica la versión del dataset sin leerlo
+completo: tamaño, fecha de modificación y unos bloques repartidos por el
+archivo (o, en una carpeta particionada, el manifiesto y la fecha y el
+tamaño de cada partición). Todos los caches se indexan con esta huella, de
+modo que un archivo nuevo produce una huella nueva y entradas nuevas sin
+reiniciar el proceso. ``DataWatcher`` revisa la huella periódicamente y
+avisa cuando cambia, para invalidar y precalentar antes de que llegue la
+siguiente sesión. Una versión rechazada por la validación no se vuelve a
+intentar hasta que el archivo cambie de nuevo.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from .partitions import MANIFEST, is_partitioned, read_manifest
+from .validation import DataValidationError
+
+SAMPLE_BLOCK = 64 * 1024
+SAMPLE_BLOCKS = 4
+WATCH_INTERVAL = 5.0
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def data_fingerprint(path):
+    """Huella corta (hex) de la versión de los datos en ``path``."""
+    digest = hashlib.blake2b(digest_size=8)
+    if is_partitioned(path):
+        with open(os.path.join(path, MANIFEST), 'rb') as fh:
+            digest.update(fh.read())
+        for entry in read_manifest(path)['partitions']:
+            stat = os.stat(os.path.join(path, entry['file']))
+            digest.update(f"{entry['file']}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    stat = os.stat(path)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    # Bloques al inicio, al final y repartidos entre ambos
+    last = max(stat.st_size - SAMPLE_BLOCK, 0)
+    offsets = sorted({last * i // (SAMPLE_BLOCKS - 1) for i in range(SAMPLE_BLOCKS)})
+    with open(path, 'rb') as fh:
+        for offset in offsets:
+            fh.seek(offset)
+            digest.update(fh.read(SAMPLE_BLOCK))
+    return digest.hexdigest()
+
+
+class DataWatcher:
+    """Hilo que revisa la huella de ``path`` y llama a ``on_change(version)``.
+
+    ``version`` se publica solo después de que ``on_change`` termina, así
+    que quien la lee recibe siempre una versión ya precalentada. Si la
+    última versión nueva fue rechazada, ``rejected`` y ``error`` la
+    describen hasta que llegue una válida. Con ``optional`` el archivo
+    puede no existir: su versión es ``None``.
+    """
+
+    def __init__(self, path, on_change, interval=WATCH_INTERVAL, optional=False):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.optional = optional
+        self.version = self._fingerprint()
+        self.rejected = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='data-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _fingerprint(self):
+        if self.optional and not os.path.exists(self.path):
+            return None
+        return data_fingerprint(self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                version = self._fingerprint()
+            except OSError:
+                # Archivo a medio reemplazar: se revisa en la próxima vuelta
+                continue
+            if version in (self.version, self.rejected):
+                continue
+            try:
+                self.on_change(version)
+            except DataValidationError as exc:
+                # Se sigue sirviendo la versión anterior
+                _LOGGER.warning("Versión %s de los datos rechazada: %s", version, exc)
+                self.rejected, self.error = version, exc
+                continue
+            except Exception:
+                _LOGGER.exception("No se pudo precalentar la versión %s de los datos", version)
+                continue
+            self.version = version
+            self.rejected = self.error = None
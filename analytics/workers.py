@@ -0,0 +1,138 @@
+"""Ejecución en segundo plano de las secciones costosas del dashboard.
+
+Las secciones pesadas se envían a un pool al inicio de cada ejecución del
+script y sus resultados se dibujan en *placeholders* a medida que terminan,
+de modo que el resto de la página no espera por ellas.
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+
+from . import charts
+from .core import forecast
+
+# Intervalo (s) entre revisiones mientras se espera a las secciones
+POLL_SECONDS = 0.1
+# Espera (s) antes de calcular una sección cuyo cálculo anterior se
+# interrumpió hace menos de BURST_SECONDS: el usuario sigue moviendo filtros
+SETTLE_SECONDS = 0.3
+BURST_SECONDS = 2.0
+
+
+def create_pool(max_workers=None):
+    """Crea el pool compartido; por defecto un hilo por CPU (máximo 8)."""
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard-worker')
+
+
+def _unless_cancelled(cancelled, delay, fn, args, kwargs):
+    # ``wait`` vuelve en cuanto se cancela: un cálculo reemplazado durante
+    # la espera libera el hilo sin haber empezado
+    if cancelled.wait(delay):
+        raise CancelledError()
+    return fn(*args, **kwargs)
+
+
+class SectionScheduler:
+    """Cálculos en curso de una sesión, uno por sección.
+
+    Enviar de nuevo una sección (o llamar a ``cancel_all`` al iniciar una
+    ejecución) deja obsoleto el cálculo anterior: si seguía en cola ya no
+    se ejecuta y, si ya había empezado, su resultado no se dibuja. Los
+    cálculos terminados se olvidan para que la sesión no retenga sus
+    resultados.
+
+    Los cambios rápidos de un filtro se agrupan: el primero se calcula de
+    inmediato, pero si una sección se envía poco después de interrumpir
+    su cálculo anterior, espera ``settle`` segundos antes de empezar. Un
+    nuevo cambio durante esa espera la reemplaza, así que de una ráfaga
+    solo se calcula el último valor.
+
+    Los callbacks de los futures corren en los hilos del pool, así que el
+    registro se protege con un lock.
+    """
+
+    def __init__(self, pool, settle=SETTLE_SECONDS, burst=BURST_SECONDS):
+        self.pool = pool
+        self.settle = settle
+        self.burst = burst
+        self._running = {}
+        # Sección -> momento en que se interrumpió su último cálculo
+        self._interrupted = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs):
+        self.cancel(key)
+        with self._lock:
+            interrupted = self._interrupted.pop(key, None)
+        in_burst = interrupted is not None and time.monotonic() - interrupted < self.burst
+        cancelled = threading.Event()
+        future = self.pool.submit(_unless_cancelled, cancelled, self.settle if in_burst else 0,
+                                  fn, args, kwargs)
+        with self._lock:
+            self._running[key] = (future, cancelled)
+        # Fuera del lock: si el future ya terminó, el callback corre aquí mismo
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            entry = self._running.get(key)
+            if entry is not None and entry[0] is future:
+                del self._running[key]
+
+    def cancel(self, key):
+        with self._lock:
+            entry = self._running.pop(key, None)
+            if entry is not None and not entry[0].done():
+                self._interrupted[key] = time.monotonic()
+        if entry is not None:
+            future, cancelled = entry
+            cancelled.set()
+            # Fuera del lock: cancelar ejecuta los callbacks (``_forget``)
+            future.cancel()
+
+    def cancel_all(self):
+        with self._lock:
+            keys = list(self._running)
+        for key in keys:
+            self.cancel(key)
+
+
+def projection_section(df, horizon=3, growth=None):
+    """Proyección y su figura, listas para dibujar."""
+    df_yearly_pred, rates, projection = forecast(df, horizon=horizon, growth=growth)
+    fig = charts.projection_chart(df_yearly_pred, projection)
+    return rates, projection, fig
+
+
+def drain(pending, status=None, poll=POLL_SECONDS):
+    """Dibuja cada resultado en cuanto su future termina.
+
+    ``pending`` asocia cada future con la función que lo renderiza; las
+    funciones se llaman en el hilo que invoca ``drain`` (el del script).
+    Entre esperas de ``poll`` segundos se actualiza ``status`` (un
+    ``st.empty()``): cada llamada a ``st`` le permite a Streamlit detener
+    una ejecución obsoleta. Al salir, por cualquier motivo, se cancela lo
+    que aún no terminó.
+    """
+    waiting = set(pending)
+    try:
+        while waiting:
+            done, waiting = wait(waiting, timeout=poll, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except CancelledError:
+                    continue
+                pending[future](result)
+            if status is not None:
+                if waiting:
+                    status.caption(f"⏳ Calculando {len(waiting)} sección(es)...")
+                else:
+                    status.empty()
+    finally:
+        for future in waiting:
+            future.cancel()
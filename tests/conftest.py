@@ -0,0 +1,25 @@
+"""Fixtures compartidas: el dataset base y versiones más grandes de él."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from analytics.budgets import SCALES, fixture  # noqa: E402
+from analytics.core import DATA_PATH  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def base():
+    """Dataset del repositorio (una fila por año y período)."""
+    return pd.read_csv(os.path.join(ROOT, DATA_PATH))
+
+
+@pytest.fixture(scope='session', params=SCALES, ids=lambda scale: f"x{scale}")
+def scaled(request, base):
+    """Dataset repetido con años desplazados: más años, mismas invariantes."""
+    return fixture(base, request.param)
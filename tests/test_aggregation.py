@@ -0,0 +1,68 @@
+"""Agregación exacta de tasas (``analytics.aggregation``)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.aggregation import (
+    NUMERATOR_COLUMNS,
+    RATE_PAIRS,
+    aggregate,
+    finalize,
+    merge_partials,
+    partial_aggregate,
+    weighted_rate,
+    with_numerators,
+)
+
+
+@pytest.fixture
+def periods():
+    # Dos períodos con distinto número de matriculados
+    return pd.DataFrame({
+        'Year': [2020, 2020],
+        'Term': ['Spring', 'Fall'],
+        'Enrolled': [100, 300],
+        'Retention Rate (%)': [90.0, 70.0],
+        'Student Satisfaction (%)': [80.0, 60.0],
+    })
+
+
+def test_rates_are_weighted_by_enrollment(periods):
+    result = aggregate(periods, 'Year')
+    assert result['Enrolled'].tolist() == [400]
+    # 0.9·100 + 0.7·300 = 300 retenidos de 400, no el promedio simple (80)
+    assert result['Retention Rate (%)'].iloc[0] == pytest.approx(75.0)
+    assert result['Student Satisfaction (%)'].iloc[0] == pytest.approx(65.0)
+    assert weighted_rate(periods, 'Retention Rate (%)') == pytest.approx(75.0)
+
+
+def test_numerators_are_students(periods):
+    df = with_numerators(periods)
+    assert df['Retained'].tolist() == [90.0, 210.0]
+    assert df['Satisfied'].tolist() == [80.0, 180.0]
+    # Sin el denominador no se agrega el numerador
+    assert 'Retained' not in with_numerators(periods.drop(columns='Enrolled'))
+
+
+def test_partials_keep_numerators_and_drop_rates(periods):
+    partial = partial_aggregate(periods, ['Year', 'Term'])
+    assert set(NUMERATOR_COLUMNS) <= set(partial.columns)
+    assert not set(RATE_PAIRS) & set(partial.columns)
+    final = finalize(partial)
+    assert list(final.columns[:2]) == ['Year', 'Term']
+    assert not set(NUMERATOR_COLUMNS) & set(final.columns)
+
+
+def test_merged_blocks_match_the_full_pass(scaled):
+    by = ['Year', 'Term']
+    blocks = np.array_split(np.arange(len(scaled)), 7)
+    merged = merge_partials([partial_aggregate(scaled.iloc[rows], by) for rows in blocks])
+    expected = aggregate(scaled, by)
+    pd.testing.assert_frame_equal(finalize(merged), expected, check_dtype=False)
+
+
+def test_merge_sums_overlapping_keys(periods):
+    spring = partial_aggregate(periods.iloc[:1], 'Year')
+    fall = partial_aggregate(periods.iloc[1:], 'Year')
+    merged = merge_partials([spring, fall])
+    pd.testing.assert_frame_equal(merged, partial_aggregate(periods, 'Year'), check_dtype=False)
@@ -0,0 +1,108 @@
+"""API REST/JSON local (``analytics.api``)."""
+import asyncio
+import json
+
+import pytest
+
+from analytics import store as store_module
+from analytics.api import create_app, not_modified
+
+
+@pytest.fixture
+def app(base, tmp_path, monkeypatch):
+    # El almacén se crea en ``.cache/store`` relativo al directorio actual
+    monkeypatch.chdir(tmp_path)
+    base.to_csv(tmp_path / 'data.csv', index=False)
+    yield create_app(str(tmp_path / 'data.csv'), str(tmp_path / 'events.csv'), watch=False)
+    with store_module._OPEN_LOCK:
+        store_module._OPEN_STORES.clear()
+
+
+def get(app, path, headers=()):
+    """(status, cabeceras, cuerpo) de un GET enviado directo a la app ASGI."""
+    route, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': route, 'raw_path': route.encode(), 'root_path': '',
+        'query_string': query.encode(), 'server': ('testserver', 80), 'client': ('test', 1),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], {k.decode(): v.decode() for k, v in start['headers']}, body
+
+
+def test_responses_carry_an_etag(app):
+    status, headers, body = get(app, '/api/yearly?start=2018&end=2020')
+    assert status == 200
+    assert [row['Year'] for row in json.loads(body)] == [2018, 2019, 2020]
+    assert headers['etag'].startswith('"') and headers['cache-control'] == 'no-cache'
+    # Misma versión y filtro: misma etiqueta
+    assert get(app, '/api/yearly?end=2020&start=2018')[1]['etag'] == headers['etag']
+    assert get(app, '/api/yearly?start=2019')[1]['etag'] != headers['etag']
+
+
+@pytest.mark.parametrize('if_none_match', [
+    '{etag}',
+    'W/{etag}',
+    '"otra", {etag}',
+    '"otra",W/{etag} , "más"',
+    '*',
+])
+def test_matching_if_none_match_gets_304(app, if_none_match):
+    etag = get(app, '/api/kpis')[1]['etag']
+    status, headers, body = get(app, '/api/kpis', [('If-None-Match', if_none_match.format(etag=etag))])
+    assert status == 304
+    assert body == b''
+    assert headers['etag'] == etag
+
+
+@pytest.mark.parametrize('if_none_match', [
+    '"otra"',
+    # Antes bastaba con aparecer como subcadena
+    '"x{etag}"',
+    '{inner}',
+    '',
+])
+def test_other_tags_get_the_body(app, if_none_match):
+    etag = get(app, '/api/kpis')[1]['etag']
+    inner = etag.strip('"')
+    status, _, body = get(app, '/api/kpis', [('If-None-Match', if_none_match.format(etag=etag, inner=inner))])
+    assert status == 200
+    assert json.loads(body)['total_apps'] == 59400
+
+
+def test_not_modified_parses_the_list():
+    assert not_modified('W/"a", "b"', '"b"')
+    assert not_modified(' * ', '"b"')
+    assert not not_modified('"ab"', '"b"')
+    assert not not_modified('"a, b"', '"b"')
+
+
+@pytest.mark.parametrize('path', [
+    '/api/yearly?start=2020&end=2018',
+    '/api/growth?start=2020&end=2018',
+    '/api/departments?start=dos',
+    '/api/terms?years=2015,x',
+    '/api/funnel?terms=Winter',
+])
+def test_bad_parameters_get_400(app, path):
+    status, headers, body = get(app, path)
+    assert status == 400
+    assert headers['content-type'] == 'application/json'
+    assert json.loads(body)['error']
+
+
+def test_empty_range_is_valid_json(app):
+    status, _, body = get(app, '/api/growth?start=2030&end=2040')
+    assert status == 200
+    assert json.loads(body) == []
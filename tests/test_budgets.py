@@ -0,0 +1,86 @@
+"""Valores de referencia y presupuestos de cada sección (``analytics.budgets``).
+
+Una prueba por fixture y sección: los números de la ruta de la app
+coinciden con la ruta de referencia y con los valores legibles de
+``golden/``, y el tiempo se compara como razón (a lo sumo 1) frente a la
+referencia medida en la misma corrida, no en milisegundos absolutos.
+"""
+import pytest
+
+from analytics import budgets
+
+STORED = budgets.load_budgets()
+CASES = [
+    (scale, name)
+    for scale in budgets.SCALES
+    for name in STORED['fixtures'][f"x{scale}"]['sections']
+]
+GOLDEN = {scale: budgets.load_golden(scale) for scale in budgets.SCALES}
+GOLDEN_CASES = [(scale, name) for scale, values in GOLDEN.items() for name in values]
+
+
+@pytest.fixture(scope='module')
+def measured(base):
+    results = {}
+
+    def get(scale):
+        if scale not in results:
+            results[scale] = budgets.measure(budgets.fixture(base, scale))
+        return results[scale]
+    return get
+
+
+def _expected(scale, name):
+    return STORED['fixtures'][f"x{scale}"]['sections'][name]
+
+
+def test_budgets_match_dataset(base):
+    # Si el CSV cambia, los valores de referencia deben regenerarse (--update)
+    assert budgets._source_hash(base) == STORED['source']
+
+
+@pytest.mark.parametrize('scale, name', CASES, ids=[f"x{scale}-{name}" for scale, name in CASES])
+def test_matches_reference_path(measured, scale, name):
+    assert measured(scale)[name].get('matches_reference', True)
+
+
+@pytest.mark.parametrize('scale, name', GOLDEN_CASES, ids=[f"x{scale}-{name}" for scale, name in GOLDEN_CASES])
+def test_golden_values(measured, scale, name):
+    assert budgets.differences(GOLDEN[scale][name], measured(scale)[name]['values']) == []
+
+
+@pytest.mark.parametrize('scale, name', CASES, ids=[f"x{scale}-{name}" for scale, name in CASES])
+def test_budget_is_at_most_the_reference(scale, name):
+    assert _expected(scale, name)['max_ratio'] <= 1.0
+
+
+@pytest.mark.parametrize('scale, name', CASES, ids=[f"x{scale}-{name}" for scale, name in CASES])
+def test_time_ratio_budget(measured, scale, name):
+    result, expected = measured(scale)[name], _expected(scale, name)
+    assert result['time_ms'] <= result['reference_ms'] * expected['max_ratio'], (
+        f"{result['time_ms']:.2f} ms frente a {result['reference_ms']:.2f} ms de referencia "
+        f"(máximo ×{expected['max_ratio']})")
+
+
+@pytest.mark.parametrize('scale, name', CASES, ids=[f"x{scale}-{name}" for scale, name in CASES])
+def test_payload_budget(measured, scale, name):
+    result, expected = measured(scale)[name], _expected(scale, name)
+    if 'bytes' not in expected:
+        pytest.skip("sección sin figura")
+    assert result['bytes'] <= expected['bytes']
+
+
+def test_kpis_of_base_dataset(measured):
+    # Cifras del encabezado del dataset del repositorio, a la vista
+    kpis = measured(1)['kpis']['values']
+    assert kpis['total_apps'] == 59400
+    assert kpis['total_enrolled'] == 13980
+    assert (kpis['first_year'], kpis['last_year']) == (2015, 2024)
+    assert kpis['admission_rate'] == pytest.approx(59.090909)
+    assert kpis['avg_retention'] == pytest.approx(87.217454)
+
+
+def test_differences_are_readable():
+    expected = [{'x': [2015, 2016], 'y': [1.0, 2.0]}]
+    actual = [{'x': [2015, 2016], 'y': [1.0, 2.5]}]
+    assert budgets.differences(expected, actual) == ["[0].y[1]: 2.0 → 2.5"]
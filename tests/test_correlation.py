@@ -0,0 +1,78 @@
+"""Correlaciones entre métricas y departamentos (``analytics.correlation``)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.correlation import ROLLING_WINDOW, CorrelationEngine, strength
+from analytics.pyramid import RollupPyramid
+
+PAIR = ('Student Satisfaction (%)', 'Retention Rate (%)')
+
+
+@pytest.fixture(scope='module')
+def engine(scaled):
+    return CorrelationEngine.from_pyramid(RollupPyramid.from_frame(scaled))
+
+
+@pytest.fixture(scope='module')
+def matrix(engine):
+    return pd.DataFrame(engine.values, index=engine.index, columns=engine.columns)
+
+
+def test_periods_are_chronological(engine):
+    years = engine.index.get_level_values('Year')
+    assert (np.diff(years) >= 0).all()
+    assert list(engine.index[:2]) == [(years[0], 'Spring'), (years[0], 'Fall')]
+
+
+def test_matrix_matches_pandas(engine, matrix):
+    np.testing.assert_allclose(engine.corr.to_numpy(), matrix.corr().to_numpy(), atol=1e-9)
+
+
+def test_rolling_pair_matches_pandas(engine, matrix):
+    a, b = PAIR
+    rolling = engine.rolling_pair(a, b)
+    expected = matrix[a].rolling(ROLLING_WINDOW).corr(matrix[b]).iloc[ROLLING_WINDOW - 1:]
+    assert rolling.index.equals(expected.index)
+    np.testing.assert_allclose(rolling.to_numpy(), expected.to_numpy(), atol=1e-6)
+
+
+@pytest.mark.parametrize('batch', [1, 3, 64])
+def test_all_pairs_tensor_is_the_same_in_any_batch(engine, batch):
+    window = 4
+    tensor = engine.rolling(window, batch=batch)
+    k = len(engine.columns)
+    assert tensor.shape == (len(engine.values) - window + 1, k, k)
+    i, j = engine.columns.index(PAIR[0]), engine.columns.index(PAIR[1])
+    np.testing.assert_array_equal(tensor[:, i, j], engine.rolling_pair(*PAIR, window=window).to_numpy())
+    np.testing.assert_array_equal(tensor, engine.rolling(window, batch=k))
+
+
+def test_cross_correlation_lags(engine, matrix):
+    a, b = PAIR
+    cross = engine.cross_correlation(a, b)
+    assert cross.index.tolist() == list(range(-engine.max_lag, engine.max_lag + 1))
+    assert cross[0] == pytest.approx(engine.corr.loc[a, b])
+    for lag in (1, 2):
+        # corr(a(t), b(t + L)) y su simétrico con rezago negativo
+        assert cross[lag] == pytest.approx(matrix[a].iloc[:-lag].corr(matrix[b].iloc[lag:].set_axis(matrix.index[:-lag])))
+        assert cross[-lag] == pytest.approx(matrix[b].iloc[:-lag].corr(matrix[a].iloc[lag:].set_axis(matrix.index[:-lag])))
+
+
+def test_drivers_rank_by_strongest_lag(engine):
+    drivers = engine.drivers('Retention Rate (%)')
+    assert 'Retention Rate (%)' not in drivers['Métrica'].tolist()
+    assert len(drivers) == len(engine.columns) - 1
+    strengths = drivers['Correlación con rezago'].abs().to_numpy()
+    assert (np.diff(strengths) <= 1e-12).all()
+    assert drivers['Rezago (períodos)'].between(0, engine.max_lag).all()
+
+
+@pytest.mark.parametrize('r, label', [
+    (0.85, "alta positiva"),
+    (-0.5, "moderada negativa"),
+    (0.1, "baja positiva"),
+    (np.nan, "sin datos"),
+])
+def test_strength_labels(r, label):
+    assert strength(r) == label
@@ -0,0 +1,94 @@
+"""Embudo por aplicante y cohorte (``analytics.funnel``)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.core import DEPARTMENT_COLUMNS
+from analytics.funnel import DEPARTMENT_NAMES, STAGE_COLUMNS, FunnelEngine, stage_table, synthesize_events
+
+
+def _events(rows):
+    return pd.DataFrame(rows, columns=['Applicant ID', 'Year', 'Term', 'Department', 'Stage'])
+
+
+@pytest.fixture(scope='module')
+def engine(base):
+    funnel = FunnelEngine(capacity=16)
+    for chunk in synthesize_events(base):
+        funnel.update(chunk)
+    return funnel
+
+
+def test_totals_match_the_aggregated_dataset(base, engine):
+    totals = engine.query()
+    retained = sum(round(row['Enrolled'] * row['Retention Rate (%)'] / 100) for _, row in base.iterrows())
+    assert engine.applicants == base['Applications'].sum()
+    assert list(totals) == [base['Applications'].sum(), base['Admitted'].sum(), base['Enrolled'].sum(), retained]
+
+
+def test_yearly_counts_match_the_dataset(base, engine):
+    by_year = engine.query(by=['Year'])
+    expected = base.groupby('Year')[['Applications', 'Admitted', 'Enrolled']].sum()
+    pd.testing.assert_frame_equal(by_year[['Applications', 'Admitted', 'Enrolled']], expected, check_dtype=False)
+
+
+def test_departments_hold_at_least_their_enrolled(base, engine):
+    # Los matriculados sin departamento se reparten además entre departamentos
+    enrolled = engine.query(by=['Department'])['Enrolled']
+    for name, col in zip(DEPARTMENT_NAMES, DEPARTMENT_COLUMNS):
+        assert enrolled[name] >= base[col].sum()
+    assert enrolled.sum() == base['Enrolled'].sum()
+
+
+def test_filters_select_cohorts(base, engine):
+    spring = engine.query(start=2018, end=2020, terms=['Spring'])
+    expected = base[base['Year'].between(2018, 2020) & (base['Term'] == 'Spring')]
+    assert spring['Applications'] == expected['Applications'].sum()
+    # El resultado de cada filtro se memoriza hasta el siguiente update
+    assert engine.query(start=2018, end=2020, terms=['Spring']) is spring
+
+
+def test_sparse_ids_use_dense_slots():
+    funnel = FunnelEngine(capacity=2)
+    funnel.update(_events([
+        (2024000123, 2024, 'Fall', 'Arts', 'Applied'),
+        (2024000123, 2024, 'Fall', 'Arts', 'Admitted'),
+        (9_000_000_000_000, 2024, 'Fall', 'Arts', 'Applied'),
+    ]))
+    funnel.update(_events([
+        (7, 2024, 'Fall', 'Science', 'Applied'),
+        (2024000123, 2024, 'Fall', 'Arts', 'Enrolled'),
+    ]))
+    assert funnel.applicants == 3
+    assert funnel.events == 5
+    assert list(funnel.query()) == [3, 1, 1, 0]
+
+
+def test_stages_require_the_previous_ones():
+    # Admitido sin haber aplicado: no cuenta como admitido
+    funnel = FunnelEngine().update(_events([
+        (1, 2020, 'Spring', 'Business', 'Admitted'),
+        (2, 2020, 'Spring', 'Business', 'Applied'),
+        (2, 2020, 'Spring', 'Business', 'Retained'),
+    ]))
+    assert list(funnel.query()) == [1, 0, 0, 0]
+
+
+@pytest.mark.parametrize('column, value', [
+    ('Stage', 'Graduated'),
+    ('Term', 'Summer'),
+    ('Department', 'Medicine'),
+    ('Applicant ID', -1),
+])
+def test_invalid_events_are_rejected(column, value):
+    events = _events([(1, 2020, 'Fall', 'Arts', 'Applied')])
+    events[column] = value
+    with pytest.raises(ValueError):
+        FunnelEngine().update(events)
+
+
+def test_stage_table_percentages():
+    table = stage_table(pd.Series([200, 100, 50, 40], index=STAGE_COLUMNS))
+    assert table['Cantidad'].tolist() == [200, 100, 50, 40]
+    assert table['Porcentaje'].tolist() == [100.0, 50.0, 25.0, 20.0]
+    assert stage_table(pd.Series(np.zeros(4), index=STAGE_COLUMNS))['Porcentaje'].tolist() == [0.0] * 4
@@ -0,0 +1,85 @@
+"""Consultas de crecimiento por rango de años (``analytics.growth``)."""
+import numpy as np
+import pytest
+
+from analytics.core import DEPARTMENT_COLUMNS, RATE_COLUMNS, yearly_rollup
+from analytics.growth import GrowthTable
+
+COLUMNS = ['Applications', 'Enrolled'] + RATE_COLUMNS + DEPARTMENT_COLUMNS[:1]
+
+
+@pytest.fixture(scope='module')
+def growth(scaled):
+    return GrowthTable.from_frame(scaled)
+
+
+def _direct(scaled, column, start, end):
+    # Cálculo directo sobre el agregado anual filtrado
+    yearly = yearly_rollup(scaled, columns=[column])
+    yearly = yearly[yearly['Year'].between(start, end)]
+    initial, final = yearly[column].iloc[0], yearly[column].iloc[-1]
+    span = yearly['Year'].iloc[-1] - yearly['Year'].iloc[0]
+    return {
+        'start': yearly['Year'].iloc[0],
+        'end': yearly['Year'].iloc[-1],
+        'initial': initial,
+        'final': final,
+        'change': final - initial,
+        'growth_pct': (final / initial - 1) * 100,
+        'cagr_pct': ((final / initial) ** (1 / span) - 1) * 100 if span else 0.0,
+        'mean': yearly[column].mean(),
+    }
+
+
+@pytest.mark.parametrize('offset, length', [(0, None), (0, 1), (2, 5), (3, 0)])
+@pytest.mark.parametrize('column', COLUMNS)
+def test_range_matches_direct_computation(scaled, growth, column, offset, length):
+    first, last = int(scaled['Year'].min()), int(scaled['Year'].max())
+    start = first + offset
+    end = last if length is None else start + length
+    result = growth.growth(column, start, end)
+    for key, value in _direct(scaled, column, start, end).items():
+        assert result[key] == pytest.approx(value), key
+
+
+def test_range_of_several_columns_matches_growth(growth):
+    table = growth.range(2016, 2021, columns=COLUMNS)
+    for column in COLUMNS:
+        single = growth.growth(column, 2016, 2021)
+        for key in table.columns:
+            assert table.loc[column, key] == pytest.approx(single[key]), (column, key)
+
+
+def test_open_and_outer_bounds_clamp_to_data(growth):
+    whole = growth.growth('Enrolled')
+    assert growth.growth('Enrolled', 1900, 99999) == whole
+    assert (whole['start'], whole['end']) == (int(growth.years[0]), int(growth.years[-1]))
+
+
+def test_years_without_data_snap_inward(base):
+    growth = GrowthTable.from_frame(base[~base['Year'].isin([2018, 2019])])
+    result = growth.growth('Enrolled', 2018, 2021)
+    assert (result['start'], result['end']) == (2020, 2021)
+    assert growth.growth('Enrolled', 2015, 2019)['end'] == 2017
+
+
+@pytest.mark.parametrize('case', ['inverted', 'after-last', 'before-first'])
+def test_empty_ranges_raise(growth, case):
+    first, last = int(growth.years[0]), int(growth.years[-1])
+    start, end = {
+        'inverted': (first + 3, first),
+        'after-last': (last + 1, last + 11),
+        'before-first': (first - 25, first - 15),
+    }[case]
+    with pytest.raises(ValueError, match="No hay años con datos"):
+        growth.growth('Enrolled', start, end)
+    with pytest.raises(ValueError):
+        growth.range(start, end)
+
+
+def test_year_over_year_tables(base):
+    growth = GrowthTable.from_frame(base)
+    enrolled = yearly_rollup(base, columns=['Enrolled']).set_index('Year')['Enrolled'].astype(float)
+    np.testing.assert_allclose(growth.delta['Enrolled'].iloc[1:], enrolled.diff().iloc[1:])
+    np.testing.assert_allclose(growth.pct['Enrolled'].iloc[1:], enrolled.pct_change().iloc[1:] * 100)
+    np.testing.assert_allclose(growth.cumulative['Enrolled'], (enrolled / enrolled.iloc[0] - 1) * 100)
@@ -0,0 +1,132 @@
+"""Dataset particionado por año (``analytics.partitions``)."""
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from analytics.core import load_dataset
+from analytics.partitions import (
+    MANIFEST,
+    append_partitions,
+    is_partitioned,
+    load_partitions,
+    main,
+    partition_years,
+    read_manifest,
+    select_partitions,
+    write_partitions,
+)
+from analytics.sketches import ingest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sorted(df):
+    return df.sort_values(['Year', 'Term']).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('by_term', [False, True])
+def test_partitions_round_trip(base, tmp_path, by_term):
+    root = str(tmp_path / 'parts')
+    manifest = write_partitions(base, root, by_term=by_term)
+    assert is_partitioned(root)
+    assert len(manifest['partitions']) == (len(base) if by_term else base['Year'].nunique())
+    assert sum(entry['rows'] for entry in manifest['partitions']) == len(base)
+    pd.testing.assert_frame_equal(_sorted(load_partitions(root)), _sorted(base))
+    assert partition_years(root) == sorted(base['Year'].unique())
+
+
+def test_manifest_stats_describe_each_file(base, tmp_path):
+    root = str(tmp_path / 'parts')
+    write_partitions(base, root)
+    for entry in read_manifest(root)['partitions']:
+        part = base[base['Year'] == entry['year']]
+        assert entry['bytes'] == os.path.getsize(os.path.join(root, entry['file']))
+        assert entry['stats']['Enrolled']['sum'] == part['Enrolled'].sum()
+        assert entry['stats']['Enrolled']['min'] == part['Enrolled'].min()
+        assert entry['stats']['Enrolled']['max'] == part['Enrolled'].max()
+
+
+def test_range_reads_only_the_selected_files(base, tmp_path):
+    root = str(tmp_path / 'parts')
+    write_partitions(base, root, by_term=True)
+    selected = select_partitions(read_manifest(root), 2018, 2020, ['Fall'])
+    assert [(entry['year'], entry['term']) for entry in selected] == [(2018, 'Fall'), (2019, 'Fall'), (2020, 'Fall')]
+    # Los archivos de fuera del rango no se abren: borrarlos no cambia el resultado
+    for entry in read_manifest(root)['partitions']:
+        if entry not in selected:
+            os.remove(os.path.join(root, entry['file']))
+    df = load_partitions(root, 2018, 2020, ['Fall'])
+    expected = base[base['Year'].between(2018, 2020) & (base['Term'] == 'Fall')]
+    pd.testing.assert_frame_equal(_sorted(df), _sorted(expected))
+
+
+def test_term_filter_on_yearly_partitions(base, tmp_path):
+    root = str(tmp_path / 'parts')
+    write_partitions(base, root)
+    df = load_partitions(root, terms=['Spring'])
+    assert set(df['Term']) == {'Spring'}
+    assert len(df) == (base['Term'] == 'Spring').sum()
+
+
+def test_empty_range_keeps_the_columns(base, tmp_path):
+    root = str(tmp_path / 'parts')
+    write_partitions(base, root)
+    df = load_partitions(root, 2030, 2040)
+    assert df.empty
+    assert list(df.columns) == list(base.columns)
+
+
+def test_append_replaces_only_its_years(base, tmp_path):
+    root = str(tmp_path / 'parts')
+    write_partitions(base[base['Year'] < 2024], root, by_term=True)
+    new_year = base[base['Year'] == 2024]
+    # Una carpeta existente conserva su granularidad
+    manifest = append_partitions(root, new_year, by_term=False)
+    assert manifest['by_term'] is True
+    corrected = base[base['Year'] == 2023].assign(Enrolled=1)
+    append_partitions(root, corrected)
+    df = _sorted(load_partitions(root))
+    assert len(df) == len(base)
+    assert (df.loc[df['Year'] == 2023, 'Enrolled'] == 1).all()
+    assert df.loc[df['Year'] == 2022, 'Enrolled'].tolist() == base.loc[base['Year'] == 2022, 'Enrolled'].tolist()
+    years = [entry['year'] for entry in read_manifest(root)['partitions']]
+    assert years == sorted(years)
+
+
+def test_rewrite_removes_the_previous_layout(base, tmp_path):
+    root = str(tmp_path / 'parts')
+    write_partitions(base, root, by_term=True)
+    write_partitions(base, root)
+    assert sorted(os.listdir(root)) == sorted([MANIFEST] + [f"year={year}.csv" for year in base['Year'].unique()])
+
+
+def test_partitioned_folder_feeds_loading_and_ingest(base, tmp_path):
+    root = str(tmp_path / 'parts')
+    write_partitions(base, root, by_term=True)
+    pd.testing.assert_frame_equal(_sorted(load_dataset(root, 2016, 2017)),
+                                  _sorted(base[base['Year'].between(2016, 2017)]))
+    df, summary = ingest(root)
+    pd.testing.assert_frame_equal(_sorted(df), _sorted(base))
+    # Pocas filas: el resumen partición por partición es exacto
+    pd.testing.assert_frame_equal(summary.describe(), base.describe()[list(summary.columns)])
+
+
+def test_cli_writes_the_folder(base, tmp_path, capsys):
+    csv = tmp_path / 'data.csv'
+    base.to_csv(csv, index=False)
+    main(['--data', str(csv), '--out', str(tmp_path / 'parts')])
+    assert is_partitioned(str(tmp_path / 'parts'))
+    assert 'year=2015.csv' in capsys.readouterr().out
+
+
+def test_module_runs_without_warnings(base, tmp_path):
+    csv = tmp_path / 'data.csv'
+    base.to_csv(csv, index=False)
+    result = subprocess.run(
+        [sys.executable, '-W', 'error', '-m', 'analytics.partitions', '--data', str(csv), '--out', str(tmp_path / 'parts')],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
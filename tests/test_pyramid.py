@@ -0,0 +1,95 @@
+"""Pirámide de agregados por granularidad (``analytics.pyramid``)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import charts
+from analytics.budgets import fixture
+from analytics.core import DEPARTMENT_COLUMNS, department_trend, term_comparison, yearly_rollup
+from analytics.pyramid import LUSTRUM, MAX_POINTS, RollupPyramid
+
+
+@pytest.fixture(scope='module')
+def long(base):
+    # 2015–2044: rangos de más de MAX_POINTS años pasan al nivel lustrum
+    return fixture(base, 3)
+
+
+@pytest.fixture(scope='module')
+def pyramid(long):
+    return RollupPyramid.from_frame(long)
+
+
+def _columns(frame):
+    return frame[DEPARTMENT_COLUMNS].to_numpy(dtype=float)
+
+
+def test_year_level_matches_the_raw_rollup(scaled):
+    pyramid = RollupPyramid.from_frame(scaled)
+    expected = yearly_rollup(scaled)
+    actual = pyramid.rollup('year')[expected.columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_by_term_matches_term_comparison(pyramid, long):
+    years = [2016, 2020, 2031]
+    expected = term_comparison(long, years)
+    actual = pyramid.by_term(years)[expected.columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_year_range_is_a_label_slice(pyramid, long):
+    partial = pyramid.partial('year', 2018, 2022)
+    assert list(partial.index) == list(range(2018, 2023))
+    np.testing.assert_array_equal(_columns(partial), _columns(department_trend(long, (2018, 2022))))
+
+
+def test_full_lustrum_blocks_sum_their_five_years(pyramid, long):
+    blocks = pyramid.levels['lustrum']
+    assert list(blocks.index) == list(range(2015, 2045, LUSTRUM))
+    by_year = department_trend(long)
+    expected = by_year[DEPARTMENT_COLUMNS].groupby(by_year['Year'] // LUSTRUM * LUSTRUM).sum()
+    np.testing.assert_array_equal(_columns(blocks), expected.to_numpy(dtype=float))
+
+
+def test_edge_blocks_only_sum_the_years_in_range(pyramid, long):
+    partial = pyramid.partial('lustrum', 2017, 2031)
+    assert list(partial.index) == [2015, 2020, 2025, 2030]
+    first = department_trend(long, (2017, 2019))[DEPARTMENT_COLUMNS].sum()
+    np.testing.assert_array_equal(partial.loc[2015, DEPARTMENT_COLUMNS].to_numpy(dtype=float),
+                                  first.to_numpy(dtype=float))
+
+
+def test_choose_level_keeps_at_most_max_points(pyramid):
+    assert pyramid.choose_level(2015, 2015 + MAX_POINTS - 1) == 'year'
+    assert pyramid.choose_level(2015, 2015 + MAX_POINTS) == 'lustrum'
+    assert pyramid.choose_level() == 'lustrum'
+
+
+def test_short_trend_is_yearly(pyramid, long):
+    trend = pyramid.trend(DEPARTMENT_COLUMNS, 2017, 2020)
+    assert list(trend.columns) == ['Year'] + DEPARTMENT_COLUMNS
+    np.testing.assert_array_equal(_columns(trend), _columns(department_trend(long, (2017, 2020))))
+
+
+def test_lustrum_trend_labels_the_covered_years_and_averages(pyramid, long):
+    trend = pyramid.trend(DEPARTMENT_COLUMNS, 2017, 2031)
+    assert list(trend['Year']) == ['2017–2019', '2020–2024', '2025–2029', '2030–2031']
+    assert list(trend['Años']) == [3, 5, 5, 2]
+    by_year = department_trend(long, (2017, 2031))
+    for row, (first, last) in zip(_columns(trend), [(2017, 2019), (2020, 2024), (2025, 2029), (2030, 2031)]):
+        years = by_year[by_year['Year'].between(first, last)]
+        np.testing.assert_allclose(row, _columns(years).mean(axis=0))
+
+
+def test_single_year_edge_is_labelled_with_that_year(pyramid):
+    trend = pyramid.trend(DEPARTMENT_COLUMNS, 2015, 2030)
+    assert list(trend['Year'])[-1] == '2030'
+    assert list(trend['Años']) == [5, 5, 5, 1]
+
+
+def test_trend_chart_marks_partial_periods(pyramid):
+    fig = charts.department_trend_chart(pyramid.trend(DEPARTMENT_COLUMNS, 2017, 2031))
+    assert list(fig.data[0].x) == ['2017–2019', '2020–2024', '2025–2029', '2030–2031']
+    assert list(fig.data[0].marker.symbol) == ['circle-open', 'circle', 'circle', 'circle-open']
+    assert 'promedio' in fig.layout.yaxis.title.text
@@ -0,0 +1,73 @@
+"""Simulador de escenarios sobre el agregado anual (``analytics.scenarios``)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.core import DEPARTMENTS, department_shares, executive_summary, forecast, funnel_table
+from analytics.pyramid import RollupPyramid
+from analytics.scenarios import MAX_DELTA, ScenarioEngine
+
+
+@pytest.fixture(scope='module')
+def engine(scaled):
+    return ScenarioEngine.from_pyramid(RollupPyramid.from_frame(scaled))
+
+
+def test_zero_deltas_reproduce_core(scaled, engine):
+    result = engine.evaluate()
+    funnel = engine.funnel_data(result)
+    expected = funnel_table(executive_summary(scaled))
+    assert funnel['Cantidad'].tolist() == expected['Cantidad'].tolist()
+    np.testing.assert_allclose(funnel['Porcentaje'], expected['Porcentaje'].astype(float))
+
+    departments = engine.department_data(result)
+    pd.testing.assert_frame_equal(departments.reset_index(drop=True),
+                                  department_shares(scaled).reset_index(drop=True)[departments.columns],
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(engine.projection(result), forecast(scaled)[2], check_dtype=False)
+
+
+def test_batch_matches_one_by_one(engine):
+    admissions, yields = [-5.0, 0.0, 7.5], [3.0, -2.0, 0.0]
+    mixes = [[1.0, 0.0, -1.0, 0.0], [0.0] * len(DEPARTMENTS), [-4.0, 2.0, 2.0, 0.0]]
+    batch = engine.evaluate(admissions, yields, mixes)
+    for idx in range(3):
+        single = engine.evaluate([admissions[idx]], [yields[idx]], [mixes[idx]])
+        for key, values in batch.items():
+            np.testing.assert_array_equal(values[idx], single[key][0], err_msg=key)
+
+
+def test_deltas_move_the_funnel_in_their_direction(engine):
+    result = engine.evaluate([0.0, 5.0, 0.0, 0.0], [0.0, 0.0, -5.0, 0.0])
+    base, more_admitted, lower_yield, _ = range(4)
+    assert result['admitted'][more_admitted] > result['admitted'][base]
+    assert result['enrolled'][more_admitted] > result['enrolled'][base]
+    assert result['admitted'][lower_yield] == result['admitted'][base]
+    assert result['enrolled'][lower_yield] < result['enrolled'][base]
+    assert result['applications'].tolist() == [engine.applications.sum()] * 4
+
+
+def test_rates_are_clipped(engine):
+    result = engine.evaluate([MAX_DELTA * 10], [MAX_DELTA * 10])
+    # Admisión y rendimiento al 100 %: todos los aplicantes se matriculan
+    assert result['admitted'][0] == result['applications'][0]
+    assert result['enrolled'][0] == result['applications'][0]
+
+
+def test_mix_shifts_shares_and_keeps_totals(engine):
+    shift = np.zeros((2, len(DEPARTMENTS)))
+    shift[1, 0] = 10.0
+    result = engine.evaluate(mix=shift)
+    shares = result['departments'] / result['departments'].sum(axis=1, keepdims=True)
+    assert shares[1, 0] > shares[0, 0]
+    assert (shares[1, 1:] < shares[0, 1:]).all()
+    # La mezcla solo reparte: el total con departamento no cambia (salvo redondeo)
+    assert abs(result['departments'][1].sum() - result['departments'][0].sum()) <= len(engine.years) * len(DEPARTMENTS)
+
+
+def test_comparison_has_one_row_per_scenario(engine):
+    result = engine.evaluate([0.0, 2.0, -2.0])
+    table = engine.comparison(result, ['Base', 'Más admisión', 'Menos admisión'])
+    assert table['Escenario'].tolist() == ['Base', 'Más admisión', 'Menos admisión']
+    assert f"Matrícula {engine.final_year}" in table
+    np.testing.assert_allclose(table[[f"{name} (%)" for _, name, _, _ in DEPARTMENTS]].sum(axis=1), 100)
@@ -0,0 +1,111 @@
+"""Estadísticas incrementales y combinables (``analytics.sketches``)."""
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.sketches import DatasetSummary, QuantileSketch, RunningMoments, ingest, summarize
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+@pytest.fixture(scope='module')
+def values():
+    rng = np.random.default_rng(7)
+    return np.concatenate([rng.normal(100, 15, 60_000), rng.exponential(40, 40_000)])
+
+
+def _blocks(values, count=13):
+    return np.array_split(values, count)
+
+
+def test_moments_match_numpy_by_blocks(values):
+    moments = RunningMoments()
+    for block in _blocks(values):
+        moments.update(block)
+    assert moments.count == values.size
+    assert moments.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert moments.std == pytest.approx(values.std(ddof=1), rel=1e-10)
+    assert (moments.min, moments.max) == (values.min(), values.max())
+
+
+def test_merged_moments_match_numpy(values):
+    merged = RunningMoments()
+    for block in _blocks(values, 5):
+        partial = RunningMoments()
+        partial.update(block)
+        merged.merge(partial)
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.std == pytest.approx(values.std(ddof=1), rel=1e-10)
+
+
+def test_moments_ignore_nan_and_empty_input():
+    moments = RunningMoments()
+    moments.update([])
+    moments.update([math.nan])
+    assert moments.count == 0 and math.isnan(moments.std)
+    moments.update([1.0, math.nan, 3.0])
+    assert (moments.count, moments.mean, moments.std) == (2, 2.0, pytest.approx(math.sqrt(2)))
+
+
+def test_small_inputs_have_exact_quantiles():
+    data = np.array([5.0, 1.0, 4.0, 2.0, 3.0, 10.0])
+    sketch = QuantileSketch(k=200)
+    sketch.update(data)
+    for q in QUANTILES:
+        assert sketch.quantile(q) == pytest.approx(pd.Series(data).quantile(q))
+
+
+def _rank_error(values, q, estimate):
+    return abs(np.searchsorted(np.sort(values), estimate) / values.size - q)
+
+
+def test_kll_quantiles_stay_within_rank_error(values):
+    sketch = QuantileSketch(k=200)
+    for block in _blocks(values):
+        sketch.update(block)
+    # Memoria acotada: compactó y guarda una fracción pequeña de los valores
+    assert len(sketch.levels) > 1
+    assert sum(level.size for level in sketch.levels) < 2_000
+    for q in QUANTILES:
+        assert _rank_error(values, q, sketch.quantile(q)) < 0.02, q
+    np.testing.assert_allclose([sketch.quantile(q) for q in (0.25, 0.5, 0.75)],
+                               np.quantile(values, [0.25, 0.5, 0.75]), rtol=0.05)
+
+
+def test_merged_sketches_stay_within_rank_error(values):
+    merged = QuantileSketch(k=200)
+    for seed, block in enumerate(_blocks(values, 4)):
+        partial = QuantileSketch(k=200, seed=seed)
+        partial.update(block)
+        merged.merge(partial)
+    for q in QUANTILES:
+        assert _rank_error(values, q, merged.quantile(q)) < 0.02, q
+
+
+def test_describe_matches_pandas(base):
+    expected = base.describe()
+    actual = summarize(base).describe()
+    pd.testing.assert_frame_equal(actual, expected[list(actual.columns)])
+
+
+def test_chunked_ingest_matches_a_single_pass(base, tmp_path):
+    path = tmp_path / 'data.csv'
+    base.to_csv(path, index=False)
+    df, summary = ingest(str(path), chunksize=3)
+    pd.testing.assert_frame_equal(df, base)
+    pd.testing.assert_frame_equal(summary.describe(), summarize(base).describe())
+
+
+def test_summary_round_trips_through_json(values):
+    df = pd.DataFrame({'x': values, 'y': values[::-1] * 2})
+    summary = DatasetSummary(k=64).update(df.iloc[:50_000])
+    restored = DatasetSummary.from_dict(json.loads(json.dumps(summary.to_dict())))
+    pd.testing.assert_frame_equal(restored.describe(), summary.describe())
+    # El estado del generador viaja con el sketch: las compactaciones
+    # siguientes son las mismas que sin guardar
+    summary.update(df.iloc[50_000:])
+    restored.update(df.iloc[50_000:])
+    assert restored.to_dict() == summary.to_dict()
@@ -0,0 +1,223 @@
+"""Almacén compartido mapeado en memoria (``analytics.store``)."""
+import gc
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import store as store_module
+from analytics.pyramid import RollupPyramid
+from analytics.sketches import summarize
+from analytics.store import (
+    READERS,
+    REJECTED,
+    Memo,
+    SharedStore,
+    in_use,
+    open_columns,
+    object_size,
+    open_store,
+    prune_stores,
+    session_footprint,
+    write_columns,
+)
+
+
+@pytest.fixture
+def csv(base, tmp_path):
+    path = tmp_path / 'data.csv'
+    base.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def forget_open_stores():
+    yield
+    # Cada prueba usa sus propios archivos: se sacan del registro del proceso
+    with store_module._OPEN_LOCK:
+        store_module._OPEN_STORES.clear()
+    gc.collect()
+
+
+def _versions(store_dir):
+    return sorted(entry for entry in os.listdir(store_dir) if not entry.endswith('.tmp'))
+
+
+def test_columns_round_trip_as_read_only_maps(base, tmp_path):
+    write_columns(base, tmp_path / 'cols')
+    df = open_columns(tmp_path / 'cols')
+    assert list(df.columns) == list(base.columns)
+    for col in base.columns:
+        np.testing.assert_array_equal(np.asarray(df[col], dtype=object), base[col].to_numpy(dtype=object))
+    assert isinstance(df['Term'].dtype, pd.CategoricalDtype)
+    # Vista sobre el archivo mapeado, no una copia
+    values = df['Enrolled'].to_numpy()
+    assert not values.flags.writeable
+    while not isinstance(values, np.memmap) and values.base is not None:
+        values = values.base
+    assert isinstance(values, np.memmap)
+
+
+def test_reopen_reads_the_saved_aggregates(csv, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    first = SharedStore.open(csv, store_dir)
+    again = SharedStore.open(csv, store_dir)
+    assert again.version == first.version
+    assert again.summary.to_dict() == summarize(again.df).to_dict()
+    expected = RollupPyramid.from_frame(again.df)
+    for level, partial in expected.levels.items():
+        pd.testing.assert_frame_equal(again.pyramid.levels[level], partial)
+    pd.testing.assert_frame_equal(again.df, first.df)
+
+
+def test_rejected_version_is_remembered(base, tmp_path):
+    path = tmp_path / 'bad.csv'
+    base.assign(Enrolled=-1).to_csv(path, index=False)
+    store_dir = str(tmp_path / 'store')
+    with pytest.raises(store_module.DataValidationError):
+        SharedStore.open(str(path), store_dir)
+    assert any(entry.endswith(REJECTED) for entry in os.listdir(store_dir))
+
+
+def test_memo_is_a_bounded_lru():
+    memo, calls = Memo(max_entries=2), []
+
+    def compute(value):
+        calls.append(value)
+        return value * 10
+
+    assert memo.get('a', compute, 1) == 10
+    assert memo.get('b', compute, 2) == 20
+    assert memo.get('a', compute, 99) == 10
+    memo.get('c', compute, 3)
+    # 'b' era la menos usada: se descartó y se vuelve a calcular
+    assert memo.get('b', compute, 4) == 40
+    assert memo.get('c', compute, 5) == 30
+    assert calls == [1, 2, 3, 4]
+
+
+def test_memo_is_bounded_by_bytes():
+    memo = Memo(max_bytes=3 * 8000 + 1000)
+    for key in 'abcd':
+        memo.get(key, np.zeros, 1000)
+    # Cuatro arreglos de 8000 bytes no caben: se descartó el más antiguo
+    assert len(memo) == 3
+    assert memo.bytes == 3 * 8000
+    calls = []
+    memo.get('a', lambda: calls.append('a') or np.zeros(1000))
+    assert calls == ['a']
+    memo.clear()
+    assert memo.bytes == 0 and len(memo) == 0
+
+
+def test_memo_keeps_a_result_larger_than_the_budget():
+    memo = Memo(max_bytes=100)
+    value = memo.get('big', np.zeros, 1000)
+    assert memo.get('big', lambda: None) is value
+    memo.get('next', np.zeros, 10)
+    assert len(memo) == 1 and memo.bytes == 80
+
+
+def test_figures_count_their_data_not_shared_internals():
+    import plotly.graph_objects as go
+
+    small = go.Figure(go.Scatter(y=np.arange(10)))
+    large = go.Figure(go.Scatter(y=np.arange(100_000)))
+    assert object_size(large) - object_size(small) >= 4 * (100_000 - 10)
+    assert object_size(small) < 256 * 1024
+
+
+def test_memory_usage_counts_mapped_and_memo_bytes(csv, tmp_path):
+    shared = SharedStore.open(csv, str(tmp_path / 'store'))
+    usage = shared.memory_usage()
+    assert usage['mapped'] == shared.df.memory_usage(index=False).sum() > 0
+    assert usage['memo'] == 0
+    shared.csv_bytes()
+    assert shared.memory_usage()['memo'] >= len(shared.csv_bytes())
+
+
+def test_session_footprint_skips_shared_objects(csv, tmp_path):
+    shared = SharedStore.open(csv, str(tmp_path / 'store'))
+    state = {'filters': [2020, 2021], 'store': shared, 'big': np.zeros(1000)}
+    sizes = session_footprint(state, shared=(shared,))
+    assert list(sizes) == ['big', 'filters', 'store']
+    assert sizes['store'] == 0
+
+
+def test_memo_results_are_shared_not_copied():
+    memo = Memo()
+    value = memo.get('frame', lambda: pd.DataFrame({'x': [1]}))
+    assert memo.get('frame', lambda: None) is value
+
+
+def test_open_store_reuses_the_instance(csv, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    assert open_store(csv, store_dir=store_dir) is open_store(csv, store_dir=store_dir)
+
+
+def test_retention_is_per_source_file(base, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    paths = []
+    for name in ('a.csv', 'b.csv'):
+        path = tmp_path / name
+        base.to_csv(path, index=False)
+        paths.append(str(path))
+    kept_a = [open_store(paths[0], version, keep=2, store_dir=store_dir) for version in ('a1', 'a2')]
+    # Muchas versiones de otro archivo no desplazan a las de ``a.csv``
+    for version in ('b1', 'b2', 'b3'):
+        open_store(paths[1], version, keep=2, store_dir=store_dir)
+    assert open_store(paths[0], 'a1', keep=2, store_dir=store_dir) is kept_a[0]
+    assert open_store(paths[0], 'a2', keep=2, store_dir=store_dir) is kept_a[1]
+    registered = [version for path, version in store_module._OPEN_STORES if path == paths[1]]
+    assert registered == ['b2', 'b3']
+
+
+def test_prune_removes_only_versions_nobody_has_open(csv, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    name = os.path.basename(csv)
+    kept = SharedStore.open(csv, store_dir, 'aa')
+    still_open = SharedStore.open(csv, store_dir, 'bb')
+    closed = SharedStore.open(csv, store_dir, 'cc')
+    del closed
+    gc.collect()
+    with open(os.path.join(store_dir, f"{name}-dd{REJECTED}"), 'w') as fh:
+        fh.write('[]')
+    os.makedirs(os.path.join(store_dir, f"{name}-ee.123.tmp"))
+    os.makedirs(os.path.join(store_dir, f"{name}-notes"))
+
+    prune_stores(csv, {'aa'}, store_dir)
+    assert _versions(store_dir) == [f"{name}-aa", f"{name}-bb", f"{name}-notes"]
+    assert os.path.isdir(os.path.join(store_dir, f"{name}-ee.123.tmp"))
+
+    # Cuando el último proceso la cierra, la próxima poda la borra
+    assert in_use(os.path.join(store_dir, f"{name}-bb"))
+    del still_open
+    gc.collect()
+    prune_stores(csv, {'aa'}, store_dir)
+    assert _versions(store_dir) == [f"{name}-aa", f"{name}-notes"]
+    assert kept.df['Enrolled'].sum() > 0
+
+
+def test_marks_of_finished_processes_do_not_block_pruning(csv, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    root = os.path.join(store_dir, f"{os.path.basename(csv)}-ff")
+    opened = SharedStore.open(csv, store_dir, 'ff')
+    del opened
+    gc.collect()
+    # PID que no existe: el proceso terminó sin borrar su marca
+    with open(os.path.join(root, READERS, str(2 ** 22 + 1)), 'w'):
+        pass
+    assert not in_use(root)
+    assert os.listdir(os.path.join(root, READERS)) == []
+
+
+def test_store_pruned_before_opening_is_rebuilt(csv, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    first = SharedStore.open(csv, store_dir, 'ab')
+    expected = np.asarray(first.df['Enrolled']).copy()
+    del first
+    gc.collect()
+    prune_stores(csv, set(), store_dir)
+    again = SharedStore.open(csv, store_dir, 'ab')
+    np.testing.assert_array_equal(np.asarray(again.df['Enrolled']), expected)
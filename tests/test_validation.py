@@ -0,0 +1,90 @@
+"""Validación del dataset durante la ingesta (``analytics.validation``)."""
+import numpy as np
+import pytest
+
+from analytics.sketches import ingest
+from analytics.store import REJECTED, SharedStore
+from analytics.validation import DataValidationError, Validator, check_columns, validate
+
+
+def _problems(df):
+    return Validator().check(df)
+
+
+def test_valid_dataset_passes(scaled):
+    assert validate(scaled) is scaled
+    assert _problems(scaled) == []
+
+
+@pytest.mark.parametrize('column, value, message', [
+    ('Admitted', 10 ** 6, "'Admitted' mayor que 'Applications'"),
+    ('Enrolled', 10 ** 6, "'Enrolled' mayor que 'Admitted'"),
+    ('Engineering Enrolled', 10 ** 6, "La suma de departamentos supera 'Enrolled'"),
+    ('Retention Rate (%)', 101.0, "'Retention Rate (%)' fuera de 0-100"),
+    ('Student Satisfaction (%)', -1.0, "'Student Satisfaction (%)' fuera de 0-100"),
+    ('Applications', -5, "Conteos negativos"),
+    ('Year', 2015.5, "'Year' debe ser entero"),
+    ('Term', 'Summer', "'Term' admite Spring, Fall"),
+    ('Applications', 'muchas', "'Applications' tiene valores no numéricos"),
+    ('Enrolled', np.nan, "'Enrolled' tiene valores vacíos"),
+])
+def test_each_rule_reports_its_row(base, column, value, message):
+    df = base.copy()
+    if isinstance(value, str) and df[column].dtype.kind != 'O':
+        df[column] = df[column].astype(object)
+    elif isinstance(value, float) and df[column].dtype.kind in 'iu':
+        df[column] = df[column].astype(float)
+    df.loc[3, column] = value
+    problems = _problems(df)
+    matching = [problem for problem in problems if problem.startswith(message)]
+    assert matching, problems
+    assert matching[0].endswith("1 fila(s), p. ej. 3")
+
+
+def test_examples_are_limited(base):
+    df = base.copy()
+    df['Retention Rate (%)'] = 150.0
+    problem, = _problems(df)
+    assert problem == "'Retention Rate (%)' fuera de 0-100: 20 fila(s), p. ej. 0, 1, 2"
+
+
+def test_missing_columns_are_reported_alone(base):
+    assert check_columns(base.columns) == []
+    assert _problems(base.drop(columns=['Term', 'Arts Enrolled'])) == [
+        "Faltan columnas: Term, Arts Enrolled"]
+
+
+def test_duplicates_are_detected_across_chunks(base):
+    validator = Validator().update(base.iloc[:12])
+    with pytest.raises(DataValidationError) as info:
+        validator.update(base.iloc[10:])
+    assert info.value.problems == ["Filas repetidas para (Year, Term): 2 fila(s), p. ej. 10, 11"]
+
+
+def test_ingest_stops_at_first_invalid_chunk(base, tmp_path):
+    path = tmp_path / 'data.csv'
+    df = base.copy()
+    df.loc[15, 'Admitted'] = df.loc[15, 'Applications'] + 1
+    df.to_csv(path, index=False)
+    with pytest.raises(DataValidationError, match="'Admitted' mayor que 'Applications'"):
+        ingest(str(path), chunksize=5)
+    # Sin validar, el mismo archivo se lee completo
+    data, summary = ingest(str(path), chunksize=5, validate=False)
+    assert len(data) == len(base)
+
+
+def test_rejected_version_is_not_read_again(base, tmp_path):
+    path = tmp_path / 'data.csv'
+    base.assign(Enrolled=-1).to_csv(path, index=False)
+    store_dir = str(tmp_path / 'store')
+    with pytest.raises(DataValidationError) as first:
+        SharedStore.open(str(path), store_dir, version='bad')
+    assert first.value.version == 'bad'
+    assert (tmp_path / 'store' / f"data.csv-bad{REJECTED}").is_file()
+
+    # El rechazo guardado responde sin volver a leer el archivo
+    path.unlink()
+    with pytest.raises(DataValidationError) as second:
+        SharedStore.open(str(path), store_dir, version='bad')
+    assert second.value.problems == first.value.problems
+    assert not (tmp_path / 'store' / 'data.csv-bad').exists()
@@ -0,0 +1,92 @@
+"""Huella de versión y vigilancia de cambios (``analytics.versioning``)."""
+import os
+import threading
+import time
+
+import pytest
+
+from analytics.validation import DataValidationError
+from analytics.versioning import DataWatcher, data_fingerprint
+
+
+@pytest.fixture
+def csv(base, tmp_path):
+    path = tmp_path / 'data.csv'
+    base.to_csv(path, index=False)
+    return str(path)
+
+
+def _rewrite(path, base, **changes):
+    base.assign(**changes).to_csv(path, index=False)
+    # Misma longitud posible: se fuerza otra fecha de modificación
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_fingerprint_is_stable_until_the_file_changes(base, csv):
+    version = data_fingerprint(csv)
+    assert data_fingerprint(csv) == version
+    assert all(ch in '0123456789abcdef' for ch in version)
+    _rewrite(csv, base, Applications=base['Applications'] + 1)
+    assert data_fingerprint(csv) != version
+
+
+def _watch(path, on_change, **kwargs):
+    return DataWatcher(path, on_change, interval=0.02, **kwargs).start()
+
+
+def test_version_is_published_after_on_change(base, csv):
+    started, release, seen = threading.Event(), threading.Event(), []
+
+    def on_change(version):
+        started.set()
+        release.wait(5)
+        seen.append(version)
+
+    watcher = _watch(csv, on_change)
+    old = watcher.version
+    try:
+        _rewrite(csv, base, Applications=base['Applications'] + 1)
+        assert started.wait(5)
+        # Mientras se precalienta, las sesiones siguen viendo la anterior
+        assert watcher.version == old
+        release.set()
+        for _ in range(250):
+            if watcher.version != old:
+                break
+            time.sleep(0.02)
+        assert watcher.version == seen[0] == data_fingerprint(csv)
+    finally:
+        release.set()
+        watcher.stop()
+
+
+def test_rejected_version_is_not_retried(base, csv):
+    calls = []
+
+    def on_change(version):
+        calls.append(version)
+        raise DataValidationError(["'Enrolled' negativo"], version)
+
+    watcher = _watch(csv, on_change)
+    old = watcher.version
+    try:
+        _rewrite(csv, base, Enrolled=-1)
+        for _ in range(250):
+            if watcher.rejected:
+                break
+            time.sleep(0.02)
+        time.sleep(0.1)
+    finally:
+        watcher.stop()
+    assert watcher.version == old
+    assert watcher.rejected == data_fingerprint(csv)
+    assert isinstance(watcher.error, DataValidationError)
+    assert calls == [watcher.rejected]
+
+
+def test_optional_file_may_be_missing(tmp_path):
+    watcher = DataWatcher(str(tmp_path / 'events.csv'), lambda version: None, optional=True)
+    assert watcher.version is None
+    with pytest.raises(FileNotFoundError):
+        DataWatcher(str(tmp_path / 'events.csv'), lambda version: None)
@@ -0,0 +1,154 @@
+"""Secciones en segundo plano (``analytics.workers``)."""
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from analytics import workers
+from analytics.growth import GrowthTable
+
+
+@pytest.fixture
+def pool():
+    pool = workers.create_pool(max_workers=4)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+class Status:
+    """Placeholder de prueba: guarda lo que se le muestra."""
+
+    def __init__(self):
+        self.shown = []
+
+    def caption(self, text):
+        self.shown.append(text)
+
+    def empty(self):
+        self.shown.append(None)
+
+
+def test_finished_sections_are_forgotten(pool):
+    scheduler = workers.SectionScheduler(pool)
+    assert scheduler.submit('total', sum, [1, 2, 3]).result(timeout=5) == 6
+    time.sleep(0.05)
+    assert scheduler._running == {}
+
+
+def test_resubmitting_cancels_the_running_calculation(pool):
+    scheduler = workers.SectionScheduler(pool, settle=0)
+    release = threading.Event()
+    first = scheduler.submit('chart', release.wait, 5)
+    second = scheduler.submit('chart', lambda: 'nuevo')
+    release.set()
+    assert second.result(timeout=5) == 'nuevo'
+    # El primero ya corría: termina, pero quedó fuera del registro
+    first.result(timeout=5)
+    assert 'chart' not in scheduler._running
+
+
+def test_queued_calculation_never_runs_after_cancel(pool):
+    scheduler = workers.SectionScheduler(workers.create_pool(max_workers=1), settle=0)
+    release, calls = threading.Event(), []
+    scheduler.submit('blocker', release.wait, 5)
+    queued = scheduler.submit('chart', calls.append, 'viejo')
+    scheduler.cancel_all()
+    release.set()
+    with pytest.raises(CancelledError):
+        queued.result(timeout=5)
+    scheduler.pool.shutdown(wait=True)
+    assert calls == []
+
+
+def test_first_change_runs_immediately(pool):
+    scheduler = workers.SectionScheduler(pool, settle=1.0)
+    start = time.perf_counter()
+    scheduler.submit('chart', lambda: None).result(timeout=5)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_burst_of_changes_computes_only_the_last(pool):
+    scheduler = workers.SectionScheduler(pool, settle=0.2)
+    release, calls = threading.Event(), []
+
+    def compute(value):
+        if value == 0:
+            release.wait(5)
+        calls.append(value)
+        return value
+
+    futures = [scheduler.submit('chart', compute, 0)]
+    # Cambios seguidos, como al arrastrar un slider: cada uno reemplaza al anterior
+    for value in range(1, 5):
+        scheduler.cancel_all()
+        futures.append(scheduler.submit('chart', compute, value))
+    release.set()
+    assert futures[-1].result(timeout=5) == 4
+    for future in futures[1:-1]:
+        with pytest.raises(CancelledError):
+            future.result(timeout=5)
+    assert calls == [0, 4]
+
+
+def test_change_after_a_quiet_period_is_not_delayed(pool):
+    scheduler = workers.SectionScheduler(pool, settle=1.0, burst=0.05)
+    release = threading.Event()
+    scheduler.submit('chart', release.wait, 5)
+    scheduler.cancel('chart')
+    release.set()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    scheduler.submit('chart', lambda: None).result(timeout=5)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_cancel_races_with_finishing_calculations(pool):
+    # Los callbacks de los hilos del pool y las cancelaciones del script
+    # tocan el mismo registro
+    scheduler = workers.SectionScheduler(pool, settle=0)
+    for _ in range(200):
+        for key in range(8):
+            scheduler.submit(key, lambda: None)
+        scheduler.cancel_all()
+    pool.shutdown(wait=True)
+    assert scheduler._running == {}
+
+
+def test_drain_renders_results_as_they_finish(pool):
+    slow = threading.Event()
+    rendered, status = [], Status()
+    fast_future = pool.submit(lambda: 'rápida')
+    slow_future = pool.submit(lambda: slow.wait(5) and 'lenta')
+    threading.Timer(0.15, slow.set).start()
+    workers.drain({fast_future: rendered.append, slow_future: rendered.append}, status=status, poll=0.05)
+    assert rendered == ['rápida', 'lenta']
+    assert "⏳ Calculando 1 sección(es)..." in status.shown
+    assert status.shown[-1] is None
+
+
+def test_drain_skips_cancelled_and_cancels_the_rest_on_error(pool):
+    release = threading.Event()
+    cancelled = pool.submit(lambda: None)
+    cancelled.cancel()
+    failing = pool.submit(lambda: 1)
+    waiting = workers.create_pool(max_workers=1)
+    waiting.submit(release.wait, 5)
+    queued = waiting.submit(lambda: 'nunca')
+
+    def render(_):
+        raise RuntimeError("la ejecución se detuvo")
+
+    with pytest.raises(RuntimeError):
+        workers.drain({cancelled: render, failing: render, queued: render}, poll=0.05)
+    assert queued.cancelled()
+    release.set()
+    waiting.shutdown(wait=True)
+
+
+def test_projection_section_uses_the_growth_table(base):
+    rates, projection, fig = workers.projection_section(base, growth=GrowthTable.from_frame(base))
+    expected_rates, expected, _ = workers.projection_section(base)
+    assert rates == pytest.approx(expected_rates)
+    assert projection.equals(expected)
+    assert len(fig.data) > 0